@@ -6,11 +6,16 @@ import ingestor
 import stitcher
 
 # --- SHADOW CORE INTEGRATION ---
-from private_core.pwp_core_engine import SecureEpochVault
+from private_core.vault_service import connect_or_create
+from shared_core.relay_store import cached_basis
 
-# Initialize Sovereign Persistence
-if 'vault' not in st.session_state:
-    st.session_state.vault = SecureEpochVault("White_Piece_Live_Session")
+# Initialize Sovereign Persistence (one vault shared by every session;
+# set VAULT_SERVICE_ADDRESS and VAULT_SERVICE_AUTHKEY_FILE to share it across processes)
+@st.cache_resource
+def get_vault():
+    return connect_or_create("White_Piece_Live_Session")
+
+vault = get_vault()
 
 # Page Configuration
 st.set_page_config(page_title="The Stitching Layer", layout="wide")
@@ -50,8 +55,8 @@ with col_main:
                     float(data.get('k_friction', 0))
                 ]
                 
-                # Pass the 'vault' from session state into the stitcher
-                result = stitcher.perform_handshake(truth, reality, "Live_Audit", vault=st.session_state.vault)
+                # Pass the shared vault into the stitcher
+                result = stitcher.perform_handshake(truth, reality, "Live_Audit", vault=vault)
                 
             st.write(f"### Result: {result['status']}")
             st.metric("Geometric Torsion", result['torsion'])
@@ -106,10 +111,10 @@ with st.sidebar:
     st.header("🛡️ Sovereign Security")
     
     # Display Current Epoch
-    st.metric("Current Epoch", f"#{st.session_state.vault.epoch_id}")
+    st.metric("Current Epoch", f"#{vault.epoch_id}")
     
     # Active Nodes Visualizer
-    active_nodes = st.session_state.vault.active_nodes
+    active_nodes = vault.active_nodes
     cols = st.columns(3)
     cols[0].write("🇺🇸" if "US" in active_nodes else "💀")
     cols[1].write("🇪🇺" if "EU" in active_nodes else "💀")
@@ -120,17 +125,22 @@ with st.sidebar:
     # The "Kill Switch" for Demo
     if "CN" in active_nodes:
         if st.button("Simulate CN Disconnect"):
-            st.session_state.vault.heartbeat_check(failing_region="CN")
+            vault.heartbeat_check(failing_region="CN")
             st.rerun()
     else:
         st.error("Region CN Offline. Epoch Shifted.")
-        if st.button("Reset Simulation"):
-            del st.session_state.vault
+        # The vault is shared: rejoining keeps every session's epoch history
+        if st.button("Reconnect CN"):
+            vault.join_region("CN")
+            st.rerun()
+        confirm_reset = st.checkbox("Also wipe epoch history for ALL connected sessions")
+        if st.button("Reset Simulation", disabled=not confirm_reset):
+            vault.reset()
             st.rerun()
 
     # Shadow Basis Inspector (Auditor View)
     with st.expander("View Shadow Basis (H1)"):
-        current_basis = st.session_state.vault.synthesize_sheaf_laplacian()
+        current_basis = cached_basis(vault)
         if current_basis:
             st.write(f"**Basis:** {current_basis}")
             st.write(f"**Public Norm:** {current_basis.norm():.4f}")
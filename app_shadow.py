@@ -2,10 +2,12 @@ import streamlit as st
 import pandas as pd
 import json
 import os
-import glob
+from shared_core.relay_store import PacketStore
 from shadow_node.scraper import UniversalTranslator
 from shadow_node.validator import SheafValidator
 from shadow_node.action_handler import ActionHandler
+from shadow_node.outbox import GradientOutbox
+from shared_core.audit_ledger import AuditLedger, coboundary_record
 
 # --- 1. TERMINAL CONFIGURATION ---
 st.set_page_config(
@@ -53,6 +55,21 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# --- SHARED GRADIENT OUTBOX (One per server process) ---
+@st.cache_resource
+def get_outbox():
+    return GradientOutbox()
+
+# --- SHARED ARTIFACT STORE (Parsed once, polled for new signals) ---
+@st.cache_resource
+def get_artifacts():
+    return PacketStore("shadow_node", pattern="artifact_*.json")
+
+# --- SHARED AUDIT LEDGER (Hash-chained record of every audit) ---
+@st.cache_resource
+def get_ledger():
+    return AuditLedger("shadow_node/audit_ledger.log")
+
 # --- 3. EXECUTION CORE ---
 def main():
     st.markdown("### **PWP // SHADOW NODE v2.2 (COMPACT)**")
@@ -74,16 +91,16 @@ def main():
                 manual_trigger = st.button(">> AUDIT <<", key="btn_man")
 
             with tab_net:
-                list_of_files = glob.glob('shadow_node/artifact_*.json')
-                latest_file = max(list_of_files, key=os.path.getctime) if list_of_files else None
+                artifacts = get_artifacts()
+                artifacts.refresh()
+                latest_file, latest_packet = artifacts.latest()
                 
                 if latest_file:
-                    st.success(f"SIGNAL: {os.path.basename(latest_file)}")
+                    st.success(f"SIGNAL: {latest_file}")
                     if st.button(">> INGEST EDGE <<", key="btn_net"):
-                        with open(latest_file, 'r') as f:
-                            st.session_state.network_packet = json.load(f)
-                            # Default manual trigger to allow logic flow
-                            manual_trigger = True 
+                        st.session_state.network_packet = dict(latest_packet)
+                        # Default manual trigger to allow logic flow
+                        manual_trigger = True 
                 else:
                     st.warning("NO SIGNAL")
 
@@ -124,7 +141,7 @@ def main():
                 res = st.session_state.audit_results
                 if res['torsion'] > 0:
                     st.error(f"⚠️ SURGERY REQUIRED")
-                    st.markdown(f"**FLOW:** {res['action_status']}")
+                    st.markdown(f"**FLOW:** {flow_status(res)}")
                     # Highlight the Cash Value
                     st.markdown(f"### **LEAKAGE: ${res['leakage_est']}**")
                 else:
@@ -133,6 +150,15 @@ def main():
                 st.markdown("`STATIONARY`")
 
 # --- LOGIC HANDLERS ---
+def flow_status(res):
+    # Poll the outbox for the Gradients dispatched by the last surgery
+    message_ids = res.get('gradients', {})
+    if not message_ids:
+        return res['action_status']
+    outbox = get_outbox()
+    states = [outbox.status(mid) for mid in message_ids.values()]
+    return ", ".join(f"{s['target']}={s['status']}" for s in states if s)
+
 def render_metrics(container, res):
     m1, m2, m3 = container.columns(3)
     m1.metric("ALPHA", res['alpha'])
@@ -161,12 +187,16 @@ def run_audit_logic(expected_qty, raw_text=None, data=None):
     ]
     
     audit = SheafValidator.compute_coboundary(vector_truth, vector_reality)
+    source = data.get('_meta', {}).get('source', "NETWORK_RELAY")
+    get_ledger().append(coboundary_record(audit, "EXPECTED->DRIVER", source))
     
     # C. ACT (With Updated Math)
-    handler = ActionHandler()
+    handler = ActionHandler(outbox=get_outbox())
+    gradients = {}
     if audit['h1_presence']:
-        action_success = handler.execute_surgery("DRIVER", {"reroute": True})
-        action_status = "ACTIVE" if action_success else "BLOCKED"
+        # Non-blocking: the outbox delivers the Gradient in the background
+        gradients = handler.dispatch_surgery("DRIVER", {"reroute": True})
+        action_status = "DISPATCHED"
         
         # IMPROVED LEAKAGE FORMULA:
         # Cost of Time + Cost of Money + Cost of Missing Units ($10/unit arbitrary)
@@ -182,6 +212,7 @@ def run_audit_logic(expected_qty, raw_text=None, data=None):
         "torsion": audit['torsion_magnitude'],
         "status": audit['status'],
         "action_status": action_status,
+        "gradients": gradients,
         "leakage_est": round(leakage, 2),
         "full_packet": data
     }
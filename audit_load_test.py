@@ -0,0 +1,151 @@
+"""
+Load test for the headless audit service.
+
+Each client thread holds one keep-alive connection and posts batches back
+to back for a fixed duration. Reports requests/s, sections/s and latency
+percentiles. Without --url an in-process server is started on a free port.
+
+    python audit_load_test.py --endpoint handshake --batch 256 --clients 8
+    python audit_load_test.py --url http://127.0.0.1:8765 --endpoint batch
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+import audit_service
+
+
+def make_payload(endpoint, batch, rng):
+    """A request body for 'endpoint' carrying 'batch' sections per operand."""
+    truth = np.column_stack([rng.integers(50, 150, batch), np.zeros((batch, 3))])
+    reality = truth + np.column_stack([rng.integers(-3, 1, batch), rng.random((batch, 3)) * 0.1])
+    if endpoint == "handshake":
+        return {"a": truth.tolist(), "b": reality.tolist()}
+    if endpoint == "integrity":
+        return {"truth": truth.tolist(), "reality": reality.tolist()}
+    if endpoint == "cycles":
+        scenarios = []
+        for s in range(max(1, batch // 4)):
+            nodes = {node: reality[(s * 4 + k) % batch].tolist() for k, node in enumerate("ABCD")}
+            scenarios.append({"id": f"S{s}", "nodes": nodes,
+                              "edges": [["A", "B"], ["B", "C"], ["C", "D"], ["D", "A"], ["A", "C"]]})
+        return {"scenarios": scenarios}
+    # One round trip carrying all three audits
+    return {"requests": [
+        dict(make_payload("handshake", batch, rng), op="handshake"),
+        dict(make_payload("integrity", batch, rng), op="integrity"),
+        dict(make_payload("cycles", batch, rng), op="cycles")
+    ]}
+
+
+def _client(host, port, path, body, deadline, latencies, outcome, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+    local, ok, rejected, errors, reconnects = [], 0, 0, 0, 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            reconnects += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        local.append(time.perf_counter() - start)
+        if response.status == 200:
+            ok += 1
+        elif response.status == 503:
+            rejected += 1
+            time.sleep(float(response.getheader("Retry-After") or 1))
+        else:
+            errors += 1
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        outcome["ok"] += ok
+        outcome["rejected"] += rejected
+        outcome["errors"] += errors
+        outcome["reconnects"] += reconnects
+
+
+def run_load(url, endpoint="handshake", batch=256, clients=8, duration=5.0, seed=0):
+    """Drives 'clients' keep-alive connections for 'duration' seconds."""
+    target = urlparse(url)
+    path = f"/v1/{endpoint}"
+    body = json.dumps(make_payload(endpoint, batch, np.random.default_rng(seed))).encode()
+
+    latencies, lock = [], threading.Lock()
+    outcome = {"ok": 0, "rejected": 0, "errors": 0, "reconnects": 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=_client, args=(target.hostname, target.port, path, body,
+                                                     deadline, latencies, outcome, lock))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    sections = batch * (3 if endpoint == "batch" else 1)
+    return dict(outcome,
+                endpoint=endpoint, batch=batch, clients=clients, elapsed=elapsed,
+                body_bytes=len(body),
+                rps=outcome["ok"] / elapsed,
+                sections_per_s=outcome["ok"] * sections / elapsed,
+                p50_ms=float(np.percentile(samples, 50)),
+                p95_ms=float(np.percentile(samples, 95)),
+                p99_ms=float(np.percentile(samples, 99)),
+                max_ms=float(samples.max()))
+
+
+def print_load_report(report):
+    print("\n" + "="*50)
+    print("      AUDIT SERVICE LOAD TEST")
+    print("="*50)
+    print(f"Endpoint: /v1/{report['endpoint']} | Batch: {report['batch']} | Clients: {report['clients']} "
+          f"| Body: {report['body_bytes'] / 1024:.0f} KB")
+    print(f"Requests: {report['ok']} OK, {report['rejected']} rejected (503), {report['errors']} errors "
+          f"in {report['elapsed']:.2f}s")
+    print(f"Throughput: {report['rps']:.1f} req/s | {report['sections_per_s']:.0f} sections/s")
+    print(f"Latency: p50 {report['p50_ms']:.2f} ms | p95 {report['p95_ms']:.2f} ms "
+          f"| p99 {report['p99_ms']:.2f} ms | max {report['max_ms']:.2f} ms")
+    print("="*50 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the headless audit service")
+    parser.add_argument("--url", help="Running service (omit to start one in-process)")
+    parser.add_argument("--endpoint", choices=["handshake", "integrity", "cycles", "batch"], default="handshake")
+    parser.add_argument("--batch", type=int, default=256, help="Sections per request")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-concurrency", type=int, default=4, help="In-process server limit")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = audit_service.make_server(port=0, max_concurrency=args.max_concurrency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report = run_load(url, args.endpoint, args.batch, args.clients, args.duration)
+        print_load_report(report)
+        if server is not None:
+            print(f"Server metrics: {json.dumps(server.service.metrics())}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,352 @@
+"""
+Headless batch audit service.
+
+Serves the stitcher, integrity and cycle audits over local HTTP so batch
+jobs and other tools can use them without the Streamlit apps. Every
+endpoint takes arrays of sections ([Alpha, i, j, k] rows) and answers the
+whole batch in one vectorized call.
+
+    POST /v1/handshake  {"a": [[...4]], "b": [[...4]]}
+    POST /v1/integrity  {"truth": [[...4]], "reality": [[...4]]}
+    POST /v1/cycles     {"scenarios": [{"nodes": {...}, "edges": [[u, v], ...],
+                                    "edge_deltas": {"u->v": [...4]}}]}
+                        (or a single {"nodes", "edges"}; 'edge_deltas' is optional)
+    POST /v1/batch      {"requests": [{"op": "handshake" | "integrity" | "cycles", ...}]}
+    GET  /health, /metrics
+
+Connections are HTTP/1.1 keep-alive. At most 'max_concurrency' audits run
+at once; a request that cannot get a slot within 'queue_timeout' seconds
+gets 503 with a Retry-After header instead of piling up.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import stitcher
+from shadow_node.validator import SheafValidator
+from shared_core.sheaf_math import compute_integrity_batch
+
+MAX_BODY = 64 << 20       # Bytes accepted per request
+LATENCY_WINDOW = 4096     # Samples kept per endpoint for p50/p99
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _sections(body, key):
+    if key not in body:
+        raise ServiceError(400, f"Missing '{key}'.")
+    try:
+        sections = np.asarray(body[key], dtype=float)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"'{key}' must be numeric.")
+    if sections.size == 0:
+        return sections.reshape(0, 4)
+    if sections.ndim != 2 or sections.shape[1] != 4:
+        raise ServiceError(400, f"'{key}' must be an array of [Alpha, i, j, k] sections.")
+    if not np.isfinite(sections).all():
+        # NaN/Infinity would come back as bare NaN tokens, which are not JSON
+        raise ServiceError(400, f"'{key}' must contain only finite numbers.")
+    return sections
+
+
+def _pair(body, left, right):
+    a, b = _sections(body, left), _sections(body, right)
+    if len(a) != len(b):
+        raise ServiceError(400, f"'{left}' has {len(a)} sections but '{right}' has {len(b)}.")
+    return a, b
+
+
+# --- OPERATIONS ---
+def handshake_batch(body, vault=None):
+    """perform_handshake_arrays over paired sections (one vault epoch per batch)."""
+    a, b = _pair(body, "a", "b")
+    result = stitcher.perform_handshake_arrays(a, b, vault=vault)
+    return {
+        "count": len(a),
+        "status": result["status"],
+        "basis_used": result["basis_used"],
+        "torsion": result["torsion"].tolist(),
+        "aligned": result["aligned"].tolist()
+    }
+
+
+def integrity_batch(body, vault=None):
+    """compute_integrity_batch over paired truth/reality sections."""
+    truth, reality = _pair(body, "truth", "reality")
+    result = compute_integrity_batch(truth, reality)
+    return {
+        "count": len(truth),
+        "risk_index": result["risk_index"].tolist(),
+        "integrity_pct": result["integrity_pct"].tolist(),
+        "is_aligned": result["is_aligned"].tolist(),
+        "leakage": result["leakage"].tolist(),
+        "components": {name: values.tolist() for name, values in result["components"].items()}
+    }
+
+
+def _edge_deltas(scenario, edges, label):
+    # Observed per-edge deltas ("edge_deltas", or "observed"): {"u->v": [Alpha, i, j, k]}
+    key = "edge_deltas" if "edge_deltas" in scenario else "observed"
+    observed = scenario.get(key)
+    if observed is None:
+        return None
+    if not isinstance(observed, dict):
+        raise ServiceError(400, f"Bad scenario {label}: '{key}' must map 'u->v' to an [Alpha, i, j, k] delta.")
+    by_label = {f"{u}->{v}": (u, v) for u, v in edges}
+    unknown = sorted(set(observed) - set(by_label))
+    if unknown:
+        raise ServiceError(400, f"Bad scenario {label}: '{key}' names edges not in 'edges' {unknown}.")
+    try:
+        deltas = _sections({key: list(observed.values())}, key)
+    except ServiceError as e:
+        raise ServiceError(400, f"Bad scenario {label}: {e}")
+    return {by_label[edge]: delta for edge, delta in zip(observed, deltas)}
+
+
+def cycles_batch(body, vault=None):
+    """audit_cycle_basis for each scenario, on observed edge deltas when given."""
+    scenarios = body.get("scenarios")
+    if scenarios is None:
+        scenarios = [body]
+    if not isinstance(scenarios, list):
+        raise ServiceError(400, "'scenarios' must be a list.")
+    results = []
+    for scenario in scenarios:
+        nodes, edges = (scenario.get("nodes"), scenario.get("edges")) if isinstance(scenario, dict) else (None, None)
+        if not isinstance(nodes, dict) or not isinstance(edges, list):
+            raise ServiceError(400, "Each scenario needs 'nodes' {node: section} and 'edges' [[u, v], ...].")
+        label = scenario.get("id", len(results))
+        if not all(isinstance(edge, list) and len(edge) == 2 and all(isinstance(node, str) for node in edge)
+                   for edge in edges):
+            raise ServiceError(400, f"Bad scenario {label}: every edge must be [u, v] with node names.")
+        # Checked here too so the 400 names every missing node at once
+        missing = sorted({node for edge in edges for node in edge if node not in nodes})
+        if missing:
+            raise ServiceError(400, f"Bad scenario {label}: edges reference unknown nodes {missing}.")
+        sections = _sections({"nodes": list(nodes.values())}, "nodes")
+        edge_deltas = _edge_deltas(scenario, edges, label)
+        try:
+            cycles = SheafValidator.audit_cycle_basis(dict(zip(nodes, sections)), [tuple(edge) for edge in edges],
+                                                      edge_deltas=edge_deltas)
+        except (TypeError, ValueError) as e:
+            raise ServiceError(400, f"Bad scenario {label}: {e}")
+        results.append({
+            "id": scenario.get("id"),
+            "cycles": cycles,
+            "obstructed": sum(cycle["status"] != "GLOBAL_SECTION_ALIGNED" for cycle in cycles)
+        })
+    return {"count": len(results), "scenarios": results}
+
+
+OPERATIONS = {
+    "handshake": handshake_batch,
+    "integrity": integrity_batch,
+    "cycles": cycles_batch
+}
+
+
+class AuditService:
+    """
+    Runs audit operations under a concurrency limit and keeps per-endpoint
+    request counts and latency windows for /metrics.
+    """
+
+    def __init__(self, max_concurrency=4, queue_timeout=0.5, vault=None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.vault = vault
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = {}
+        self._counts = {}
+        self.stats = {"requests": 0, "errors": 0, "rejected": 0, "rows": 0}
+        self.started = time.time()
+
+    def run(self, op, body):
+        """Runs one operation (or a /v1/batch envelope) once a slot is free."""
+        if op != "batch" and op not in OPERATIONS:
+            raise ServiceError(404, f"Unknown operation '{op}'.")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise ServiceError(503, "Audit capacity exhausted.", retry_after=self._retry_after())
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = self._batch(body) if op == "batch" else OPERATIONS[op](body, vault=self.vault)
+        except Exception:
+            self._record(op, start, error=True)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+        self._record(op, start, rows=self._rows(result))
+        return result
+
+    def _batch(self, body):
+        # Many operations share one request (and one slot): one round trip per batch
+        requests = body.get("requests")
+        if not isinstance(requests, list):
+            raise ServiceError(400, "'requests' must be a list of {\"op\": ..., ...} objects.")
+        results = []
+        for request in requests:
+            op = request.get("op") if isinstance(request, dict) else None
+            if op not in OPERATIONS:
+                results.append({"op": op, "error": f"Unknown operation '{op}'."})
+                continue
+            try:
+                results.append(dict(OPERATIONS[op](request, vault=self.vault), op=op))
+            except ServiceError as e:
+                results.append({"op": op, "error": str(e)})
+            except Exception as e:
+                # One failing operation must not fail the rest of the envelope
+                print(f"⚠️ Audit service: batched {op} failed: {e}")
+                results.append({"op": op, "error": "Internal audit failure."})
+        return {"count": len(results), "results": results}
+
+    @staticmethod
+    def _rows(result):
+        if "results" in result:
+            return sum(item.get("count", 0) for item in result["results"])
+        return result.get("count", 0)
+
+    def _record(self, op, start, rows=0, error=False):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["rows"] += rows
+            if error:
+                self.stats["errors"] += 1
+            self._counts[op] = self._counts.get(op, 0) + 1
+            self._latency.setdefault(op, deque(maxlen=LATENCY_WINDOW)).append(elapsed)
+
+    def _retry_after(self):
+        # Seconds for the current holders to drain, from the recent mean latency
+        with self._lock:
+            samples = [s for window in self._latency.values() for s in window]
+        mean = sum(samples) / len(samples) if samples else 0.1
+        return max(1, int(np.ceil(mean)))
+
+    def metrics(self):
+        with self._lock:
+            endpoints = {}
+            for op, window in self._latency.items():
+                samples = np.fromiter(window, dtype=float) * 1000
+                endpoints[op] = {
+                    "requests": self._counts[op],
+                    "p50_ms": round(float(np.percentile(samples, 50)), 3),
+                    "p99_ms": round(float(np.percentile(samples, 99)), 3)
+                }
+            return dict(self.stats, in_flight=self._in_flight, max_concurrency=self.max_concurrency,
+                        uptime=round(time.time() - self.started, 1), endpoints=endpoints)
+
+
+# --- HTTP ---
+class AuditRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: every response carries Content-Length
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send(200, self.server.service.metrics())
+        else:
+            self._send(404, {"error": f"Unknown path '{self.path}'."})
+
+    def do_POST(self):
+        op = self.path[len("/v1/"):] if self.path.startswith("/v1/") else None
+        try:
+            body = self._read_json()
+            result = self.server.service.run(op, body)
+        except ServiceError as e:
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else {}
+            self._send(e.status, {"error": str(e)}, headers)
+            return
+        except Exception as e:
+            print(f"⚠️ Audit service: {op} failed: {e}")
+            self._send(500, {"error": "Internal audit failure."})
+            return
+        self._send(200, result)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            # Body is not read, so this connection cannot be reused
+            self.close_connection = True
+            raise ServiceError(413, f"Body exceeds {MAX_BODY} bytes.")
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise ServiceError(400, "Body is not valid JSON.")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "Body must be a JSON object.")
+        return body
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate a load test; see /metrics
+        pass
+
+
+class AuditHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog for bursts of new connections
+
+    def __init__(self, address, service):
+        super().__init__(address, AuditRequestHandler)
+        self.service = service
+
+
+def make_server(host="127.0.0.1", port=8765, max_concurrency=4, queue_timeout=0.5, vault=None):
+    """An AuditHTTPServer (call serve_forever(); port 0 picks a free port)."""
+    service = AuditService(max_concurrency=max_concurrency, queue_timeout=queue_timeout, vault=vault)
+    return AuditHTTPServer((host, port), service)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless batch audit service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--queue-timeout", type=float, default=0.5)
+    parser.add_argument("--vault", metavar="SALT", help="Stitch against the Sovereign Vault for this master salt")
+    args = parser.parse_args()
+
+    vault = None
+    if args.vault:
+        from private_core.vault_service import connect_or_create
+        vault = connect_or_create(args.vault)
+
+    server = make_server(args.host, args.port, args.max_concurrency, args.queue_timeout, vault)
+    print(f">> Audit service on http://{args.host}:{server.server_address[1]} "
+          f"(max {args.max_concurrency} concurrent audits)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
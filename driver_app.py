@@ -1,7 +1,7 @@
 import streamlit as st
-import time
 import json
 from shadow_node.scraper import UniversalTranslator
+from shadow_node.ingest_queue import IngestQueue, DONE, FAILED, REJECTED
 
 # --- MOBILE CONFIGURATION ---
 st.set_page_config(
@@ -26,6 +26,26 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_ingest_queue():
+    # One translator and worker pool shared by every driver session
+    return IngestQueue(UniversalTranslator(), workers=2, max_depth=64, policy="retry_after")
+
+def show_ticket(queue, ticket):
+    record = queue.status(ticket)
+    if record is None:
+        st.caption(f"Ticket {ticket} has expired.")
+    elif record["status"] == DONE:
+        st.success("✅ POD UPLOADED")
+        st.info(f"Artifact Hash: {record['artifact'].split('/')[-1]}")
+        st.markdown("---")
+        st.caption("Manager has been notified of status change.")
+    elif record["status"] == FAILED:
+        st.error(f"❌ UPLOAD FAILED: {record['error']}")
+    else:
+        st.info(f"⏳ Ticket {ticket}: {record['status']}")
+        st.button("REFRESH STATUS")
+
 def main():
     st.title("🚚 DRIVER PORTAL")
     st.markdown("### UPLOAD PROOF OF DELIVERY")
@@ -35,22 +55,27 @@ def main():
     # For MVP, we use text, but in prod this is st.camera_input()
     raw_input = st.text_area("SCAN INVOICE / NOTES", height=150, placeholder="Type delay notes or scan doc...")
 
+    queue = get_ingest_queue()
+
     if st.button("SUBMIT POD"):
         if raw_input:
-            with st.spinner("UPLOADING TO SHADOW NODE..."):
-                # 1. THE EDGE RESTRICTION MAP
-                # The driver performs the scrape LOCALLY on the edge
-                node = UniversalTranslator()
-                artifact = node.ingest(raw_input, "DRIVER_MOBILE_APP")
-                
-                time.sleep(1) # Network simulation
-                
-            st.success("✅ POD UPLOADED")
-            st.info(f"Artifact Hash: {artifact.split('/')[-1]}")
-            st.markdown("---")
-            st.caption("Manager has been notified of status change.")
+            # 1. THE EDGE RESTRICTION MAP
+            # Queued for the Shadow Node workers; the ticket comes back at once
+            receipt = queue.submit(raw_input, "DRIVER_MOBILE_APP")
+            if receipt["status"] == REJECTED:
+                st.error(f"🚦 Shadow Node busy ({receipt['depth']} reports queued). "
+                         f"Retry in ~{receipt['retry_after'] or 1:.0f}s.")
+            else:
+                st.session_state.pod_ticket = receipt["ticket"]
         else:
             st.warning("Please enter data first.")
 
+    if "pod_ticket" in st.session_state:
+        show_ticket(queue, st.session_state.pod_ticket)
+
+    with st.expander("Queue Health"):
+        st.json(queue.metrics())
+        st.json(queue.translator.tier_report())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import hashlib
+
 import numpy as np
 
 class QuaternionicSection:
@@ -14,15 +16,119 @@ class QuaternionicSection:
         # This is the "Public Health Score" (1-10)
         return np.linalg.norm(self.vector)
 
-def generate_handshake_rotation(salt, context_id):
+# Philox4x32-10 constants (Salmon et al., "Parallel Random Numbers: As Easy as 1, 2, 3")
+_PHILOX_M0 = np.uint64(0xD2511F53)
+_PHILOX_M1 = np.uint64(0xCD9E8D57)
+_PHILOX_W0 = np.uint32(0x9E3779B9)
+_PHILOX_W1 = np.uint32(0xBB67AE85)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def _stable_digest(value, key=b""):
+    """64-bit keyed blake2b digest. Unlike hash(), identical in every process."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8, key=key).digest(), "little")
+
+
+def _split64(values):
+    values = np.asarray(values, dtype=np.uint64)
+    return (values & _MASK32).astype(np.uint32), (values >> np.uint64(32)).astype(np.uint32)
+
+
+def philox4x32(counter, key, rounds=10):
+    """
+    Vectorized Philox4x32 block function.
+
+    Args:
+        counter: (n, 4) uint32 counters.
+        key: (n, 2) uint32 keys.
+
+    Returns:
+        (n, 4) uint32 random words.
+    """
+    c0, c1, c2, c3 = (np.asarray(counter, dtype=np.uint32)[:, i] for i in range(4))
+    k0, k1 = (np.asarray(key, dtype=np.uint32)[:, i] for i in range(2))
+    for r in range(rounds):
+        if r:
+            k0, k1 = k0 + _PHILOX_W0, k1 + _PHILOX_W1
+        p0 = c0.astype(np.uint64) * _PHILOX_M0
+        p1 = c2.astype(np.uint64) * _PHILOX_M1
+        hi0, lo0 = (p0 >> np.uint64(32)).astype(np.uint32), (p0 & _MASK32).astype(np.uint32)
+        hi1, lo1 = (p1 >> np.uint64(32)).astype(np.uint32), (p1 & _MASK32).astype(np.uint32)
+        c0, c1, c2, c3 = hi1 ^ c1 ^ k0, lo1, hi0 ^ c3 ^ k1, lo0
+    return np.stack([c0, c1, c2, c3], axis=1)
+
+
+def generate_handshake_rotations(salts, context_ids, normalize=False):
+    """
+    Batch version of generate_handshake_rotation.
+
+    Every (salt, context_id) pair maps to one counter-based Philox block:
+    the key is a blake2b digest of the salt, the counter a salt-keyed digest
+    of the context ID. The block is turned into 4 standard normals by
+    Box-Muller. No global RNG state is touched, and the result depends only
+    on the pair, so it is reproducible across processes and workers.
+
+    Args:
+        salts: One salt for all pairs, or one per context ID.
+        context_ids: Iterable of transaction/edge identifiers. An integer
+            numpy array is used directly as the counters (no hashing).
+        normalize (bool): Project each rotation onto the unit quaternions.
+
+    Returns:
+        (n, 4) float array, one rotation per context ID.
+    """
+    if isinstance(context_ids, np.ndarray) and context_ids.dtype.kind in "iu":
+        # Integer IDs are already stable: use them directly as counters
+        counters = context_ids.astype(np.uint64)
+        context_ids = None
+    else:
+        context_ids = list(context_ids)
+        counters = None
+    n = len(counters) if context_ids is None else len(context_ids)
+
+    # 1. Stable keys and counters (salt digests computed once per distinct salt)
+    if isinstance(salts, (str, bytes, int)):
+        salt_key = _stable_digest(salts).to_bytes(8, "little")
+        keys = np.full(n, int.from_bytes(salt_key, "little"), dtype=np.uint64)
+        if counters is None:
+            counters = np.fromiter((_stable_digest(c, key=salt_key) for c in context_ids), dtype=np.uint64, count=n)
+    else:
+        salts = list(salts)
+        if len(salts) != n:
+            raise ValueError("Topological Mismatch: one salt per context ID is required.")
+        salt_keys = {salt: _stable_digest(salt).to_bytes(8, "little") for salt in set(salts)}
+        keys = np.fromiter((int.from_bytes(salt_keys[salt], "little") for salt in salts), dtype=np.uint64, count=n)
+        if counters is None:
+            counters = np.fromiter(
+                (_stable_digest(c, key=salt_keys[salt]) for salt, c in zip(salts, context_ids)),
+                dtype=np.uint64, count=n
+            )
+
+    # 2. One Philox block per pair
+    ctr_lo, ctr_hi = _split64(counters)
+    zeros = np.zeros(n, dtype=np.uint32)
+    words = philox4x32(np.stack([ctr_lo, ctr_hi, zeros, zeros], axis=1), np.stack(_split64(keys), axis=1))
+
+    # 3. Box-Muller: uniforms in (0, 1) -> 4 standard normals
+    u = (words.astype(np.float64) + 0.5) / 2.0**32
+    radius = np.sqrt(-2.0 * np.log(u[:, 0::2]))
+    angle = 2.0 * np.pi * u[:, 1::2]
+    rotations = np.empty((n, 4))
+    rotations[:, 0::2] = radius * np.cos(angle)
+    rotations[:, 1::2] = radius * np.sin(angle)
+
+    if normalize:
+        rotations /= np.linalg.norm(rotations, axis=1, keepdims=True)
+    return rotations
+
+
+def generate_handshake_rotation(salt, context_id, normalize=False):
     """
     Creates a deterministic quaternionic rotation 'Seed'.
     This ensures that the 'Stitch' is cryptographically tied 
     to the specific transaction.
     """
-    state = hash(f"{salt}-{context_id}")
-    np.random.seed(state % (2**32))
-    return np.random.standard_normal(4)
+    return generate_handshake_rotations([salt], [context_id], normalize=normalize)[0]
 
 def calculate_torsion(section_v1, section_v2):
     """
@@ -1,6 +1,198 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 import ingestor
 import engine
 import stitcher
+from shadow_node.validator import SheafValidator
+from shared_core.audit_ledger import AuditLedger
+
+DIAMOND_EDGES = [("A", "B"), ("B", "C"), ("C", "D"), ("D", "A")]
+
+
+def _ingest_node(report):
+    """Projects a text report onto [Alpha, i, j, k] via the ingestor."""
+    data = json.loads(ingestor.extract_simplicial_data(report))
+    return [float(data.get(key, 0) or 0) for key in ("alpha", "i_friction", "j_friction", "k_friction")]
+
+
+def audit_scenario(scenario):
+    """
+    Runs one scenario through ingest -> stitch -> audit.
+
+    Args:
+        scenario (dict): {
+            "id": label,
+            "nodes": {node: [Alpha, i, j, k]} (already mapped sections),
+            "reports": {node: text} (ingested for nodes without a section),
+            "edges": [[u, v], ...] (defaults to the Diamond cycle),
+            "restrictions": {"u->v": [F_u, F_v]} (optional 4x4 maps per edge)
+        }
+
+    Returns:
+        Dict with per-edge handshakes, cycle audit, total torsion and the
+        obstructed edges. Failures are reported, not raised, so one bad
+        scenario does not take down its shard.
+    """
+    scenario_id = scenario.get("id")
+    try:
+        # 1. Ingest
+        nodes = {key: list(map(float, vector)) for key, vector in scenario.get("nodes", {}).items()}
+        for key, report in scenario.get("reports", {}).items():
+            if key not in nodes:
+                nodes[key] = _ingest_node(report)
+        edges = [tuple(edge) for edge in scenario.get("edges", DIAMOND_EDGES)]
+
+        # 2. Stitch
+        restrictions = scenario.get("restrictions", {})
+        handshakes, observed = [], {}
+        for u, v in edges:
+            result = stitcher.perform_handshake(nodes[u], nodes[v], f"Edge {u}-{v}",
+                                                restriction=restrictions.get(f"{u}->{v}"))
+            handshakes.append({"edge": f"{u}->{v}", "status": result['status'], "torsion": float(result['torsion'])})
+            # The restriction-mapped difference the handshake saw, not nodes[u] - nodes[v]:
+            # plain node differences telescope to zero around every loop
+            observed[(u, v)] = result['delta']
+
+        # 3. Audit every independent loop
+        cycles = SheafValidator.audit_cycle_basis(nodes, edges, edge_deltas=observed)
+    except Exception as e:
+        return {"id": scenario_id, "status": "FAILED", "error": f"{type(e).__name__}: {e}",
+                "total_torsion": 0.0, "edges": [], "cycles": [], "obstructed_edges": []}
+
+    total_torsion = sum(h['torsion'] for h in handshakes)
+    return {
+        "id": scenario_id,
+        "status": "TOPOLOGICAL_OBSTRUCTION_DETECTED" if total_torsion > 0 else "SYSTEMIC_HARMONY",
+        "total_torsion": total_torsion,
+        "edges": handshakes,
+        "cycles": [
+            {k: cycle[k] for k in ("cycle", "closing_edge", "obstruction_edge", "accumulated_torsion",
+                                   "holonomy_norm", "status")}
+            for cycle in cycles
+        ],
+        "obstructed_edges": [h['edge'] for h in handshakes if h['status'] != "ALIGNED"]
+    }
+
+
+def _audit_shard(shard):
+    return [audit_scenario(scenario) for scenario in shard]
+
+
+def run_portfolio(scenarios, workers=None, shard_size=None):
+    """
+    Audits a portfolio of scenarios in a process pool.
+
+    Scenarios are split into contiguous shards (about 4 per worker by
+    default) so each task amortizes its pickling and dispatch cost.
+    workers=1 runs in-process.
+
+    Returns:
+        Aggregate report: portfolio totals, obstruction counts per edge,
+        timing, and the per-scenario results in input order.
+    """
+    scenarios = list(scenarios)
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, -(-len(scenarios) // (workers * 4)))
+    shards = [scenarios[i:i + shard_size] for i in range(0, len(scenarios), shard_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        shard_results = map(_audit_shard, shards)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        shard_results = executor.map(_audit_shard, shards)
+    try:
+        results = [result for shard in shard_results for result in shard]
+    finally:
+        if workers != 1:
+            executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    edge_obstructions = Counter(edge for r in results for edge in r['obstructed_edges'])
+    torsions = np.array([r['total_torsion'] for r in results]) if results else np.zeros(0)
+    return {
+        "scenarios": len(results),
+        "obstructed_scenarios": sum(r['status'] == "TOPOLOGICAL_OBSTRUCTION_DETECTED" for r in results),
+        "failed_scenarios": sum(r['status'] == "FAILED" for r in results),
+        "total_torsion": float(torsions.sum()),
+        "max_torsion": float(torsions.max()) if len(torsions) else 0.0,
+        "edge_obstructions": dict(edge_obstructions.most_common()),
+        "workers": workers,
+        "shards": len(shards),
+        "elapsed": elapsed,
+        "throughput": len(results) / elapsed if elapsed > 0 else float('inf'),
+        "results": results
+    }
+
+
+def log_portfolio(report, ledger):
+    """Appends every edge handshake of a portfolio report to the audit ledger (one group commit)."""
+    records = [
+        {
+            "kind": "handshake",
+            "edge": edge['edge'],
+            "source": str(result['id']),
+            "epoch": "Legacy_Euclidean",
+            "torsion": edge['torsion'],
+            "status": edge['status']
+        }
+        for result in report['results'] for edge in result['edges']
+    ]
+    return ledger.append_batch(records)
+
+
+def scaling_report(scenarios, worker_counts=(1, 2, 4), shard_size=None):
+    """
+    Runs the same portfolio at several pool sizes.
+    Returns one row per worker count with throughput, speedup and efficiency.
+    """
+    scenarios = list(scenarios)
+    rows = []
+    for workers in worker_counts:
+        report = run_portfolio(scenarios, workers=workers, shard_size=shard_size)
+        rows.append({"workers": workers, "elapsed": report['elapsed'], "throughput": report['throughput']})
+    baseline = rows[0]['elapsed'] * rows[0]['workers'] if rows else 0.0
+    for row in rows:
+        row['speedup'] = baseline / row['elapsed'] if row['elapsed'] > 0 else float('inf')
+        row['efficiency'] = row['speedup'] / row['workers']
+    return rows
+
+
+def synthetic_portfolio(n, seed=0):
+    """Diamond variants with random shortfalls and frictions, for load and scaling runs."""
+    rng = np.random.RandomState(seed)
+    scenarios = []
+    for idx in range(n):
+        qty = int(rng.randint(50, 500))
+        delay, surcharge, damaged = rng.choice([0, 2, 4, 8]), rng.choice([0, 0, 50, 500]), rng.choice([0, 0, 0, 3])
+        scenarios.append({
+            "id": f"SYN-{idx:06d}",
+            "nodes": {
+                "A": [qty, 0, 0, 0],
+                "B": [qty, 0, delay, 0],
+                "C": [qty, 0, delay, surcharge],
+                "D": [qty - damaged, damaged, delay, surcharge]
+            },
+            "edges": DIAMOND_EDGES
+        })
+    return scenarios
+
+
+def load_scenarios(path):
+    """Reads a portfolio from a JSON list or a JSONL file (one scenario per line)."""
+    with open(path, 'r') as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
 
 def run_diamond_audit():
     print("\n" + "="*50)
@@ -31,13 +223,21 @@ def run_diamond_audit():
     print("-"*30)
 
     # Define the edges of the Diamond: A->B, B->C, C->D, D->A (The Cycle)
-    edges = [("A", "B"), ("B", "C"), ("C", "D"), ("D", "A")]
-    total_torsion = 0
+    result = audit_scenario({"id": "DIAMOND", "nodes": nodes, "edges": DIAMOND_EDGES})
+    for handshake in result['edges']:
+        u, v = handshake['edge'].split("->")
+        print(f"{u} ➔ {v}: {handshake['status']} | Torsion: {handshake['torsion']}")
+    total_torsion = result['total_torsion']
 
-    for u, v in edges:
-        result = stitcher.perform_handshake(nodes[u], nodes[v], f"Edge {u}-{v}")
-        print(f"{u} ➔ {v}: {result['status']} | Torsion: {result['torsion']}")
-        total_torsion += result['torsion']
+    print("\n" + "-"*30)
+    print("   CYCLE BASIS AUDIT   ")
+    print("-"*30)
+
+    # Every independent loop of the complex, not just the hard-coded diamond
+    cycles = result['cycles']
+    for cycle in cycles:
+        print(f"{cycle['cycle']}: {cycle['status']} | Accumulated Torsion: {round(cycle['accumulated_torsion'], 2)} "
+              f"| Holonomy: {round(cycle['holonomy_norm'], 4)} | Closing Edge: {cycle['closing_edge']}")
 
     print("\n" + "="*50)
     print(f"FINAL AUDIT RESULT:")
@@ -45,10 +245,68 @@ def run_diamond_audit():
     
     if total_torsion > 0:
         print("STATUS: TOPOLOGICAL OBSTRUCTION DETECTED")
-        print("ADVICE: The D-A boundary cannot close. Financial leakage is likely.")
+        obstructed = [cycle for cycle in cycles if cycle['obstruction_edge'] is not None]
+        for cycle in obstructed:
+            print(f"ADVICE: The {cycle['obstruction_edge']} boundary cannot close "
+                  f"(holonomy {round(cycle['holonomy_norm'], 4)}). Financial leakage is likely.")
+        if not obstructed:
+            # Every loop closes: the torsion is local, so point at the worst edge
+            worst = max(result['edges'], key=lambda handshake: handshake['torsion'])
+            print(f"ADVICE: The {worst['edge']} boundary carries the most torsion "
+                  f"({round(worst['torsion'], 2)}). Financial leakage is likely.")
     else:
         print("STATUS: SYSTEMIC HARMONY ACHIEVED")
     print("="*50 + "\n")
 
+def print_portfolio_report(report, top=10):
+    print("\n" + "="*50)
+    print("      COOPERATIVE SHEAF LAB: PORTFOLIO AUDIT")
+    print("="*50 + "\n")
+    print(f"Scenarios: {report['scenarios']} | Workers: {report['workers']} | Shards: {report['shards']}")
+    print(f"Elapsed: {report['elapsed']:.2f}s | Throughput: {report['throughput']:.1f} scenarios/s")
+    print(f"Obstructed: {report['obstructed_scenarios']} | Failed: {report['failed_scenarios']}")
+    print(f"Total Systemic Torsion: {round(report['total_torsion'], 2)} | Max: {round(report['max_torsion'], 2)}")
+    print("\nMost obstructed edges:")
+    for edge, count in list(report['edge_obstructions'].items())[:top]:
+        print(f"  {edge}: {count}")
+    print("="*50 + "\n")
+
+
+def print_scaling_report(rows):
+    print(f"{'workers':>8} {'elapsed_s':>10} {'scen/s':>10} {'speedup':>8} {'eff':>6}")
+    for row in rows:
+        print(f"{row['workers']:>8} {row['elapsed']:>10.2f} {row['throughput']:>10.1f} "
+              f"{row['speedup']:>8.2f} {row['efficiency']:>6.2f}")
+
+
 if __name__ == "__main__":
-    run_diamond_audit()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cooperative Sheaf Lab audit runner")
+    parser.add_argument("--portfolio", help="JSON/JSONL scenario file (omit for the Diamond demo)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Audit N synthetic Diamond scenarios")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=None)
+    parser.add_argument("--scaling", help="Comma-separated worker counts, e.g. 1,2,4,8")
+    parser.add_argument("--out", help="Write the aggregate report as JSON")
+    parser.add_argument("--ledger", help="Append every edge result to this hash-chained audit ledger "
+                                         "(single writer: fails if another process, e.g. app_shadow, has it open)")
+    args = parser.parse_args()
+
+    if not args.portfolio and not args.synthetic:
+        run_diamond_audit()
+    else:
+        scenarios = load_scenarios(args.portfolio) if args.portfolio else synthetic_portfolio(args.synthetic)
+        if args.scaling:
+            print_scaling_report(scaling_report(
+                scenarios, [int(w) for w in args.scaling.split(",")], shard_size=args.shard_size
+            ))
+        else:
+            report = run_portfolio(scenarios, workers=args.workers, shard_size=args.shard_size)
+            print_portfolio_report(report)
+            if args.ledger:
+                ledger = AuditLedger(args.ledger)
+                seqs = log_portfolio(report, ledger)
+                print(f"Ledger: {len(seqs)} records appended to {args.ledger} (chain ok: {ledger.verify()['ok']})")
+                ledger.close()
+            if args.out:
+                with open(args.out, 'w') as f:
+                    json.dump(report, f, indent=2)
\ No newline at end of file
@@ -1,7 +1,10 @@
 import numpy as np
 import hashlib
 import secrets
+import threading
 import time
+from functools import lru_cache
+from types import MappingProxyType
 
 class Quaternion:
     """
@@ -36,88 +39,357 @@ class Quaternion:
     def conjugate(self):
         return Quaternion(self.w, -self.x, -self.y, -self.z)
 
+# --- SHAMIR FIELD ARITHMETIC (GF(p), p = 2^61 - 1) ---
+PRIME = (1 << 61) - 1
+_P = np.uint64(PRIME)
+_MASK31 = np.uint64((1 << 31) - 1)
+_MASK30 = np.uint64((1 << 30) - 1)
+
+
+def _mod_reduce(s):
+    # s < 2^64 -> s mod p, using 2^61 = 1 (mod p)
+    r = (s & _P) + (s >> np.uint64(61))
+    return np.where(r >= _P, r - _P, r)
+
+
+def mulmod(a, b):
+    """
+    Vectorized a * b mod (2^61 - 1) for uint64 arrays with a, b < p.
+    Splits both factors into 31-bit halves so no partial product
+    overflows 64 bits.
+    """
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    a1, a0 = a >> np.uint64(31), a & _MASK31
+    b1, b0 = b >> np.uint64(31), b & _MASK31
+    mid = a1 * b0 + a0 * b1                      # < 2^62
+    # a1*b1*2^62 = 2*a1*b1 ; mid*2^31 = (mid >> 30) + (mid & (2^30 - 1)) * 2^31
+    s = np.uint64(2) * (a1 * b1) + (mid >> np.uint64(30)) + ((mid & _MASK30) << np.uint64(31))
+    return _mod_reduce(_mod_reduce(s) + _mod_reduce(a0 * b0))
+
+
+def addmod(a, b):
+    s = np.asarray(a, dtype=np.uint64) + np.asarray(b, dtype=np.uint64)
+    return np.where(s >= _P, s - _P, s)
+
+
+@lru_cache(maxsize=4096)
+def _lagrange_at_zero(xs):
+    coeffs = []
+    for i, x_i in enumerate(xs):
+        num, den = 1, 1
+        for j, x_j in enumerate(xs):
+            if i != j:
+                num = num * x_j % PRIME
+                den = den * (x_j - x_i) % PRIME
+        coeffs.append(num * pow(den, PRIME - 2, PRIME) % PRIME)
+    coeffs = np.array(coeffs, dtype=np.uint64)
+    coeffs.setflags(write=False)
+    return coeffs
+
+
+def lagrange_coefficients(xs):
+    """
+    Lagrange basis coefficients at x = 0 for the share abscissas xs, so that
+    f(0) = sum_i lambda_i f(x_i). Cached per subset (order preserved).
+    """
+    xs = tuple(int(x) for x in xs)
+    if len(set(xs)) != len(xs):
+        raise ValueError("Duplicate shard index in reconstruction subset.")
+    return _lagrange_at_zero(xs)
+
+
+def split_secrets(secrets_batch, xs, threshold, rng=None):
+    """
+    (threshold, n) Shamir sharing of many secrets at once.
+
+    Args:
+        secrets_batch: (batch,) integers < PRIME.
+        xs: (n,) distinct non-zero share abscissas.
+        threshold (int): k, the number of shards needed to reconstruct.
+        rng (np.random.Generator, optional): Source of the polynomial noise;
+            seeded from OS entropy by default.
+
+    Returns:
+        (batch, n) uint64 shares f(x_j).
+    """
+    rng = rng or np.random.default_rng(secrets.randbits(128))
+    values = np.atleast_1d(np.asarray(secrets_batch, dtype=np.uint64))
+    xs = np.asarray(xs, dtype=np.uint64)
+    if threshold < 1 or threshold > len(xs):
+        raise ValueError(f"Invalid threshold {threshold} for {len(xs)} shards.")
+    coeffs = rng.integers(0, PRIME, size=(len(values), threshold - 1), dtype=np.uint64)
+
+    # Horner: f(x) = s + a_1 x + ... + a_{k-1} x^{k-1}
+    shares = np.zeros((len(values), len(xs)), dtype=np.uint64)
+    for c in range(threshold - 2, -1, -1):
+        shares = addmod(mulmod(shares, xs[None, :]), coeffs[:, c:c + 1])
+    return addmod(mulmod(shares, xs[None, :]), values[:, None])
+
+
+def reconstruct_secrets(xs, shares):
+    """
+    Batch reconstruction f(0) for many secrets sharing one subset of shards.
+
+    Args:
+        xs: (k,) abscissas of the shards used.
+        shares: (batch, k) share values at xs.
+
+    Returns:
+        (batch,) uint64 secrets.
+    """
+    shares = np.atleast_2d(np.asarray(shares, dtype=np.uint64))
+    coeffs = lagrange_coefficients(xs)
+    total = np.zeros(len(shares), dtype=np.uint64)
+    for i in range(len(coeffs)):
+        total = addmod(total, mulmod(shares[:, i], coeffs[i]))
+    return total
+
+
+class EpochSnapshot:
+    """
+    Immutable view of one published epoch: membership, shards and the
+    Shadow Basis reconstructed from them. Handshake batches pin one
+    snapshot, so an epoch shift never changes the basis mid-batch.
+    Duck-types the vault interface used by the stitcher.
+    """
+    __slots__ = ("epoch_id", "master_salt", "active_nodes", "shards", "basis")
+
+    def __init__(self, epoch_id, master_salt, active_nodes, shards, basis):
+        self.epoch_id = epoch_id
+        self.master_salt = master_salt
+        self.active_nodes = tuple(active_nodes)
+        self.shards = MappingProxyType(dict(shards))
+        self.basis = basis
+
+    def synthesize_sheaf_laplacian(self):
+        return self.basis
+
+    def __reduce__(self):
+        return (EpochSnapshot, (self.epoch_id, self.master_salt, self.active_nodes, dict(self.shards), self.basis))
+
+
 class SecureEpochVault:
     """
-    Implements (2, 3) Threshold Logic with Epoch Shifting.
+    Implements (k, n) Threshold Logic with Epoch Shifting.
     Simulates Sovereign-Grade Resilience.
+
+    The epoch secret is Shamir-shared over GF(2^61 - 1) across the active
+    regions; any 'threshold' of them reconstruct it. Each region keeps a
+    fixed abscissa for its lifetime, so Lagrange coefficients are cached per
+    active subset and reused until membership changes.
+
+    Epochs are double-buffered: the next epoch's snapshot is precomputed in
+    a background thread, and a shift publishes it with a single reference
+    swap. Readers never lock and never see a half-built epoch.
     """
-    def __init__(self, master_salt):
-        self.epoch_id = 1
+    def __init__(self, master_salt, regions=None, threshold=2):
         self.master_salt = master_salt
-        self.regions = ["US", "EU", "CN"]
-        self.active_nodes = ["US", "EU", "CN"] # All healthy initially
+        self.regions = list(regions or ["US", "EU", "CN"])
+        self.active_nodes = list(self.regions) # All healthy initially
+        self.threshold = threshold
         self.polynomial_coeffs = None
-        self.shards = {}
-        
+        self._abscissa = {region: idx for idx, region in enumerate(self.regions, 1)}
+        if not 1 <= threshold <= len(self.regions):
+            raise ValueError(f"Invalid threshold {threshold} for {len(self.regions)} regions.")
+        self._shift_lock = threading.Lock()
+        self._staged = None
+        self._precompute = None
+
         # Initialize Epoch 1
-        self._generate_epoch_basis()
+        self._current = self._build_snapshot(1, self.active_nodes)
+        self._announce()
+        self._stage_next()
+
+    # --- PUBLISHED STATE (lock-free reads) ---
+    def snapshot(self):
+        """The current epoch, consistent as a whole."""
+        return self._current
+
+    @property
+    def epoch_id(self):
+        return self._current.epoch_id
 
-    def _generate_epoch_basis(self):
+    @property
+    def shards(self):
+        return self._current.shards
+
+    def _epoch_secret(self, epoch_id=None):
+        # Deterministic Secret for this Epoch
+        context = f"{self.master_salt}_EPOCH_{epoch_id or self.epoch_id}"
+        return int(hashlib.sha256(context.encode()).hexdigest(), 16) % PRIME
+
+    def _build_snapshot(self, epoch_id, active_nodes):
         """
-        Generates a random polynomial f(x) = Secret + a1*x
-        Where 'Secret' is derived from the Master Salt + Current Epoch.
+        Generates a random polynomial f(x) = Secret + a1*x + ... + a_{k-1}*x^{k-1}
+        Where 'Secret' is derived from the Master Salt + Current Epoch, shards
+        it across active_nodes and reconstructs the basis from the shards.
         """
-        # 1. Deterministic Secret for this Epoch
-        context = f"{self.master_salt}_EPOCH_{self.epoch_id}"
-        epoch_secret_int = int(hashlib.sha256(context.encode()).hexdigest(), 16) % (10**10)
-        
-        # 2. Random slope for the polynomial (The "Noise")
-        slope = secrets.randbelow(10**5)
-        
-        self.polynomial_coeffs = (epoch_secret_int, slope)
-        
-        # 3. Distribute Shards f(1), f(2), f(3)
-        self.shards = {}
-        for idx, region in enumerate(self.regions, 1):
-            val = epoch_secret_int + (slope * idx)
-            self.shards[region] = (idx, val)
-            
-        print(f"\n[EPOCH {self.epoch_id} ONLINE] Secret distributed via (2, 3) Threshold.")
+        active_nodes = tuple(active_nodes)
+        xs = [self._abscissa[region] for region in active_nodes]
+        shares = split_secrets([self._epoch_secret(epoch_id)], xs, self.threshold)[0]
+        shards = {region: (x, int(v)) for region, x, v in zip(active_nodes, xs, shares)}
+        secret = _recombine(shards, active_nodes, self.threshold)
+        basis = _shadow_basis(secret) if secret is not None else None
+        return EpochSnapshot(epoch_id, self.master_salt, active_nodes, shards, basis)
+
+    def _announce(self):
+        print(f"\n[EPOCH {self.epoch_id} ONLINE] Secret distributed via "
+              f"({self.threshold}, {len(self._current.active_nodes)}) Threshold.")
+
+    def _stage_next(self):
+        # Back buffer: next epoch for the current membership, built off the read path
+        epoch_id, members = self.epoch_id + 1, tuple(self.active_nodes)
+
+        def build():
+            self._staged = self._build_snapshot(epoch_id, members)
+
+        self._precompute = threading.Thread(target=build, daemon=True)
+        self._precompute.start()
 
     def heartbeat_check(self, failing_region=None):
         """
         Simulates a network check. If a region fails, trigger Epoch Shift.
         """
-        if failing_region and failing_region in self.active_nodes:
-            print(f"⚠️ ALERT: Region_{failing_region} heartbeat lost.")
-            self.active_nodes.remove(failing_region)
+        with self._shift_lock:
+            # Test and remove under one lock: concurrent reports of the same region shift once
+            if failing_region and failing_region in self.active_nodes:
+                print(f"⚠️ ALERT: Region_{failing_region} heartbeat lost.")
+                self.active_nodes.remove(failing_region)
+                self._trigger_epoch_shift()
+                return
+        print(f"✓ Heartbeat Nominal. Active: {self.active_nodes}")
+
+    def join_region(self, region):
+        """
+        Admits a new (or recovered) region and re-shares under a new epoch.
+        """
+        with self._shift_lock:
+            if region in self.active_nodes:
+                return
+            if region not in self._abscissa:
+                self._abscissa[region] = max(self._abscissa.values(), default=0) + 1
+                self.regions.append(region)
+            print(f"➕ Region_{region} joining consensus.")
+            self.active_nodes.append(region)
+            self._trigger_epoch_shift()
+
+    def rotate_epoch(self):
+        """Scheduled re-key with unchanged membership (uses the precomputed epoch)."""
+        with self._shift_lock:
             self._trigger_epoch_shift()
-        else:
-            print(f"✓ Heartbeat Nominal. Active: {self.active_nodes}")
 
     def _trigger_epoch_shift(self):
         """
         Re-keys the system using the remaining nodes.
         Forward Secrecy: Old keys are mathematically obsolete.
+        Caller holds _shift_lock.
         """
         print(f"⚙️ EXECUTING EPOCH SHIFT to Epoch {self.epoch_id + 1}...")
         
-        if len(self.active_nodes) < 2:
+        if len(self.active_nodes) < self.threshold:
+            # Publish the fracture: no shards, no basis (synthesize -> None), so
+            # readers stop stitching against the last healthy epoch
+            self._precompute.join()
+            self._staged = None
+            self._current = EpochSnapshot(self.epoch_id + 1, self.master_salt, self.active_nodes, {}, None)
+            print(f"\n[EPOCH {self.epoch_id} FRACTURED] {len(self.active_nodes)} of {self.threshold} "
+                  f"required regions active.")
             raise SystemError("CRITICAL FAILURE: Insufficient nodes for consensus.")
-            
-        self.epoch_id += 1
-        self.shards = {} # FLUSH old shards (Forward Secrecy)
-        self._generate_epoch_basis()
+
+        # Take the back buffer if it was built for this membership
+        self._precompute.join()
+        staged, self._staged = self._staged, None
+        if staged is None or staged.active_nodes != tuple(self.active_nodes):
+            staged = self._build_snapshot(self.epoch_id + 1, self.active_nodes)
+
+        self._current = staged # Atomic publish; old shards are dropped with the old snapshot
+        self._announce()
+        self._stage_next()
         print(f"✓ RECOVERY COMPLETE. New Basis generated for {self.active_nodes}")
 
+    def reconstruct_secret(self, regions=None):
+        """
+        Recombines the epoch secret from 'threshold' shards (the first
+        available of 'regions', default the active ones). None if too few.
+        """
+        snapshot = self._current
+        return _recombine(snapshot.shards, regions or snapshot.active_nodes, self.threshold)
+
     def synthesize_sheaf_laplacian(self):
         """
         Reconstructs the Secret to generate the Basis Matrix.
+        (Reconstructed once per epoch when the snapshot is built.)
         """
-        if len(self.active_nodes) < 2:
-            return None
-            
-        context = f"{self.master_salt}_EPOCH_{self.epoch_id}"
-        seed_hash = hashlib.sha256(context.encode()).hexdigest()
-        np.random.seed(int(seed_hash, 16) % (2**32))
-        
-        # The Mayer-Vietoris "Shadow Patch"
-        return Quaternion(
-            1.0, 
-            np.random.normal(0, 0.5),  # High Logistic Friction (i)
-            np.random.normal(0, 0.1),  # Moderate Temporal Friction (j)
-            np.random.normal(0, 0.05)  # Low Financial Friction (k)
-        )
+        return self._current.basis
+
+
+def _recombine(shards, regions, threshold):
+    regions = [r for r in regions if r in shards][:threshold]
+    if len(regions) < threshold:
+        return None
+    xs = [shards[r][0] for r in regions]
+    ys = [[shards[r][1] for r in regions]]
+    return int(reconstruct_secrets(xs, ys)[0])
+
+
+def _shadow_basis(secret):
+    # Local generator: no global numpy seed is touched
+    rng = np.random.RandomState(secret % (2**32))
+
+    # The Mayer-Vietoris "Shadow Patch"
+    return Quaternion(
+        1.0,
+        rng.normal(0, 0.5),  # High Logistic Friction (i)
+        rng.normal(0, 0.1),  # Moderate Temporal Friction (j)
+        rng.normal(0, 0.05)  # Low Financial Friction (k)
+    )
+
+
+def membership_latency_report(n_regions=48, threshold=16, batch=10000, events=20, seed=0):
+    """
+    Measures reconstruction latency while regions leave and join.
+
+    For every membership event a batch of epoch secrets is shared across the
+    active regions and reconstructed from the first 'threshold' of them.
+    'cold' includes computing the Lagrange coefficients for the new subset;
+    'warm' is a repeat reconstruction with the cached coefficients.
+    """
+    rng = np.random.default_rng(seed)
+    regions = list(range(1, n_regions + 1))
+    active = list(regions)
+    rows = []
+    for event in range(events):
+        # Alternate leave / join, never dropping below the threshold
+        if event % 2 == 0 and len(active) > threshold:
+            change = ("LEAVE", active.pop(int(rng.integers(len(active)))))
+        else:
+            offline = [r for r in regions if r not in active]
+            change = ("JOIN", offline[int(rng.integers(len(offline)))]) if offline else ("NONE", None)
+            if change[1] is not None:
+                active.append(change[1])
+
+        epoch_secrets = rng.integers(0, PRIME, size=batch, dtype=np.uint64)
+        shares = split_secrets(epoch_secrets, active, threshold, rng=rng)
+        subset, ys = active[:threshold], shares[:, :threshold]
+
+        start = time.perf_counter()
+        recovered = reconstruct_secrets(subset, ys)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        reconstruct_secrets(subset, ys)
+        warm = time.perf_counter() - start
+
+        rows.append({
+            "event": change[0],
+            "region": change[1],
+            "active": len(active),
+            "cold_ms": cold * 1000,
+            "warm_ms": warm * 1000,
+            "per_secret_us": warm / batch * 1e6,
+            "exact": bool(np.array_equal(recovered, epoch_secrets))
+        })
+    return rows
 
 # --- EXECUTION TEST ---
 if __name__ == "__main__":
@@ -134,4 +406,10 @@ if __name__ == "__main__":
     
     # 3. Verify Resilience
     new_basis_q = vault.synthesize_sheaf_laplacian()
-    print(f"Epoch {vault.epoch_id} Shadow Basis: {new_basis_q}")
\ No newline at end of file
+    print(f"Epoch {vault.epoch_id} Shadow Basis: {new_basis_q}")
+
+    # 4. Reconstruction latency under churn
+    print("\n--- MEMBERSHIP CHURN (48 regions, threshold 16) ---")
+    for row in membership_latency_report():
+        print(f"{row['event']:>5} {str(row['region']):>4} | active {row['active']:>2} | "
+              f"cold {row['cold_ms']:.2f} ms | warm {row['warm_ms']:.2f} ms | exact {row['exact']}")
\ No newline at end of file
@@ -0,0 +1,369 @@
+"""
+Shared Vault Service.
+
+One SecureEpochVault per process (VaultService), optionally exposed to
+other processes over a local socket (VaultServer / VaultClient). All
+sessions then share one epoch history, the basis is built once per epoch,
+and epoch shifts are pushed to subscribers instead of being polled.
+
+Both VaultService and VaultClient duck-type the vault interface used by
+the stitcher (snapshot(), synthesize_sheaf_laplacian(), epoch_id), so
+callers such as stitcher.perform_handshake behave exactly as with a
+private vault.
+"""
+
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from private_core.pwp_core_engine import EpochSnapshot, SecureEpochVault
+
+DEFAULT_ADDRESS = ("127.0.0.1", 6071)
+AUTHKEY_ENV = "VAULT_SERVICE_AUTHKEY"            # The key itself
+AUTHKEY_FILE_ENV = "VAULT_SERVICE_AUTHKEY_FILE"  # Or a 0600 file holding it
+
+
+def _public(snapshot):
+    # Shards and the master salt never leave the service process
+    return EpochSnapshot(snapshot.epoch_id, None, snapshot.active_nodes, {}, snapshot.basis)
+
+
+class VaultService:
+    """
+    Thread-safe, process-level owner of one vault.
+
+    - Reads (snapshot, basis, epoch) are lock-free: they return the vault's
+      published snapshot.
+    - Mutations are serialized; after each one that changes the epoch,
+      subscribers are called with the new snapshot and waiters are woken.
+    """
+
+    def __init__(self, master_salt, regions=None, threshold=2):
+        self._config = (master_salt, regions, threshold)
+        self._vault = SecureEpochVault(master_salt, regions=regions, threshold=threshold)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._subscribers = []
+
+    # --- VAULT INTERFACE ---
+    def snapshot(self):
+        return self._vault.snapshot()
+
+    def synthesize_sheaf_laplacian(self):
+        return self._vault.snapshot().synthesize_sheaf_laplacian()
+
+    @property
+    def epoch_id(self):
+        return self._vault.snapshot().epoch_id
+
+    @property
+    def master_salt(self):
+        return self._vault.master_salt
+
+    @property
+    def active_nodes(self):
+        return list(self._vault.snapshot().active_nodes)
+
+    def heartbeat_check(self, failing_region=None):
+        return self._mutate(self._vault.heartbeat_check, failing_region)
+
+    def join_region(self, region):
+        return self._mutate(self._vault.join_region, region)
+
+    def rotate_epoch(self):
+        return self._mutate(self._vault.rotate_epoch)
+
+    def reset(self):
+        """Fresh vault with the original configuration (epoch history restarts)."""
+        def rebuild():
+            master_salt, regions, threshold = self._config
+            self._vault = SecureEpochVault(master_salt, regions=regions, threshold=threshold)
+        return self._mutate(rebuild)
+
+    # --- NOTIFICATIONS ---
+    def subscribe(self, callback):
+        """Calls callback(snapshot) after every epoch change. Returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def wait_for_change(self, known_epoch, timeout=None):
+        """
+        Blocks until the published snapshot differs from 'known_epoch'
+        (an EpochSnapshot or None). Returns the current snapshot.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._vault.snapshot() is not known_epoch, timeout)
+            return self._vault.snapshot()
+
+    def _mutate(self, operation, *args):
+        with self._lock:
+            before = self._vault.snapshot()
+            try:
+                result = operation(*args)
+            finally:
+                after = self._vault.snapshot()
+                subscribers = list(self._subscribers) if after is not before else []
+                if after is not before:
+                    with self._changed:
+                        self._changed.notify_all()
+        for callback in subscribers:
+            try:
+                callback(after)
+            except Exception as e:
+                print(f"⚠️ Vault subscriber failed: {e}")
+        return result
+
+
+_SERVICES = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_vault_service(master_salt, regions=None, threshold=2):
+    """The process-wide VaultService for a master salt (created on first use)."""
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(master_salt)
+        if service is None:
+            service = _SERVICES[master_salt] = VaultService(master_salt, regions=regions, threshold=threshold)
+        return service
+
+
+class VaultServer:
+    """
+    Serves a VaultService on a local socket (multiprocessing.connection).
+
+    Requests are (op, args) tuples answered with ("ok", value) or
+    ("error", message). The "subscribe" op turns the connection into a
+    push channel that receives each new public snapshot.
+    """
+
+    READ_OPS = ("snapshot",)
+    WRITE_OPS = ("heartbeat_check", "join_region", "rotate_epoch", "reset")
+
+    def __init__(self, service, address=DEFAULT_ADDRESS, authkey=None):
+        self.service = service
+        # Messages are unpickled after the handshake: never serve without a secret
+        self.authkey = _require_authkey(authkey)
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._closed = threading.Event()
+        self._thread = None
+
+    def serve_forever(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, AuthenticationError):
+                if self._closed.is_set():
+                    break
+                continue  # Failed handshake (bad authkey): keep serving
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def start(self):
+        """Serves from a background thread. Returns self."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._closed.set()
+        self._listener.close()
+
+    def _handle(self, conn):
+        try:
+            while not self._closed.is_set():
+                op, args = conn.recv()
+                if op == "subscribe":
+                    self._push(conn)
+                    return
+                try:
+                    if op in self.READ_OPS:
+                        value = _public(self.service.snapshot())
+                    elif op in self.WRITE_OPS:
+                        getattr(self.service, op)(*args)
+                        value = _public(self.service.snapshot())
+                    else:
+                        raise ValueError(f"Unknown vault operation: {op}")
+                    conn.send(("ok", value))
+                except Exception as e:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _push(self, conn):
+        known = self.service.snapshot()
+        conn.send(_public(known))
+        while not self._closed.is_set():
+            current = self.service.wait_for_change(known, timeout=1.0)
+            if current is not known:
+                known = current
+                conn.send(_public(current))
+
+
+class VaultClient:
+    """
+    Remote handle on a VaultServer with a locally cached snapshot.
+
+    Reads never touch the socket: a subscriber thread keeps the cached
+    snapshot current from the server's push channel. Mutations are sent
+    on a separate request connection.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=None):
+        self.address = address
+        self.authkey = _require_authkey(authkey)
+        self._conn = Client(address, authkey=self.authkey)
+        self._request_lock = threading.Lock()
+        self._callbacks = []
+        self._snapshot = self._request("snapshot")
+        self._ready = threading.Event()
+        threading.Thread(target=self._listen, daemon=True).start()
+        self._ready.wait(timeout=5.0)
+
+    def snapshot(self):
+        return self._snapshot
+
+    def synthesize_sheaf_laplacian(self):
+        return self._snapshot.synthesize_sheaf_laplacian()
+
+    @property
+    def epoch_id(self):
+        return self._snapshot.epoch_id
+
+    @property
+    def active_nodes(self):
+        return list(self._snapshot.active_nodes)
+
+    def heartbeat_check(self, failing_region=None):
+        self._update(self._request("heartbeat_check", failing_region))
+
+    def join_region(self, region):
+        self._update(self._request("join_region", region))
+
+    def rotate_epoch(self):
+        self._update(self._request("rotate_epoch"))
+
+    def reset(self):
+        self._update(self._request("reset"))
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+        return lambda: self._callbacks.remove(callback) if callback in self._callbacks else None
+
+    def close(self):
+        self._conn.close()
+
+    def _request(self, op, *args):
+        with self._request_lock:
+            self._conn.send((op, args))
+            status, value = self._conn.recv()
+        if status != "ok":
+            raise SystemError(value)
+        return value
+
+    def _update(self, snapshot):
+        # The push channel and request replies can deliver the same epoch twice
+        current = self._snapshot
+        if snapshot.epoch_id == current.epoch_id and snapshot.active_nodes == current.active_nodes:
+            return
+        self._snapshot = snapshot
+        for callback in list(self._callbacks):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Vault subscriber failed: {e}")
+
+    def _listen(self):
+        try:
+            with Client(self.address, authkey=self.authkey) as conn:
+                conn.send(("subscribe", ()))
+                self._update(conn.recv())
+                self._ready.set()
+                while True:
+                    self._update(conn.recv())
+        except (EOFError, OSError):
+            self._ready.set()
+
+
+def load_authkey():
+    """
+    The shared secret from VAULT_SERVICE_AUTHKEY, or from the file named by
+    VAULT_SERVICE_AUTHKEY_FILE. Returns None if neither is set.
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode()
+    path = os.environ.get(AUTHKEY_FILE_ENV)
+    if not path:
+        return None
+    if os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"Vault key file {path} must not be readable by group/others (chmod 600).")
+    with open(path, "rb") as f:
+        key = f.read().strip()
+    return key or None
+
+
+def create_authkey(path):
+    """
+    Writes a fresh random key to 'path' (mode 0600, must not exist) and
+    exports it via VAULT_SERVICE_AUTHKEY_FILE to child processes.
+    """
+    key = os.urandom(32).hex().encode()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    os.environ[AUTHKEY_FILE_ENV] = os.path.abspath(path)
+    return key
+
+
+def _require_authkey(authkey):
+    key = authkey if authkey is not None else load_authkey()
+    if not key:
+        raise ValueError(f"No vault authkey: set {AUTHKEY_ENV} or {AUTHKEY_FILE_ENV} "
+                         f"(the service never falls back to a built-in key).")
+    return key
+
+
+def connect_or_create(master_salt):
+    """
+    A VaultClient when VAULT_SERVICE_ADDRESS ("host:port") is set, so worker
+    processes share one vault; otherwise this process's VaultService.
+    The client authenticates with VAULT_SERVICE_AUTHKEY(_FILE).
+    """
+    address = os.environ.get("VAULT_SERVICE_ADDRESS")
+    if address:
+        host, port = address.rsplit(":", 1)
+        return VaultClient((host, int(port)))
+    return get_vault_service(master_salt)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared Sovereign Vault service")
+    parser.add_argument("--salt", default="White_Piece_Live_Session")
+    parser.add_argument("--host", default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--key-file", help=f"Create a random 0600 key file here when {AUTHKEY_ENV}/"
+                                           f"{AUTHKEY_FILE_ENV} are unset")
+    args = parser.parse_args()
+
+    authkey = load_authkey()
+    if authkey is None:
+        if not args.key_file:
+            parser.error(f"set {AUTHKEY_ENV} or {AUTHKEY_FILE_ENV}, or pass --key-file to generate a key")
+        authkey = create_authkey(args.key_file)
+        print(f"🔑 New vault key written to {args.key_file}. "
+              f"Clients: export {AUTHKEY_FILE_ENV}={os.path.abspath(args.key_file)}")
+
+    server = VaultServer(get_vault_service(args.salt), address=(args.host, args.port), authkey=authkey)
+    print(f"🛡️ Vault service listening on {server.address[0]}:{server.address[1]}")
+    server.serve_forever()
@@ -33,7 +33,7 @@ REFERENCE:
 
 import time
 import random
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterable, Tuple, Union
 
 class ActionHandler:
     """
@@ -41,9 +41,11 @@ class ActionHandler:
     Gradient Vector (Messages) to edge nodes.
     """
 
-    def __init__(self):
+    def __init__(self, outbox=None):
         # Simulating the Graph State (The Complex K)
         self.topology_state = "STABLE" 
+        # Optional GradientOutbox for non-blocking propagation
+        self.outbox = outbox
 
     def execute_surgery(self, target_node: str, new_instruction: Dict[str, Any]) -> bool:
         """
@@ -66,6 +68,22 @@ class ActionHandler:
             print("[ALERT] GRADIENT BLOCKED. Torsion Accumulating.")
             return False
 
+    def dispatch_surgery(self, target_nodes: Union[str, Iterable[str]], new_instruction: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Non-blocking Topological Operator.
+        Commits the intent (K -> K') and enqueues one Gradient per target node
+        on the outbox. Returns {target_node: message_id} for status polling.
+        """
+        if self.outbox is None:
+            raise RuntimeError("dispatch_surgery requires a GradientOutbox.")
+        if isinstance(target_nodes, str):
+            target_nodes = [target_nodes]
+
+        self.topology_state = "TRANSITIONING"
+        dispatched = {node: self.outbox.enqueue(node, new_instruction) for node in target_nodes}
+        print(f"[OP] SURGERY QUEUED: {len(dispatched)} Gradient(s) in the Outbox.")
+        return dispatched
+
     def _propagate_gradient(self, target_node: str, payload: Dict, max_retries: int = 3) -> bool:
         """
         Treats message delivery as a force vector. 
@@ -0,0 +1,254 @@
+"""
+MODULE: dedup.py
+CONTEXT: THE ECHO FILTER (Near-Duplicate Reports)
+
+MATHEMATICAL AXIOMS (SET SIMILARITY):
+Drivers and ports re-send the same report with cosmetic changes (a new
+footer, a re-typed note). Each echo is the same Ghost Node observed twice;
+extracting it again wastes the Restriction Map and splits one signal into
+two artifacts.
+
+1. SHINGLES:
+   A sanitized text T is the set S(T) of its overlapping k-character
+   windows. Two reports are near-duplicates when their Jaccard similarity
+       J(A, B) = |S(A) & S(B)| / |S(A) | S(B)|
+   exceeds a threshold.
+
+2. MINHASH:
+   For a random hash h, P[min h(S(A)) == min h(S(B))] = J(A, B).
+   A signature of n such minima estimates J as the fraction of equal slots.
+   We use one-permutation hashing: each shingle is hashed once and routed
+   to one of n bins by its top bits, keeping the minimum per bin; empty bins
+   borrow from the next filled bin (rotation densification). Cost is
+   O(|S|) instead of O(n |S|).
+
+3. LOCALITY-SENSITIVE HASHING:
+   The signature is cut into b bands of r rows. Reports sharing any whole
+   band become candidates, with probability 1 - (1 - J^r)^b: an S-curve
+   that is steep around (1/b)^(1/r). Only candidates are compared, so a
+   lookup costs O(b) dictionary probes, independent of the corpus size.
+
+CONSTRAINT:
+   Similar text is not the same signal: "received 97 units" and "received
+   100 units" are near-identical strings. A near match is only reused when
+   its guard key (by default, every number in the text) is identical.
+   Exact duplicates (same sha256 of the normalized text) always short-circuit.
+
+REFERENCE:
+   Broder (1997), "On the resemblance and containment of documents".
+   "The Shape of Agreement", Nevalainen (2025).
+   Volume II, Chapter 3: The Universal Translator.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_WHITESPACE = re.compile(r"\s+")
+
+_MIX = np.uint64(0x94D049BB133111EB)
+_VALUE_MASK = np.uint64((1 << 56) - 1)
+_EMPTY = np.uint64(2**64 - 1)
+_ROTATION = np.uint64(1 << 56)
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case, whitespace-collapsed form used for hashing."""
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+def numeric_guard(text: str) -> Hashable:
+    """Default guard: the sequence of numbers in the text."""
+    return tuple(_NUMBER.findall(text))
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index from report text to a previous extraction.
+
+    lookup() returns the best earlier entry with estimated similarity
+    >= threshold (exact sha256 matches first); add() registers a new one.
+    The index keeps at most 'capacity' entries, evicting the oldest.
+    lookup/add/discard are thread-safe (one index can back several workers).
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, bands: int = 32,
+                 shingle: int = 5, capacity: int = 100_000,
+                 guard: Optional[Callable[[str], Hashable]] = numeric_guard, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.capacity = capacity
+        self.guard = guard
+
+        if num_perm & (num_perm - 1):
+            raise ValueError("num_perm must be a power of two.")
+        self._bin_shift = np.uint64(64 - (num_perm.bit_length() - 1))
+        rng = np.random.RandomState(seed)
+        self._mult, self._offset = (np.uint64(v) | np.uint64(1) for v in rng.randint(0, 2**62, size=2, dtype=np.int64))
+        self._window = np.uint64(1099511628211) ** np.arange(shingle, dtype=np.uint64)[::-1]
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # Signature rows by slot; evicted/discarded entries return their slot to the free list
+        self._signatures = np.zeros((min(capacity, 1024), num_perm), dtype=np.uint64)
+        self._free_slots = []
+        self._next_slot = 0
+        self._exact: Dict[str, int] = {}
+        self._buckets = [dict() for _ in range(bands)]
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "near_hits": 0, "guard_rejects": 0, "misses": 0, "lookup_seconds": 0.0}
+
+    # --- HASHING ---
+    def signature(self, normalized: str) -> np.ndarray:
+        """MinHash signature (num_perm,) of a normalized text."""
+        data = np.frombuffer(normalized.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        if len(data) < self.shingle:
+            data = np.pad(data, (0, self.shingle - len(data)))
+        # Polynomial hash of every k-byte window, then one 64-bit mix per shingle
+        h = np.lib.stride_tricks.sliding_window_view(data, self.shingle) @ self._window
+        h = h * self._mult + self._offset
+        h ^= h >> np.uint64(31)
+        h *= _MIX
+        h ^= h >> np.uint64(29)
+
+        # One permutation: top bits pick the bin, the rest is the value to minimize
+        bins = (h >> self._bin_shift).astype(np.intp)
+        values = h & _VALUE_MASK
+        order = np.argsort(values)[::-1]
+        sig = np.full(self.num_perm, _EMPTY, dtype=np.uint64)
+        sig[bins[order]] = values[order]  # Last write wins: the minimum
+
+        # Rotation densification: empty bin <- next filled bin (circular) + distance
+        empty = sig == _EMPTY
+        if empty.any():
+            filled = np.flatnonzero(~empty)
+            slots = np.flatnonzero(empty)
+            source = filled[np.searchsorted(filled, slots) % len(filled)]
+            distance = ((source - slots) % self.num_perm).astype(np.uint64)
+            sig[slots] = sig[source] + distance * _ROTATION
+        return sig
+
+    def _band_keys(self, signature: np.ndarray):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    # --- INDEX ---
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"match": "EXACT" | "NEAR", "similarity", "entry_id",
+        "payload", "artifact"} for the best earlier report, or None.
+        """
+        start = time.perf_counter()
+        try:
+            normalized = normalize_text(text)
+            digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+            with self._lock:
+                entry_id = self._exact.get(digest)
+                if entry_id is not None:
+                    self.stats["exact_hits"] += 1
+                    return self._hit("EXACT", 1.0, entry_id)
+
+            signature = self.signature(normalized)
+            guard_key = self.guard(text) if self.guard else None
+            with self._lock:
+                return self._near_match(signature, guard_key)
+        finally:
+            with self._lock:
+                self.stats["lookup_seconds"] += time.perf_counter() - start
+
+    def _near_match(self, signature, guard_key):
+        # Called under the lock
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        if not candidates:
+            self.stats["misses"] += 1
+            return None
+
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        slots = np.fromiter((self._entries[i]["slot"] for i in ids.tolist()), dtype=np.int64, count=len(ids))
+        similarity = (self._signatures[slots] == signature).mean(axis=1)
+        for pos in np.argsort(-similarity, kind="stable"):
+            if similarity[pos] < self.threshold:
+                break
+            entry_id = int(ids[pos])
+            if self.guard and self._entries[entry_id]["guard"] != guard_key:
+                self.stats["guard_rejects"] += 1
+                continue
+            self.stats["near_hits"] += 1
+            return self._hit("NEAR", float(similarity[pos]), entry_id)
+        self.stats["misses"] += 1
+        return None
+
+    def add(self, text: str, payload: Dict[str, Any], artifact: Optional[str] = None) -> int:
+        """Registers an extracted report. Returns its entry id."""
+        normalized = normalize_text(text)
+        signature = self.signature(normalized)
+        entry = {
+            "digest": hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+            "bands": self._band_keys(signature),
+            "guard": self.guard(text) if self.guard else None,
+            "payload": payload,
+            "artifact": artifact
+        }
+        with self._lock:
+            while len(self._entries) >= self.capacity:
+                self._evict(next(iter(self._entries)))
+            entry_id = self._next_id
+            self._next_id += 1
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = self._next_slot
+                self._next_slot += 1
+                if slot >= len(self._signatures):
+                    grown = min(self.capacity, 2 * len(self._signatures))
+                    self._signatures = np.resize(self._signatures, (grown, self.num_perm))
+            entry["slot"] = slot
+            self._signatures[slot] = signature
+            self._entries[entry_id] = entry
+            self._exact[entry["digest"]] = entry_id
+            for band, key in zip(self._buckets, entry["bands"]):
+                band.setdefault(key, set()).add(entry_id)
+        return entry_id
+
+    def discard(self, entry_id: int):
+        """Drops an entry (e.g. its artifact was deleted)."""
+        with self._lock:
+            if entry_id in self._entries:
+                self._evict(entry_id)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        self._free_slots.append(entry["slot"])
+        if self._exact.get(entry["digest"]) == entry_id:
+            del self._exact[entry["digest"]]
+        for band, key in zip(self._buckets, entry["bands"]):
+            members = band.get(key)
+            if members is not None:
+                members.discard(entry_id)
+                if not members:
+                    del band[key]
+
+    def _hit(self, match, similarity, entry_id):
+        entry = self._entries[entry_id]
+        return {
+            "match": match,
+            "similarity": similarity,
+            "entry_id": entry_id,
+            "payload": entry["payload"],
+            "artifact": entry["artifact"]
+        }
@@ -0,0 +1,236 @@
+"""
+MODULE: documents.py
+CONTEXT: THE DOCUMENT FRONT END (PDF / Email Streams)
+
+MATHEMATICAL AXIOMS (STREAMING):
+A Ghost Node rarely speaks in one pasted string: it sends a bill of lading
+as a PDF, or an email with the PDF attached. The Restriction Map only needs
+three numbers (Alpha, j, k) from it, so the document is never loaded or sent
+whole.
+
+1. PAGE STREAMS:
+   A document D is read as an ordered sequence of text chunks
+       D = c_1 || c_2 || ... || c_n
+   (one per PDF page, email body part, or text block), and the chunks
+   concatenate to the text itself: page and part chunks end with a line
+   break, text blocks are cut after the last line break that fits and
+   decoded incrementally, so no character or number is split. Files are
+   memory-mapped: the OS pages bytes in on demand, and a chunk's text is
+   only materialized when the consumer asks for it.
+
+2. EARLY STOP:
+   Generators are lazy. A consumer that has found its signal simply stops
+   iterating; the PDF pages and text blocks after it are never parsed.
+   An email is the exception: the stdlib parser needs the whole MIME tree
+   before it can hand out parts, so only the subject (read from the header
+   block alone) comes before the body is parsed. Attached PDFs are still
+   read page by page.
+
+CONSTRAINT:
+   pypdf is used for PDFs when installed (optional, like the AI bridge).
+   Without it, a built-in reader inflates each content stream and reads the
+   literal strings of its text operators (Tj / TJ / ' / "). That covers
+   text-layer PDFs with simple fonts (e.g. LaTeX output); hex-encoded CID
+   text and scanned images yield no text.
+
+REFERENCE:
+   "The Shape of Agreement", Nevalainen (2025).
+   Volume II, Chapter 3: The Universal Translator.
+"""
+
+import codecs
+import io
+import mmap
+import os
+import re
+import zlib
+from email import policy
+from email.parser import BytesFeedParser, BytesHeaderParser
+from typing import Iterator, Union
+
+try:
+    import pypdf
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+FEED_BLOCK = 1 << 20      # Bytes handed to the email parser per step
+TEXT_BLOCK = 1 << 16      # Bytes per chunk for plain text files (cut at a line break)
+WORD_GAP = -200           # TJ adjustment (1/1000 em) treated as a space
+
+_STREAM = re.compile(rb"stream\r?\n")
+_TEXT_OBJECT = re.compile(rb"BT(.*?)ET", re.DOTALL)
+_TEXT_OPERAND = re.compile(rb"\[((?:\\.|[^\]\\])*)\]\s*TJ|\(((?:\\.|[^()\\]|\((?:\\.|[^()\\])*\))*)\)\s*(?:Tj|'|\")|(T\*|Td|TD|Tm)\b")
+_ARRAY_ITEM = re.compile(rb"\(((?:\\.|[^()\\]|\((?:\\.|[^()\\])*\))*)\)|(-?\d+(?:\.\d+)?)")
+_ESCAPE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3}|\r?\n)")
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+            b"(": b"(", b")": b")", b"\\": b"\\"}
+_HEADER_BLOCK = re.compile(rb"(?:[A-Za-z-]+:[^\n]*\r?\n)+")
+_HEADER_END = re.compile(rb"\r?\n\r?\n")
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[ \t]+")
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+# --- FILE ACCESS ---
+class _Mapped:
+    """Read-only memory map of a file (empty files map to b"")."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __enter__(self):
+        return self.buffer
+
+    def __exit__(self, *exc):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+
+def iter_document_chunks(path: str) -> Iterator[str]:
+    """
+    Text chunks of a PDF, a MIME email (.eml) or a plain text file, in order.
+    Joined with "" they give the document text.
+    """
+    with _Mapped(path) as buffer:
+        head = buffer[:1024]
+        if head.lstrip().startswith(b"%PDF"):
+            yield from _line_terminated(iter_pdf_pages(buffer))
+        elif path.lower().endswith((".eml", ".mbox", ".msg")) or _looks_like_email(head):
+            yield from _line_terminated(iter_email_chunks(buffer))
+        else:
+            yield from iter_text_blocks(buffer)
+
+
+def iter_text_blocks(buffer: Buffer, block: int = TEXT_BLOCK) -> Iterator[str]:
+    """
+    UTF-8 text in chunks of about 'block' bytes, each cut after its last
+    line break. A line longer than 'block' is continued by the next chunk;
+    the incremental decoder keeps multi-byte characters whole either way.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    start, size = 0, len(buffer)
+    while start < size:
+        end = min(start + block, size)
+        if end < size:
+            cut = buffer.rfind(b"\n", start, end)
+            if cut >= 0:
+                end = cut + 1
+        text = decoder.decode(buffer[start:end], final=end == size)
+        start = end
+        if text:
+            yield text
+
+
+def _line_terminated(chunks: Iterator[str]) -> Iterator[str]:
+    # Pages and parts are separate lines of the document text
+    for chunk in chunks:
+        yield chunk if chunk.endswith("\n") else chunk + "\n"
+
+
+# --- PDF ---
+def iter_pdf_pages(buffer: Buffer) -> Iterator[str]:
+    """Text of each PDF page, parsed lazily (one page per iteration)."""
+    if PDF_AVAILABLE:
+        stream = buffer if isinstance(buffer, mmap.mmap) else io.BytesIO(bytes(buffer))
+        reader = pypdf.PdfReader(stream)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+    else:
+        yield from _iter_content_streams(buffer)
+
+
+def _iter_content_streams(buffer: Buffer) -> Iterator[str]:
+    # Built-in fallback: every inflatable stream holding text objects is one page
+    position = 0
+    while True:
+        match = _STREAM.search(buffer, position)
+        if match is None:
+            return
+        end = buffer.find(b"endstream", match.end())
+        if end < 0:
+            return
+        position = end + len(b"endstream")
+        try:
+            content = zlib.decompress(buffer[match.end():end])
+        except zlib.error:
+            content = bytes(buffer[match.end():end])
+        if b"BT" not in content:
+            continue
+        text = _content_text(content)
+        if text.strip():
+            yield text
+
+
+def _content_text(content: bytes) -> str:
+    lines, line = [], []
+    for block in _TEXT_OBJECT.finditer(content):
+        for array, literal, move in _TEXT_OPERAND.findall(block.group(1)):
+            if move:
+                if line:
+                    lines.append(b"".join(line))
+                    line = []
+            elif literal:
+                line.append(_unescape(literal))
+            else:
+                for item, adjustment in _ARRAY_ITEM.findall(array):
+                    if item:
+                        line.append(_unescape(item))
+                    elif float(adjustment) <= WORD_GAP:
+                        line.append(b" ")
+        if line:
+            lines.append(b"".join(line))
+            line = []
+    return "\n".join(raw.decode("latin-1") for raw in lines)
+
+
+def _unescape(raw: bytes) -> bytes:
+    def replace(match):
+        code = match.group(1)
+        if code in _ESCAPES:
+            return _ESCAPES[code]
+        if code[:1] in b"\r\n":
+            return b""
+        return bytes([int(code, 8) & 0xFF])
+    return _ESCAPE.sub(replace, raw)
+
+
+# --- EMAIL ---
+def _looks_like_email(head: bytes) -> bool:
+    if head.startswith(b"From "):
+        return True
+    return bool(_HEADER_BLOCK.match(head)) and b"subject:" in head.lower()
+
+
+def iter_email_chunks(buffer: Buffer) -> Iterator[str]:
+    """
+    Subject, text bodies and PDF/text attachments of a MIME message.
+
+    The subject is parsed from the header block alone and yielded first, so
+    a consumer that stops there never parses the body. The body needs the
+    whole message: it is fed to the parser in blocks straight from the map.
+    """
+    end = _HEADER_END.search(buffer)
+    headers = BytesHeaderParser(policy=policy.default).parsebytes(bytes(buffer[:end.end() if end else len(buffer)]))
+    if headers["subject"]:
+        yield str(headers["subject"])
+
+    parser = BytesFeedParser(policy=policy.default)
+    for start in range(0, len(buffer), FEED_BLOCK):
+        parser.feed(buffer[start:start + FEED_BLOCK])
+    message = parser.close()
+
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        content_type = part.get_content_type()
+        if content_type == "application/pdf" or (part.get_filename() or "").lower().endswith(".pdf"):
+            yield from iter_pdf_pages(part.get_payload(decode=True) or b"")
+        elif content_type == "text/plain":
+            yield part.get_content()
+        elif content_type == "text/html":
+            yield _SPACES.sub(" ", _TAG.sub(" ", part.get_content()))
@@ -0,0 +1,213 @@
+"""
+MODULE: harmonic.py
+CONTEXT: THE GHOST NODE BOUNDARY (Dirichlet Problem)
+
+MATHEMATICAL AXIOMS (HARMONIC EXTENSION):
+Ghost Nodes (see ingestor.py) carry Fixed Stalks F(v_g) = Const. Given those
+immutable documents, the minimum-energy consensus for every Live Node is the
+Harmonic Extension of the ghost sections.
+
+1. THE PARTITION:
+   Split the vertices into the Boundary B (pinned Ghost Nodes) and the
+   Interior I (Live Nodes). The Laplacian splits into blocks:
+       L = [[L_II, L_IB],
+            [L_BI, L_BB]]
+
+2. THE DIRICHLET PROBLEM:
+   Minimizing E(x) = x^T L x with x_B fixed gives
+       L_II x_I = -L_IB x_B
+   i.e. (Lx)_v = 0 at every Live Node: the extension is harmonic.
+
+3. WELL-POSEDNESS:
+   For the scalar (identity-map) Laplacian, L_II is positive definite iff
+   every connected component of Live Nodes touches at least one Ghost Node.
+   With restriction maps, an anchored component can still be singular
+   (the maps hide a direction from every pin), so the factorization's
+   pivots are checked too. Either way the consensus is not unique and the
+   problem is rejected.
+
+CONSTRAINT:
+   The factorization of L_II only depends on WHICH nodes are pinned, not on
+   their values. It is cached per boundary set so that re-ingesting a
+   document (new ghost values) costs a back-substitution, not a solve.
+
+REFERENCE:
+   "The Shape of Agreement", Nevalainen (2025).
+   Volume II, Chapter 3: The Universal Translator.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, cg, splu
+
+SINGULAR_RTOL = 1e-12  # Smallest acceptable LU pivot relative to the largest
+
+
+class HarmonicExtensionSolver:
+    """
+    Solves for the harmonic extension of pinned Ghost Node sections over
+    a SheafLaplacian.
+
+    Methods:
+      - "direct": sparse LU of L_II (exact, best up to ~10^5 unknowns).
+      - "iterative": Jacobi-preconditioned Conjugate Gradient (large meshes).
+    """
+
+    def __init__(self, laplacian, method: str = "direct", cache_size: int = 8,
+                 cg_tol: float = 1e-10):
+        if method not in ("direct", "iterative"):
+            raise ValueError(f"Unknown solver method: {method}")
+        self.laplacian = laplacian
+        self.method = method
+        self.cache_size = cache_size
+        self.cg_tol = cg_tol
+        self._factorizations: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    def solve(self, ghost_sections: Dict[Hashable, List[float]]) -> Dict[str, Any]:
+        """
+        Extends {ghost_node: fixed section} to the whole complex.
+
+        Returns:
+            Dict containing:
+                - 'sections': (n_nodes, dim) array, ghost rows untouched.
+                - 'energy': Dirichlet energy of the extension.
+                - 'status': "HARMONIC".
+        """
+        ghost_nodes = list(ghost_sections)
+        values = np.array([ghost_sections[node] for node in ghost_nodes], dtype=float)
+        sections = self.solve_batch(ghost_nodes, values[None])[0]
+        return {
+            "sections": sections,
+            "energy": self.laplacian.energy(sections),
+            "status": "HARMONIC"
+        }
+
+    def solve_batch(self, ghost_nodes: List[Hashable], ghost_values) -> np.ndarray:
+        """
+        Solves many Dirichlet problems sharing one boundary set.
+
+        Args:
+            ghost_nodes: The pinned node ids (the boundary B).
+            ghost_values: (batch, len(ghost_nodes), dim) array of fixed stalks.
+
+        Returns:
+            (batch, n_nodes, dim) array of harmonic sections.
+        """
+        lap = self.laplacian
+        ghost_values = np.asarray(ghost_values, dtype=float)
+        batch = ghost_values.shape[0]
+        if ghost_values.shape[1:] != (len(ghost_nodes), lap.dim):
+            raise ValueError("Topological Mismatch: ghost values must be (batch, n_ghost, dim).")
+
+        factor = self._factorization(ghost_nodes)
+        boundary, interior = factor["boundary"], factor["interior"]
+
+        # Fixed stalks in the (sorted) order of the cached boundary index
+        x_b = ghost_values[:, np.argsort(factor["ghost_positions"]), :]
+        out = np.empty((batch, lap.n_nodes, lap.dim))
+
+        if factor["scalar"]:
+            # Node-level system: one right-hand side per (scenario, component)
+            x_b = x_b.transpose(1, 0, 2).reshape(len(boundary), batch * lap.dim)
+            out[:, boundary, :] = x_b.reshape(len(boundary), batch, lap.dim).transpose(1, 0, 2)
+            if len(interior):
+                x_i = factor["solve"](-(factor["L_IB"] @ x_b))
+                out[:, interior, :] = x_i.reshape(len(interior), batch, lap.dim).transpose(1, 0, 2)
+        else:
+            # Full block system: one right-hand side per scenario
+            flat = out.reshape(batch, -1)
+            x_b = x_b.reshape(batch, -1).T
+            flat[:, boundary] = x_b.T
+            if len(interior):
+                flat[:, interior] = factor["solve"](-(factor["L_IB"] @ x_b)).T
+        return out
+
+    # --- FACTORIZATION CACHE ---
+    def _factorization(self, ghost_nodes):
+        lap = self.laplacian
+        positions = np.array([lap.index[node] for node in ghost_nodes], dtype=np.int64)
+        key = tuple(sorted(positions.tolist()))
+        if len(set(key)) != len(key):
+            raise ValueError("Duplicate Ghost Node in boundary set.")
+
+        cached = self._factorizations.get(key)
+        if cached is not None:
+            self._factorizations.move_to_end(key)
+            return dict(cached, ghost_positions=positions)
+
+        pinned = np.zeros(lap.n_nodes, dtype=bool)
+        pinned[positions] = True
+        self._check_anchored(pinned)
+
+        scalar = lap.scalar_matrix is not None
+        if scalar:
+            L, mask = lap.scalar_matrix, pinned
+        else:
+            L, mask = lap.matrix, np.repeat(pinned, lap.dim)
+        boundary = np.flatnonzero(mask)
+        interior = np.flatnonzero(~mask)
+        L_I = L[interior]
+
+        factor = {
+            "scalar": scalar,
+            "boundary": boundary,
+            "interior": interior,
+            "L_IB": L_I[:, boundary].tocsr(),
+            "solve": self._build_solver(L_I[:, interior].tocsc()) if len(interior) else None
+        }
+        self._factorizations[key] = factor
+        if len(self._factorizations) > self.cache_size:
+            self._factorizations.popitem(last=False)
+        return dict(factor, ghost_positions=positions)
+
+    def _build_solver(self, L_II):
+        if self.method == "direct":
+            try:
+                lu = splu(L_II)
+            except RuntimeError:  # "Factor is exactly singular"
+                raise _ill_posed("L_II is singular") from None
+            pivots = np.abs(lu.U.diagonal())
+            if pivots.min() <= SINGULAR_RTOL * pivots.max():
+                raise _ill_posed(f"L_II is numerically singular (smallest pivot {pivots.min():.3g})")
+            return lambda rhs: lu.solve(rhs)
+
+        diagonal = L_II.diagonal()
+        if np.any(diagonal <= 0):
+            raise _ill_posed(f"{int((diagonal <= 0).sum())} interior unknown(s) are unconstrained")
+        inv_diag = 1.0 / diagonal
+        precond = LinearOperator(L_II.shape, matvec=lambda v: inv_diag * v)
+
+        def solve(rhs):
+            columns = []
+            for col in np.atleast_2d(rhs.T):
+                x, info = cg(L_II, col, rtol=self.cg_tol, atol=0.0, M=precond)
+                if info > 0:
+                    raise RuntimeError(f"CG did not converge within {info} iterations "
+                                       "(L_II may be singular under the restriction maps).")
+                columns.append(x)
+            return np.array(columns).T
+        return solve
+
+    def _check_anchored(self, pinned):
+        # Every component of the complex must contain a Ghost Node
+        lap = self.laplacian
+        n = lap.n_nodes
+        adjacency = _adjacency(lap.edges, n)
+        n_comp, labels = connected_components(adjacency, directed=False)
+        anchored = np.zeros(n_comp, dtype=bool)
+        anchored[labels[pinned]] = True
+        if not anchored.all():
+            raise _ill_posed(f"{int((~anchored).sum())} component(s) have no Ghost Node anchor")
+
+
+def _ill_posed(reason):
+    return ValueError(f"Dirichlet Problem ill-posed: {reason}.")
+
+
+def _adjacency(edges, n):
+    data = np.ones(len(edges))
+    return coo_matrix((data, (edges[:, 0], edges[:, 1])), shape=(n, n)).tocsr()
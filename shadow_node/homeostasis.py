@@ -30,6 +30,10 @@ REFERENCE:
    Section 8: The Protocol (The Self-Healing Supply Chain).
 """
 
+import numpy as np
+from scipy.sparse import identity
+from scipy.sparse.linalg import LinearOperator, cg
+
 class HomeostaticLoop:
     """
     Manages the cybernetic feedback cycle, ensuring L'x approaches 0
@@ -68,4 +72,90 @@ class HomeostaticLoop:
             "status": "DIFFUSING",
             "energy": abs(diff),
             "next_state": updated_driver_state
-        }
\ No newline at end of file
+        }
+
+class HeatDiffusionEngine:
+    """
+    Steps every node section of the mesh at once under dx/dt = -Lx,
+    where L is a (sparse) SheafLaplacian.
+
+    Methods:
+      - "explicit": x' = x - dt * Lx. With dt <= 1 / lambda_max the energy
+        decreases monotonically; the default dt uses the Gershgorin bound.
+      - "implicit": (I + dt * L) x' = x, solved by Conjugate Gradient.
+        Unconditionally stable, so dt may be large.
+    """
+
+    def __init__(self, laplacian, method: str = "explicit", dt: float = None,
+                 safety: float = 0.9, cg_tol: float = 1e-10):
+        if method not in ("explicit", "implicit"):
+            raise ValueError(f"Unknown diffusion method: {method}")
+        self.laplacian = laplacian
+        self.method = method
+        self.cg_tol = cg_tol
+
+        bound = laplacian.spectral_bound()
+        if dt is None:
+            dt = safety / bound if (method == "explicit" and bound > 0) else 1.0
+        self.dt = dt
+
+        if method == "implicit":
+            # System matrix and Jacobi preconditioner are built once per dt
+            n = laplacian.matrix.shape[0]
+            self._system = (identity(n, format='csr') + dt * laplacian.matrix).tocsr()
+            self._inv_diag = 1.0 / self._system.diagonal()
+
+    def step(self, x):
+        """Advances all sections by one time step. Returns (x_next, energy)."""
+        x = np.asarray(x, dtype=float)
+        if self.method == "explicit":
+            x_next = x - self.dt * self.laplacian.apply(x)
+        else:
+            rhs = x.ravel()
+            flat, info = cg(self._system, rhs, x0=rhs, rtol=self.cg_tol, atol=0.0,
+                            M=_jacobi(self._inv_diag))
+            if info > 0:
+                raise RuntimeError(f"CG did not converge within {info} iterations.")
+            x_next = flat.reshape(x.shape)
+        return x_next, self.laplacian.energy(x_next)
+
+    def run(self, x, max_steps: int = 1000, energy_tol: float = 1e-9, rel_tol: float = 0.0) -> dict:
+        """
+        Diffuses until the energy falls below energy_tol (HARMONIC), the
+        relative energy drop of a step falls below rel_tol (STALLED), or
+        max_steps is reached (DIFFUSING).
+        """
+        x = np.asarray(x, dtype=float)
+        energy = self.laplacian.energy(x)
+        history = [energy]
+        status = "DIFFUSING"
+
+        for _ in range(max_steps):
+            if energy <= energy_tol:
+                status = "HARMONIC"
+                break
+            x, next_energy = self.step(x)
+            history.append(next_energy)
+            drop = energy - next_energy
+            energy = next_energy
+            if rel_tol and drop <= rel_tol * history[-2]:
+                status = "STALLED"
+                break
+        else:
+            if energy <= energy_tol:
+                status = "HARMONIC"
+
+        return {
+            "status": status,
+            "energy": energy,
+            "energy_history": history,
+            "steps": len(history) - 1,
+            "dt": self.dt,
+            "next_state": x
+        }
+
+
+def _jacobi(inv_diag):
+    # Diagonal preconditioner for CG
+    n = len(inv_diag)
+    return LinearOperator((n, n), matvec=lambda v: inv_diag * v)
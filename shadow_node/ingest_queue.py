@@ -0,0 +1,220 @@
+"""
+MODULE: ingest_queue.py
+CONTEXT: THE INTAKE VALVE (Bounded Ingestion)
+
+MATHEMATICAL AXIOMS (QUEUEING):
+The Driver Portal is the mouth of the Ghost Node pipeline. Extraction (the
+Restriction Map rho: Text -> JSON) is slow and bursty; running it inside the
+request handler couples the Driver's wait to every other Driver's report.
+
+1. THE TICKET:
+   submit() only validates and enqueues. It returns a Ticket at once; the
+   Restriction Map is applied later by a worker thread.
+   QUEUED -> PROCESSING -> DONE | FAILED
+
+2. BOUNDED DEPTH (Little's Law):
+   With arrival rate lambda and service time S, the queue holds
+   L = lambda * W reports. The depth is capped at max_depth so that W (and
+   memory) stay bounded when lambda exceeds workers / S.
+
+3. BACKPRESSURE:
+   A full queue answers explicitly instead of blocking the caller:
+   - policy "reject":      REJECTED.
+   - policy "retry_after": REJECTED with retry_after = depth * S / workers,
+                           the expected time for the backlog to drain.
+
+CONSTRAINT:
+   The translator is any object exposing ingest(raw_input, source_label)
+   -> artifact path. Exceptions raised by it mark the ticket FAILED.
+
+REFERENCE:
+   "The Shape of Agreement", Nevalainen (2025).
+   Volume II, Chapter 3: The Universal Translator.
+"""
+
+import collections
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+QUEUED = "QUEUED"
+PROCESSING = "PROCESSING"
+DONE = "DONE"
+FAILED = "FAILED"
+REJECTED = "REJECTED"
+
+
+class IngestQueue:
+    """
+    Bounded FIFO between report submission and a translator, drained by
+    worker threads, with backpressure and queue metrics.
+    """
+
+    def __init__(self, translator, workers: int = 2, max_depth: int = 64,
+                 policy: str = "retry_after", history: int = 10000, window: int = 1000):
+        if policy not in ("reject", "retry_after"):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.translator = translator
+        self.workers = workers
+        self.max_depth = max_depth
+        self.policy = policy
+        self.history = history
+
+        self._tickets: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self._pending: collections.deque = collections.deque()
+        self._seq = itertools.count(1)
+        # Two conditions on one lock: ticket waiters never absorb a worker's wakeup
+        lock = threading.RLock()
+        self._cond = threading.Condition(lock)   # ticket state changed (wait callers)
+        self._work = threading.Condition(lock)   # report queued or closing (workers)
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._in_flight = 0
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._waits = collections.deque(maxlen=window)     # seconds in queue
+        self._services = collections.deque(maxlen=window)  # seconds in translator
+
+    # --- PUBLIC API ---
+    def submit(self, raw_input: str, source_label: str = "manual_entry") -> Dict[str, Any]:
+        """
+        Enqueues a report. Returns the ticket record at once; when the queue
+        is full the record is REJECTED (with 'retry_after' seconds under the
+        "retry_after" policy) and nothing is enqueued.
+        """
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Ingest queue is closed.")
+            if len(self._pending) >= self.max_depth:
+                self._counts["rejected"] += 1
+                return {
+                    "ticket": None,
+                    "status": REJECTED,
+                    "depth": len(self._pending),
+                    "retry_after": self._retry_after() if self.policy == "retry_after" else None
+                }
+
+            ticket = f"T{next(self._seq):08d}"
+            record = {
+                "ticket": ticket,
+                "status": QUEUED,
+                "source": source_label,
+                "submitted_at": now,
+                "started_at": None,
+                "finished_at": None,
+                "artifact": None,
+                "error": None,
+            }
+            self._tickets[ticket] = record
+            self._pending.append((ticket, raw_input))
+            self._counts["submitted"] += 1
+            self._trim_history()
+            self._ensure_workers()
+            self._work.notify()
+            return dict(record, position=len(self._pending))
+
+    def status(self, ticket: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a ticket (None if unknown or expired from history)."""
+        with self._cond:
+            record = self._tickets.get(ticket)
+            return dict(record) if record else None
+
+    def wait(self, ticket: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Blocks until the ticket is DONE or FAILED (or the timeout expires)."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                record = self._tickets.get(ticket)
+                if record is None or record["status"] in (DONE, FAILED):
+                    return dict(record) if record else None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return dict(record)
+                self._cond.wait(remaining)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and wait/service time percentiles (ms)."""
+        with self._cond:
+            waits = np.array(self._waits) * 1000
+            services = np.array(self._services) * 1000
+            metrics = dict(self._counts)
+            metrics.update({
+                "depth": len(self._pending),
+                "max_depth": self.max_depth,
+                "in_flight": self._in_flight,
+                "workers": self.workers,
+                "retry_after": self._retry_after(),
+            })
+        for name, values in (("wait", waits), ("service", services)):
+            metrics[f"{name}_ms_p50"] = float(np.percentile(values, 50)) if len(values) else 0.0
+            metrics[f"{name}_ms_p95"] = float(np.percentile(values, 95)) if len(values) else 0.0
+        return metrics
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting reports; workers drain the queue and exit."""
+        with self._cond:
+            self._closed = True
+            self._work.notify_all()
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # --- INTERNALS ---
+    def _retry_after(self) -> float:
+        # Called under the lock: expected drain time of the current backlog
+        service = float(np.mean(self._services)) if self._services else 1.0
+        return round((len(self._pending) + self._in_flight) * service / max(1, self.workers), 2)
+
+    def _trim_history(self):
+        # Called under the lock: forget the oldest finished tickets
+        while len(self._tickets) > self.history:
+            ticket, record = next(iter(self._tickets.items()))
+            if record["status"] not in (DONE, FAILED):
+                break
+            del self._tickets[ticket]
+
+    def _ensure_workers(self):
+        # Called under the lock: workers start on the first submission
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"ingest-queue-{len(self._threads)}")
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._work.wait()
+                if not self._pending:
+                    return
+                ticket, raw_input = self._pending.popleft()
+                record = self._tickets[ticket]
+                record["status"] = PROCESSING
+                record["started_at"] = time.time()
+                self._waits.append(record["started_at"] - record["submitted_at"])
+                self._in_flight += 1
+                source = record["source"]
+
+            try:
+                artifact, error = self.translator.ingest(raw_input, source), None
+            except Exception as e:
+                artifact, error = None, f"{type(e).__name__}: {e}"
+
+            with self._cond:
+                record["finished_at"] = time.time()
+                self._services.append(record["finished_at"] - record["started_at"])
+                self._in_flight -= 1
+                if error is None:
+                    record["status"] = DONE
+                    record["artifact"] = artifact
+                    self._counts["completed"] += 1
+                else:
+                    record["status"] = FAILED
+                    record["error"] = error
+                    self._counts["failed"] += 1
+                self._cond.notify_all()
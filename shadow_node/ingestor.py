@@ -39,9 +39,14 @@ REFERENCE:
 import re
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field, validator, ValidationError
 
+SECTION_FIELDS = ("alpha", "i_friction", "j_friction", "k_friction")
+
 # --- THE ONE-DROP SCHEMA (Local Definition for Self-Containment) ---
 class OneDropSchema(BaseModel):
     """
@@ -68,6 +73,100 @@ class OneDropSchema(BaseModel):
         return v
 
 
+def normalize_sections(frame: pd.DataFrame, column_map: Optional[Dict[str, str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized OneDropSchema: projects every row of a table at once.
+
+    Args:
+        frame: Table with one row per report.
+        column_map: {field: column} for the fields in SECTION_FIELDS. Fields
+            without a column take the schema default (0.0); alpha is required.
+
+    Returns:
+        (sections, valid): an (n, 4) float array [Alpha, i, j, k] and an (n,)
+        mask of the rows the schema accepts. Rejected rows (non-integer or
+        missing Alpha, frictions outside [0, 1] after normalization) belong
+        to the Waste Stream.
+    """
+    column_map = column_map or {field: field for field in SECTION_FIELDS}
+    if "alpha" not in column_map:
+        raise ValueError("Schema Violation: a column must map to 'alpha'.")
+
+    n = len(frame)
+    sections = np.zeros((n, 4))
+    for c, field in enumerate(SECTION_FIELDS):
+        if field in column_map:
+            sections[:, c] = pd.to_numeric(frame[column_map[field]], errors="coerce").to_numpy(dtype=float)
+
+    # Restriction Map Rules (as the validators): hours and dollars above 1.0
+    for c, scale in ((2, 24.0), (3, 10000.0)):
+        raw = sections[:, c]
+        sections[:, c] = np.where(raw > 1.0, np.minimum(1.0, raw / scale), raw)
+
+    alpha, frictions = sections[:, 0], sections[:, 1:]
+    valid = np.isfinite(alpha) & (alpha == np.round(alpha))
+    valid &= np.all((frictions >= 0.0) & (frictions <= 1.0), axis=1)  # NaN fails both
+    return sections, valid
+
+
+class CSVSectionAdapter:
+    """
+    Direct path for structured ERP exports: CSV rows become sections without
+    touching the text Restriction Map (LLM/Regex).
+
+    The file is read with pandas in chunks of 'chunksize' rows, only the
+    mapped columns are parsed, and each chunk is normalized by
+    normalize_sections, so memory is bounded by the chunk, not the file.
+    """
+
+    def __init__(self, column_map: Optional[Dict[str, str]] = None, key_column: Optional[str] = None,
+                 chunksize: int = 100_000, **read_csv_kwargs):
+        self.column_map = dict(column_map or {field: field for field in SECTION_FIELDS})
+        self.key_column = key_column
+        self.chunksize = chunksize
+        self.read_csv_kwargs = read_csv_kwargs
+
+    def iter_chunks(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yields {"offset", "sections", "valid", "keys"} per chunk; 'keys' holds
+        the key column (e.g. shipment id) when one is configured.
+        """
+        columns = list(dict.fromkeys(list(self.column_map.values()) + ([self.key_column] if self.key_column else [])))
+        offset = 0
+        for frame in pd.read_csv(path, usecols=columns, chunksize=self.chunksize, **self.read_csv_kwargs):
+            sections, valid = normalize_sections(frame, self.column_map)
+            yield {
+                "offset": offset,
+                "sections": sections,
+                "valid": valid,
+                "keys": frame[self.key_column].to_numpy() if self.key_column else None
+            }
+            offset += len(frame)
+
+    def load(self, path: str) -> Dict[str, Any]:
+        """
+        Whole-file form of iter_chunks: the accepted sections (n, 4), their
+        row numbers and keys, and the count of rows shunted to the Waste Stream.
+        """
+        sections, rows, keys = [], [], []
+        total = 0
+        for chunk in self.iter_chunks(path):
+            valid = chunk["valid"]
+            sections.append(chunk["sections"][valid])
+            rows.append(chunk["offset"] + np.flatnonzero(valid))
+            if chunk["keys"] is not None:
+                keys.append(chunk["keys"][valid])
+            total += len(valid)
+        accepted = np.concatenate(sections) if sections else np.zeros((0, 4))
+        return {
+            "sections": accepted,
+            "rows": np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64),
+            "keys": np.concatenate(keys) if keys else None,
+            "total_rows": total,
+            "waste_rows": total - len(accepted)
+        }
+
+
 class GhostNodeIngestor:
     """
     The Bridge between the Static World (PDFs) and the Living Mesh.
@@ -0,0 +1,233 @@
+"""
+MODULE: outbox.py
+CONTEXT: THE GRADIENT OUTBOX (Non-Blocking Flow)
+
+MATHEMATICAL AXIOMS (GRADIENT FLOW):
+The ActionHandler treats a message as the Gradient Vector (-grad E) pushed
+into a node after a Topological Surgery (K -> K'). This module decouples the
+Surgery (instantaneous change of intent) from the Flow (physical delivery).
+
+1. THE OUTBOX:
+   A surgery enqueues one Gradient per target node and returns immediately.
+   The Manager's intent (K') is committed; the Flow is pending.
+
+2. BLOCKED GRADIENTS:
+   A failed delivery is a Blocked Gradient, not a timeout. Each block raises
+   the pressure: the next attempt waits base * 2^attempt (capped), spread by
+   random jitter so that blocked nodes do not retry in lock-step.
+
+3. OBSERVABILITY:
+   Every Gradient carries a pollable status:
+   QUEUED -> IN_FLIGHT -> (RETRYING -> IN_FLIGHT)* -> DELIVERED | BLOCKED
+
+CONSTRAINT:
+   Delivery runs on worker threads behind a pluggable Transport. A Transport
+   is any object exposing deliver(target_node, payload) -> bool. Exceptions
+   raised by a Transport count as Blocked Gradients.
+
+REFERENCE:
+   "The Shape of Agreement", Nevalainen (2025).
+   Section 7: Dynamics: Hodge Decomposition.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+QUEUED = "QUEUED"
+IN_FLIGHT = "IN_FLIGHT"
+RETRYING = "RETRYING"
+DELIVERED = "DELIVERED"
+BLOCKED = "BLOCKED"
+
+
+class LocalTransport:
+    """
+    In-process stand-in for the network.
+    Reproduces the ActionHandler physics (90% successful flow) and keeps
+    an inbox per node so delivered Gradients can be inspected.
+    """
+
+    def __init__(self, success_rate: float = 0.9, latency: float = 0.0, seed: Optional[int] = None):
+        self.success_rate = success_rate
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.inbox: Dict[str, List[Dict[str, Any]]] = {}
+
+    def deliver(self, target_node: str, payload: Dict[str, Any]) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self._rng.random() >= self.success_rate:
+                return False
+            self.inbox.setdefault(target_node, []).append(payload)
+        return True
+
+
+class GradientOutbox:
+    """
+    Queues Gradient Vectors and delivers them concurrently with
+    exponential backoff plus jitter.
+    """
+
+    def __init__(self, transport=None, workers: int = 4, max_retries: int = 3,
+                 base_delay: float = 0.1, max_delay: float = 5.0, seed: Optional[int] = None,
+                 history: int = 10000):
+        self.transport = transport or LocalTransport()
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.history = history
+        self._rng = random.Random(seed)
+
+        self._messages: Dict[str, Dict[str, Any]] = {}
+        self._finished: deque = deque()  # DELIVERED/BLOCKED ids, oldest first (capped at 'history')
+        self._schedule: List = []  # Heap of (due_time, seq, message_id)
+        self._seq = itertools.count()
+        # Two conditions on one lock: status waiters never absorb a worker's wakeup
+        lock = threading.RLock()
+        self._cond = threading.Condition(lock)   # delivery state changed (wait callers)
+        self._work = threading.Condition(lock)   # schedule changed or closing (workers)
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+    # --- PUBLIC API ---
+    def enqueue(self, target_node: str, payload: Dict[str, Any]) -> str:
+        """
+        Commits a Gradient for delivery and returns its message id at once.
+        """
+        message_id = uuid.uuid4().hex
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Outbox is closed.")
+            self._messages[message_id] = {
+                "message_id": message_id,
+                "target": target_node,
+                "payload": payload,
+                "status": QUEUED,
+                "attempts": 0,
+                "enqueued_at": now,
+                "delivered_at": None,
+                "next_attempt_at": now,
+                "last_error": None,
+            }
+            heapq.heappush(self._schedule, (now, next(self._seq), message_id))
+            self._ensure_workers()
+            self._work.notify()
+        return message_id
+
+    def status(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a snapshot of the Gradient's delivery state (None if unknown or expired from history)."""
+        with self._cond:
+            record = self._messages.get(message_id)
+            return dict(record) if record else None
+
+    def summary(self) -> Dict[str, int]:
+        """Counts Gradients per status."""
+        counts = {QUEUED: 0, IN_FLIGHT: 0, RETRYING: 0, DELIVERED: 0, BLOCKED: 0}
+        with self._cond:
+            for record in self._messages.values():
+                counts[record["status"]] += 1
+        return counts
+
+    def wait(self, message_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Blocks until the Gradient is DELIVERED or BLOCKED (or the timeout expires)."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                record = self._messages.get(message_id)
+                if record is None or record["status"] in (DELIVERED, BLOCKED):
+                    return dict(record) if record else None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return dict(record)
+                self._cond.wait(remaining)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers. Gradients still scheduled stay in their current status."""
+        with self._cond:
+            self._closed = True
+            self._work.notify_all()
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # --- INTERNALS ---
+    def _finish(self, message_id):
+        # Called under the lock: keep the newest 'history' finished Gradients.
+        # Pending ones are never forgotten, however long they stay in flight.
+        self._finished.append(message_id)
+        while len(self._finished) > self.history:
+            del self._messages[self._finished.popleft()]
+
+    def _ensure_workers(self):
+        # Called under the lock: workers start on the first enqueue
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"gradient-outbox-{len(self._threads)}")
+            self._threads.append(thread)
+            thread.start()
+
+    def _backoff(self, attempt: int) -> float:
+        # Exponential backoff with full jitter: U(0, min(cap, base * 2^attempt))
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self._rng.uniform(0, ceiling)
+
+    def _next_due(self) -> Optional[str]:
+        # Called under the lock: waits until a Gradient is due or the outbox closes
+        while not self._closed:
+            if self._schedule:
+                due_time, _, message_id = self._schedule[0]
+                delay = due_time - time.time()
+                if delay <= 0:
+                    heapq.heappop(self._schedule)
+                    return message_id
+                self._work.wait(delay)
+            else:
+                self._work.wait()
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                message_id = self._next_due()
+                if message_id is None:
+                    return
+                record = self._messages[message_id]
+                record["status"] = IN_FLIGHT
+                record["attempts"] += 1
+                target, payload = record["target"], record["payload"]
+
+            try:
+                success = bool(self.transport.deliver(target, payload))
+                error = None if success else "Gradient Blocked"
+            except Exception as e:
+                success, error = False, str(e)
+
+            with self._cond:
+                now = time.time()
+                if success:
+                    record["status"] = DELIVERED
+                    record["delivered_at"] = now
+                    self._finish(message_id)
+                elif record["attempts"] >= self.max_retries:
+                    record["status"] = BLOCKED
+                    record["last_error"] = error
+                    self._finish(message_id)
+                else:
+                    due = now + self._backoff(record["attempts"])
+                    record["status"] = RETRYING
+                    record["last_error"] = error
+                    record["next_attempt_at"] = due
+                    heapq.heappush(self._schedule, (due, next(self._seq), message_id))
+                    self._work.notify()
+                self._cond.notify_all()
@@ -1,10 +1,18 @@
 import json
 import re
 import os
+import threading
 import time
 import warnings
+from collections import deque
 from datetime import datetime
 
+import numpy as np
+
+from shared_core.circuit_breaker import get_breaker
+from shadow_node.dedup import NearDuplicateIndex, numeric_guard
+from shadow_node.documents import iter_document_chunks
+
 # SILENCE PROTOCOL
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -15,10 +23,155 @@ try:
 except ImportError:
     AI_AVAILABLE = False
 
+# RESTRICTION MAP PATTERNS (compiled once, shared by every translator)
+# ALPHA: Handles "Qty: 100" AND "100 units"
+#   Group 1: Leading (Qty: 100)
+#   Group 2: Trailing (100 units)
+QTY_PATTERN = re.compile(r"(?:qty|quantity|units|count)\s*[:=]?\s*(\d+)|(\d+)\s*(?:units|qty|quantity|pcs)", re.IGNORECASE)
+HOURS_PATTERN = re.compile(r"(\d+)\s*hours?\s*(?:late|delay)", re.IGNORECASE)
+COST_PATTERN = re.compile(r"\$\s*([\d,]+)")
+
+
+def _alpha_value(match):
+    return int(match.group(1) or match.group(2))
+
+
+def _j_value(match):
+    return min(1.0, int(match.group(1)) / 24.0)
+
+
+def _k_value(match):
+    return min(1.0, float(match.group(1).replace(",", "")) / 10000.0)
+
+
+# Words suggesting a field is present even when its pattern did not match
+FIELD_HINTS = {
+    "alpha": re.compile(r"\b(?:qty|quantity|units?|count|pcs|pieces|pallets?|cases|received|delivered|shipped)\b", re.IGNORECASE),
+    "j_friction": re.compile(r"\b(?:late|delay(?:ed)?|hours?|hrs?|days?)\b", re.IGNORECASE),
+    "k_friction": re.compile(r"\$|\b(?:usd|cost|fee|fine|charge|penalty|dollars?)\b", re.IGNORECASE),
+}
+
+# Extraction tiers, cheapest first
+TIER_DEDUP = "DEDUP"                  # Echo of an earlier report
+TIER_REGEX = "REGEX"                  # Regex map, every field confident
+TIER_MODEL = "MODEL"                  # Escalated to the AI bridge
+TIER_REGEX_FALLBACK = "REGEX_FALLBACK"  # Escalation failed/unavailable: low-confidence regex
+
+
+def score_regex_fields(text):
+    """
+    Per-field confidence in [0, 1] of the regex map on 'text'.
+
+    - Matched: 0.95 for a labelled value ("Qty: 100", "6 hours late",
+      "$500"), 0.9 for a trailing unit ("100 units"); halved when other
+      matches in the text disagree on the value.
+    - Not matched: 0.2 if hint words show the field is there but could not
+      be parsed; otherwise the field is absent, which is a confident 0 for
+      j and k (0.9) but a missing signal for Alpha (0.0).
+    """
+    confidence = {}
+    for name, pattern, value, _ in SIGNAL_FIELDS:
+        matches = list(pattern.finditer(text))
+        if matches:
+            score = 0.9 if name == "alpha" and matches[0].group(1) is None else 0.95
+            if len({value(match) for match in matches}) > 1:
+                score *= 0.5
+        elif FIELD_HINTS[name].search(text):
+            score = 0.2
+        else:
+            score = 0.0 if name == "alpha" else 0.9
+        confidence[name] = score
+    return confidence
+
+
+# (field, pattern, value, literals): every match contains one of the literals
+SIGNAL_FIELDS = (
+    ("alpha", QTY_PATTERN, _alpha_value, ("qty", "quantity", "units", "count", "pcs")),
+    ("j_friction", HOURS_PATTERN, _j_value, ("hour",)),
+    ("k_friction", COST_PATTERN, _k_value, ("$",)),
+)
+
+
+class SignalScanner:
+    """
+    Incremental form of the regex restriction map.
+
+    feed() takes the text chunk by chunk (pages, parts) and records the
+    first match of each field; once Alpha, j and k are all found the scanner
+    is complete and the rest of the document can be skipped. Chunks are
+    contiguous text (iter_document_chunks output), so nothing is inserted
+    between them: a number cut across two chunks is read whole. finish()
+    gives the same payload as _map_via_regex on the concatenated chunks,
+    provided no single match is longer than 'overlap' characters: a match is
+    only accepted once it starts 'overlap' characters before the end of the
+    text seen so far, and that tail is carried into the next window.
+    """
+
+    def __init__(self, overlap=512):
+        self.overlap = overlap
+        self.values = {}
+        self.chunks = 0
+        self.chars = 0
+        self._carry = ""
+
+    @property
+    def complete(self):
+        return len(self.values) == len(SIGNAL_FIELDS)
+
+    def feed(self, chunk):
+        """Scans one more chunk. Returns True once every field is found."""
+        window = self._carry + chunk
+        self.chunks += 1
+        self.chars += len(chunk)
+        settled = max(len(window) - self.overlap, 0)
+        self._scan(window, settled)
+        self._carry = window[settled:]
+        return self.complete
+
+    def finish(self):
+        """Scans the carried tail and returns the regex payload."""
+        self._scan(self._carry, len(self._carry))
+        self._carry = ""
+        return self.payload()
+
+    def payload(self):
+        data = {"alpha": 0, "j_friction": 0.0, "k_friction": 0.0, "status": "SIGNAL"}
+        data.update(self.values)
+        if data["alpha"] == 0 and data["j_friction"] == 0 and data["k_friction"] == 0:
+            return {"status": "TOPOLOGICAL_WASTE"}
+        return data
+
+    def _scan(self, window, settled):
+        # Literal pre-check: substring search is far cheaper than the regexes,
+        # which try a match at every digit. (ASCII only, where lower() is exact.)
+        lowered = window.lower() if window.isascii() else None
+        for name, pattern, value, literals in SIGNAL_FIELDS:
+            if name in self.values:
+                continue
+            if lowered is not None and not any(literal in lowered for literal in literals):
+                continue
+            match = pattern.search(window)
+            if match and match.start() < settled:
+                self.values[name] = value(match)
+
+
 class UniversalTranslator:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, dedup_threshold=0.9, breaker=None, hedge_after=2.0,
+                 confidence_threshold=0.8):
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
         self.mode = "HYBRID" 
+        # Regex answers alone when every field scores >= confidence_threshold
+        self.confidence_threshold = confidence_threshold
+        self._tier_lock = threading.Lock()
+        self._tier_counts = {}
+        self._tier_latency = {}
+        # One breaker per process: an outage seen by any translator fails fast for all
+        self.breaker = breaker or get_breaker("gemini")
+        self.hedge_after = hedge_after
+        # Echo filter: near-duplicates reuse the earlier extraction (None disables)
+        self.dedup = None
+        if dedup_threshold is not None:
+            self.dedup = NearDuplicateIndex(threshold=dedup_threshold, guard=self._signal_key)
         
         if self.api_key and AI_AVAILABLE:
             try:
@@ -33,36 +186,131 @@ class UniversalTranslator:
             print(">> [ShadowNode] Running in OFFLINE Mode (Regex Only).")
 
     def ingest(self, raw_input, source_label="manual_entry"):
+        """
+        Tiered Restriction Map: echo cache -> regex -> model.
+
+        The regex map runs first and scores each field; the model is only
+        called when a field is missing or below confidence_threshold. If the
+        model is offline, fails, or finds nothing, the regex result stands.
+        """
+        start = time.perf_counter()
+        return self._resolve(self._sanitize_input(raw_input), start, {"source": source_label})
+
+    def _resolve(self, clean_text, start, meta, regex_payload=None, ai_text=None):
+        """
+        The tiers shared by ingest and ingest_document. 'regex_payload' is
+        the already-computed regex map of clean_text (streamed documents);
+        'ai_text' is what the model sees (defaults to clean_text).
+        """
         timestamp = datetime.now().isoformat()
-        clean_text = self._sanitize_input(raw_input)
-        
-        payload = None
-        if self.mode != "OFFLINE_REGEX":
-            payload = self._map_via_ai(clean_text)
 
-        # Fallback if AI failed or returned WASTE despite data potentially existing
-        if not payload or payload.get("status") == "TOPOLOGICAL_WASTE":
-            # Double check with Regex before giving up
+        # Echo check: same (or near-same) report already extracted
+        if self.dedup is not None:
+            hit = self.dedup.lookup(clean_text)
+            if hit and hit["artifact"] and os.path.exists(hit["artifact"]):
+                print(f"   [Debug] {hit['match']} duplicate (similarity {hit['similarity']:.2f}). Reusing {hit['artifact']}")
+                self._record_tier(TIER_DEDUP, start)
+                return hit["artifact"]
+            if hit:
+                self.dedup.discard(hit["entry_id"])
+
+        # Tier 1: Regex with per-field confidence
+        if regex_payload is None:
             regex_payload = self._map_via_regex(clean_text)
-            if regex_payload.get("status") != "TOPOLOGICAL_WASTE":
-                payload = regex_payload
-                print(f"   [Debug] AI missed it. Regex recovered signal.")
-            elif not payload:
-                payload = regex_payload
-
-        payload["_meta"] = {
-            "timestamp": timestamp,
-            "source": source_label,
-            "extraction_method": self.mode
+        confidence = score_regex_fields(clean_text)
+        payload, tier = regex_payload, TIER_REGEX
+
+        # Tier 2: Escalate low-confidence or missing fields to the model
+        if min(confidence.values()) < self.confidence_threshold:
+            tier = TIER_REGEX_FALLBACK
+            if self.mode != "OFFLINE_REGEX":
+                has_signal = regex_payload.get("status") != "TOPOLOGICAL_WASTE"
+                # A slow model call is answered by the regex map when it has a signal
+                ai_payload = self._map_via_ai(clean_text if ai_text is None else ai_text,
+                                              hedge=lambda: regex_payload if has_signal else None)
+                if ai_payload is regex_payload:
+                    pass  # Hedged
+                elif ai_payload and (ai_payload.get("status") != "TOPOLOGICAL_WASTE" or not has_signal):
+                    payload, tier = ai_payload, TIER_MODEL
+                elif has_signal:
+                    print(f"   [Debug] AI missed it. Regex recovered signal.")
+
+        payload["_meta"] = dict(meta, timestamp=timestamp, extraction_method=tier, confidence=confidence)
+
+        artifact = self._save_artifact(payload)
+        if self.dedup is not None:
+            self.dedup.add(clean_text, payload, artifact)
+        self._record_tier(tier, start)
+        return artifact
+
+    def tier_report(self):
+        """Share of documents resolved on each tier and their latency (ms)."""
+        with self._tier_lock:
+            counts = dict(self._tier_counts)
+            latencies = {tier: np.array(values) * 1000 for tier, values in self._tier_latency.items()}
+        total = sum(counts.values())
+        return {
+            "documents": total,
+            "tiers": {
+                tier: {
+                    "count": count,
+                    "share": count / total,
+                    "p50_ms": float(np.percentile(latencies[tier], 50)),
+                    "p95_ms": float(np.percentile(latencies[tier], 95))
+                }
+                for tier, count in counts.items()
+            }
         }
-        
-        return self._save_artifact(payload)
+
+    def _record_tier(self, tier, start):
+        elapsed = time.perf_counter() - start
+        with self._tier_lock:
+            self._tier_counts[tier] = self._tier_counts.get(tier, 0) + 1
+            self._tier_latency.setdefault(tier, deque(maxlen=1000)).append(elapsed)
+
+    def ingest_document(self, path, source_label=None, ai_budget=8000):
+        """
+        Streams a PDF, email or text file through the restriction map page by
+        page. The regex map runs incrementally and stops reading as soon as
+        Alpha, j and k are all found. The text read so far then takes the
+        same echo/regex/model tiers as ingest(); the model sees only its
+        first 'ai_budget' characters.
+        """
+        start = time.perf_counter()
+        scanner = SignalScanner()
+        scanned = []
+        early_stop = False
+        for chunk in iter_document_chunks(path):
+            clean_chunk = self._sanitize_input(chunk)
+            scanned.append(clean_chunk)
+            if scanner.feed(clean_chunk):
+                early_stop = True
+                break
+        regex_payload = scanner.finish()
+        clean_text = "".join(scanned)
+        print(f"   [Debug] Scanned {scanner.chunks} chunk(s) of {path}{' (early stop)' if early_stop else ''}.")
+
+        meta = {
+            "source": source_label or os.path.basename(path),
+            "chunks_scanned": scanner.chunks,
+            "chars_scanned": scanner.chars,
+            "early_stop": early_stop
+        }
+        return self._resolve(clean_text, start, meta, regex_payload=regex_payload,
+                             ai_text=clean_text[:ai_budget])
 
     def _sanitize_input(self, text):
         if not text: return ""
+        if text.replace("\n", "").replace("\t", "").isprintable():
+            return text  # Fast path: nothing to strip
         return "".join(ch for ch in text if ch.isprintable() or ch in ['\n', '\t'])
 
-    def _map_via_ai(self, text):
+    def _signal_key(self, text):
+        # Guard for near-duplicates: every number (damage counts, anything the
+        # model may read) and the regex-visible signal must be identical
+        return numeric_guard(text), tuple(sorted(self._map_via_regex(text).items()))
+
+    def _map_via_ai(self, text, hedge=None):
         prompt = f"""
         Extract strict JSON. 
         Rules:
@@ -72,9 +320,13 @@ class UniversalTranslator:
         Input: "{text}"
         Return ONLY JSON.
         """
+        # Through the breaker: an open circuit returns None at once
+        raw = self.breaker.call(lambda: self.model.generate_content(prompt).text,
+                                hedge=hedge, hedge_after=self.hedge_after)
+        if isinstance(raw, dict):
+            return raw  # Hedged: the regex answered first
         try:
-            response = self.model.generate_content(prompt)
-            clean = response.text.replace("```json", "").replace("```", "").strip()
+            clean = raw.replace("```json", "").replace("```", "").strip()
             return json.loads(clean)
         except Exception:
             return None # Return None to trigger fallback
@@ -83,22 +335,18 @@ class UniversalTranslator:
         data = {"alpha": 0, "j_friction": 0.0, "k_friction": 0.0, "status": "SIGNAL"}
         
         # ALPHA MATCH: Handles "Qty: 100" AND "100 units"
-        # Group 1: Leading (Qty: 100)
-        # Group 2: Trailing (100 units)
-        qty_match = re.search(r"(?:qty|quantity|units|count)\s*[:=]?\s*(\d+)|(\d+)\s*(?:units|qty|quantity|pcs)", text, re.IGNORECASE)
+        qty_match = QTY_PATTERN.search(text)
         if qty_match:
-            val = qty_match.group(1) or qty_match.group(2)
-            data["alpha"] = int(val)
+            data["alpha"] = _alpha_value(qty_match)
         
         # J-FRICTION MATCH
-        hours = re.search(r"(\d+)\s*hours?\s*(?:late|delay)", text, re.IGNORECASE)
-        if hours: data["j_friction"] = min(1.0, int(hours.group(1)) / 24.0)
+        hours = HOURS_PATTERN.search(text)
+        if hours: data["j_friction"] = _j_value(hours)
 
         # K-FRICTION MATCH
-        cost = re.search(r"\$\s*([\d,]+)", text)
+        cost = COST_PATTERN.search(text)
         if cost:
-            val = float(cost.group(1).replace(",", ""))
-            data["k_friction"] = min(1.0, val / 10000.0)
+            data["k_friction"] = _k_value(cost)
 
         if data["alpha"] == 0 and data["j_friction"] == 0 and data["k_friction"] == 0:
             return {"status": "TOPOLOGICAL_WASTE"}
@@ -108,6 +356,8 @@ class UniversalTranslator:
     def _save_artifact(self, data):
         # Use Microseconds to avoid collision
         filename = f"shadow_node/artifact_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.json"
-        with open(filename, 'w') as f:
+        # Temp file + rename: the artifact store never sees a half-written file
+        with open(f"{filename}.tmp", 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(f"{filename}.tmp", filename)
         return filename
\ No newline at end of file
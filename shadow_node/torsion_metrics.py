@@ -34,8 +34,49 @@ REFERENCE:
    Section 5: Economic Phase Shift (Consensus vs. Torsion).
 """
 
+import heapq
+import itertools
 import math
+import time
 from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class StateSchema:
+    """
+    Fixed field order (and dtype) for node states.
+    Compiles once into an itemgetter, so vectorizing a state no longer
+    depends on dict ordering or per-value isinstance checks.
+    """
+
+    def __init__(self, fields: Sequence[str], dtype=float):
+        if not fields:
+            raise ValueError("A StateSchema needs at least one field.")
+        self.fields = tuple(fields)
+        self.dtype = np.dtype(dtype)
+        getter = itemgetter(*self.fields)
+        if len(self.fields) == 1:
+            self._getter = lambda state: (getter(state),)
+        else:
+            self._getter = getter
+
+    def extract(self, state: dict) -> list:
+        try:
+            return [float(val) for val in self._getter(state)]
+        except KeyError as e:
+            raise ValueError(f"Schema Violation: missing field {e}")
+
+    def extract_many(self, states: Sequence[dict]) -> np.ndarray:
+        """Vectorizes many states into an (n, n_fields) array."""
+        try:
+            rows = list(map(self._getter, states))
+        except KeyError as e:
+            raise ValueError(f"Schema Violation: missing field {e}")
+        return np.array(rows, dtype=self.dtype).reshape(len(rows), len(self.fields))
+
 
 class TorsionMonitor:
     """
@@ -43,6 +84,17 @@ class TorsionMonitor:
     between nodes.
     """
 
+    def __init__(self, schema: Optional[StateSchema] = None):
+        self.schema = schema
+
+    def register_schema(self, fields: Sequence[str], dtype=float) -> StateSchema:
+        """
+        Pins the state layout. Subsequent vectorization (single and batch)
+        reads exactly these fields, in this order.
+        """
+        self.schema = StateSchema(fields, dtype)
+        return self.schema
+
     def calculate_h1_metric(self, manager_state: dict, driver_state: dict) -> float:
         """
         Computes the Coboundary Operator delta^0.
@@ -60,6 +112,40 @@ class TorsionMonitor:
 
         return torsion_magnitude
 
+    def calculate_h1_metric_batch(self, manager_states: Sequence[dict], driver_states: Sequence[dict]) -> np.ndarray:
+        """
+        Scores many Manager/Driver state pairs at once.
+        Matches calculate_h1_metric pair by pair (float64 schema or no schema).
+        """
+        if len(manager_states) != len(driver_states):
+            raise ValueError("Topological Mismatch: state batches differ in length.")
+        if not manager_states:
+            return np.zeros(0)
+
+        if self.schema is not None:
+            m = self.schema.extract_many(manager_states)
+            d = self.schema.extract_many(driver_states)
+        else:
+            v_m = [self._vectorize(state) for state in manager_states]
+            v_d = [self._vectorize(state) for state in driver_states]
+            widths = {len(v) for v in v_m} | {len(v) for v in v_d}
+            if len(widths) != 1:
+                # Ragged states: keep the per-pair zip semantics
+                return np.array([
+                    math.sqrt(sum((a - b) ** 2 for a, b in zip(vm, vd))) for vm, vd in zip(v_m, v_d)
+                ])
+            m, d = np.array(v_m, dtype=float), np.array(v_d, dtype=float)
+            m, d = m.reshape(len(v_m), -1), d.reshape(len(v_d), -1)
+
+        # Accumulate column by column in the scalar path's order. float_power
+        # goes through C pow() like Python's ** (numpy's ** 2 is x*x, which
+        # can differ by one ulp), so the results match bit for bit.
+        diff = m - d
+        delta_sq = np.zeros(len(diff))
+        for col in range(diff.shape[1]):
+            delta_sq += np.float_power(diff[:, col], 2)
+        return np.sqrt(delta_sq)
+
     def get_heat_color(self, torsion: float) -> str:
         """
         Maps Torsion magnitude to UI Heat (Red/Green).
@@ -75,4 +161,128 @@ class TorsionMonitor:
     def _vectorize(self, state: dict) -> list:
         # Helper: Turn state dict into comparable vector
         # E.g., {'route_id': 105} -> [105.0]
-        return [float(val) for val in state.values() if isinstance(val, (int, float))]
\ No newline at end of file
+        if self.schema is not None:
+            return self.schema.extract(state)
+        return [float(val) for val in state.values() if isinstance(val, (int, float))]
+
+class PendingAckTracker:
+    """
+    Ledger of unacknowledged Manager -> Driver instructions.
+
+    Every pending message is an open interval [t_sent, t_ack) carrying the
+    Torsion measured at send time. The tracker keeps the aggregate
+    "Active Torsion" and the heat-color counts up to date on every send/ack,
+    so polling them is O(1).
+
+    Complexity:
+      - send: O(log n) (heap push)
+      - ack:  O(1) amortized (lazy heap deletion, periodic compaction)
+      - oldest(k): O(k log k) over the age-ordered heap
+    """
+
+    def __init__(self, monitor: Optional[TorsionMonitor] = None, clock=time.time):
+        self.monitor = monitor or TorsionMonitor()
+        self.clock = clock
+        self._pending: Dict[Any, tuple] = {}   # message_id -> (sent_at, seq, torsion, color)
+        self._heap: List[tuple] = []           # (sent_at, seq, message_id), may hold stale entries
+        self._seq = itertools.count()
+        self._active_torsion = 0.0
+        self._heat_counts = {"#00FF00": 0, "#FFA500": 0, "#FF0000": 0}
+        self._acked = 0
+        self._latency_total = 0.0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def send(self, message_id, manager_state: dict, driver_state: dict, sent_at: Optional[float] = None) -> float:
+        """
+        Opens the latency interval for a message. Re-sending an id replaces it.
+        Returns the Torsion of the edge at t_sent.
+        """
+        if message_id in self._pending:
+            self._remove(message_id)
+
+        sent_at = self.clock() if sent_at is None else sent_at
+        torsion = self.monitor.calculate_h1_metric(manager_state, driver_state)
+        color = self.monitor.get_heat_color(torsion)
+        seq = next(self._seq)
+
+        self._pending[message_id] = (sent_at, seq, torsion, color)
+        heapq.heappush(self._heap, (sent_at, seq, message_id))
+        self._active_torsion += torsion
+        self._heat_counts[color] += 1
+        return torsion
+
+    def ack(self, message_id, acked_at: Optional[float] = None) -> Optional[float]:
+        """
+        Closes the interval (H^1 collapses on this edge).
+        Returns the latency Delta t, or None for an unknown message.
+        """
+        if message_id not in self._pending:
+            return None
+        sent_at = self._remove(message_id)
+        latency = (self.clock() if acked_at is None else acked_at) - sent_at
+        self._acked += 1
+        self._latency_total += latency
+        return latency
+
+    @property
+    def active_torsion(self) -> float:
+        return self._active_torsion
+
+    @property
+    def heat_counts(self) -> Dict[str, int]:
+        return dict(self._heat_counts)
+
+    def oldest(self, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        The k oldest pending messages, oldest first.
+        Walks the heap from the root with a frontier heap, skipping stale entries.
+        """
+        now = self.clock()
+        heap = self._heap
+        result = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < k:
+            (sent_at, seq, message_id), idx = heapq.heappop(frontier)
+            entry = self._pending.get(message_id)
+            if entry is not None and entry[1] == seq:
+                _, _, torsion, color = entry
+                result.append({
+                    "message_id": message_id,
+                    "sent_at": sent_at,
+                    "age": now - sent_at,
+                    "torsion": torsion,
+                    "color": color
+                })
+            for child in (2 * idx + 1, 2 * idx + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cheap aggregate for UI polling."""
+        oldest = self.oldest(1)
+        return {
+            "pending": len(self._pending),
+            "active_torsion": self._active_torsion,
+            "heat": self.heat_counts,
+            "oldest_age": oldest[0]["age"] if oldest else 0.0,
+            "acked": self._acked,
+            "mean_latency": self._latency_total / self._acked if self._acked else 0.0
+        }
+
+    def _remove(self, message_id) -> float:
+        sent_at, _, torsion, color = self._pending.pop(message_id)
+        self._heat_counts[color] -= 1
+        if self._pending:
+            self._active_torsion -= torsion
+        else:
+            self._active_torsion = 0.0  # Reset accumulated float drift at full consensus
+
+        # Lazy deletion: compact once stale entries dominate the heap
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [(t, seq, mid) for t, seq, mid in self._heap
+                          if mid in self._pending and self._pending[mid][1] == seq]
+            heapq.heapify(self._heap)
+        return sent_at
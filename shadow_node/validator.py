@@ -37,7 +37,18 @@ REFERENCE:
 """
 
 from typing import List, Dict, Tuple, Any
+from collections import OrderedDict
+import hashlib
 import math
+import threading
+
+import numpy as np
+
+from shared_core.cycle_basis import CycleBasis
+
+HOLONOMY_EPSILON = 1e-5  # Same float tolerance as compute_coboundary
+BASIS_CACHE_SIZE = 256
+BASIS_CACHE_MAX_EDGES = 10000  # Larger topologies are rebuilt rather than pinned in memory
 
 class SheafValidator:
     """
@@ -97,4 +108,91 @@ class SheafValidator:
                     "torsion": result['torsion_magnitude'],
                     "status": result['status']
                 })
-        return audit_log
\ No newline at end of file
+        return audit_log
+
+    @staticmethod
+    def audit_cycle_basis(nodes: Dict[str, List[float]], edge_map: List[Tuple[str, str]],
+                          edge_deltas: Dict[Tuple[str, str], List[float]] = None) -> List[Dict]:
+        """
+        Finds every independent cycle of the complex (fundamental cycle basis)
+        and reports the torsion accumulated around each one.
+
+        A cycle is obstructed only when its holonomy (the signed sum of
+        deltas around it) is non-zero. Node differences always telescope to
+        zero around a loop, so torsion alone is a local mismatch, not an
+        H^1 class.
+
+        Args:
+            nodes: Node sections; edge torsion is delta^0 = nodes[u] - nodes[v].
+            edge_map: The edges of the complex.
+            edge_deltas (optional): Independently observed delta per edge
+                (e.g. handshake results). Overrides the node difference, so
+                loops whose observations disagree show non-zero holonomy.
+
+        Returns:
+            One entry per basis cycle, worst holonomy first:
+                - 'accumulated_torsion': sum of ||delta|| around the cycle.
+                - 'holonomy' / 'holonomy_norm': the obstruction itself.
+                - 'closing_edge': the non-tree edge defining the basis cycle.
+                - 'obstruction_edge': the cycle's worst-torsion edge when
+                  the holonomy is non-zero, else None.
+
+        Raises:
+            ValueError: an edge references a node with no section.
+        """
+        edges = [tuple(edge) for edge in edge_map]
+        unknown = sorted({str(n) for edge in edges for n in edge if n not in nodes})
+        if unknown:
+            raise ValueError(f"Edges reference unknown nodes: {', '.join(unknown)}")
+        if not edges:
+            return []
+        basis, node_ids = _cached_cycle_basis(edges)
+        sections = np.array([nodes[n] for n in node_ids], dtype=float).reshape(len(node_ids), -1)
+        deltas = sections[basis.edges[:, 0]] - sections[basis.edges[:, 1]]
+        for i, edge in enumerate(edges if edge_deltas else ()):
+            if edge in edge_deltas:
+                deltas[i] = edge_deltas[edge]
+        audit = basis.audit(deltas)
+        sequence, indptr = basis.cycle_sequences()
+        names = [node_ids[k] for k in sequence.tolist()]
+        indptr = indptr.tolist()
+
+        audit_log = []
+        order = np.lexsort((-audit['accumulated_torsion'], -audit['holonomy_norm']))
+        for i in order:
+            u, v = edges[audit['closing_edge'][i]]
+            holonomy_norm = float(audit['holonomy_norm'][i])
+            obstructed = holonomy_norm >= HOLONOMY_EPSILON
+            audit_log.append({
+                "cycle": "->".join(names[indptr[i]:indptr[i + 1]]),
+                "closing_edge": f"{u}->{v}",
+                "obstruction_edge": "->".join(edges[audit['worst_edge'][i]]) if obstructed else None,
+                "length": int(audit['length'][i]),
+                "accumulated_torsion": float(audit['accumulated_torsion'][i]),
+                "holonomy": audit['holonomy'][i].tolist(),
+                "holonomy_norm": holonomy_norm,
+                "status": "TOPOLOGICAL_OBSTRUCTION_DETECTED" if obstructed else "GLOBAL_SECTION_ALIGNED"
+            })
+        return audit_log
+
+
+_basis_cache = OrderedDict()
+_basis_cache_lock = threading.Lock()
+
+
+def _cached_cycle_basis(edges: List[Tuple[str, str]]):
+    # The basis depends only on the topology; portfolios reuse a few shapes.
+    # Keyed on a digest so the cache never pins the edge lists themselves.
+    if len(edges) > BASIS_CACHE_MAX_EDGES:
+        return CycleBasis.from_edges(edges)
+    key = hashlib.sha1(repr(edges).encode()).digest()
+    with _basis_cache_lock:
+        if key in _basis_cache:
+            _basis_cache.move_to_end(key)
+            return _basis_cache[key]
+    entry = CycleBasis.from_edges(edges)
+    with _basis_cache_lock:
+        _basis_cache[key] = entry
+        while len(_basis_cache) > BASIS_CACHE_SIZE:
+            _basis_cache.popitem(last=False)
+    return entry
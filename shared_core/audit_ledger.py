@@ -0,0 +1,346 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import fcntl
+    LOCKING_AVAILABLE = True
+except ImportError:  # Non-POSIX: the single-writer rule is not enforced
+    LOCKING_AVAILABLE = False
+
+GENESIS = bytes(32)
+HASH_HEX = 64
+RECOVERY_BLOCK = 1 << 24
+
+
+def _json_default(value):
+    # numpy scalars/arrays from the stitcher and validators
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def canonical_json(payload):
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_json_default)
+
+
+def chain_hash(previous, body):
+    """sha256(previous digest || canonical payload bytes)."""
+    return hashlib.sha256(previous + body).digest()
+
+
+def _verify_block(path, first_seq, begin, end, previous_offset):
+    """
+    Checks records [begin, end) of a ledger file. The chain enters the block
+    through the stored hash at 'previous_offset' (None = genesis).
+    Returns the first bad seq, or None.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), end, access=mmap.ACCESS_READ) as data:
+        previous = GENESIS if previous_offset is None else bytes.fromhex(data[previous_offset:previous_offset + HASH_HEX].decode())
+        lines = data[begin:end].split(b"\n")
+    lines.pop()  # Block ends with a newline
+    try:
+        stored = bytes.fromhex(b"".join([line[:HASH_HEX] for line in lines]).decode())
+    except ValueError:
+        stored = None
+    if stored is not None and len(stored) == 32 * len(lines):
+        previous_digests = [previous] + [stored[i:i + 32] for i in range(0, len(stored) - 32, 32)]
+        sha256 = hashlib.sha256
+        computed = b"".join([sha256(p + line[HASH_HEX + 1:]).digest() for p, line in zip(previous_digests, lines)])
+        if computed == stored:
+            return None
+    # Slow path: locate the first bad line
+    for i, line in enumerate(lines):
+        digest = chain_hash(previous, line[HASH_HEX + 1:])
+        if digest.hex().encode() != line[:HASH_HEX]:
+            return first_seq + i
+        previous = digest
+    return None
+
+
+def handshake_record(result, edge, source, epoch=None):
+    """Ledger record for a stitcher.perform_handshake result."""
+    return {
+        "kind": "handshake",
+        "edge": edge,
+        "source": source,
+        "epoch": epoch if epoch is not None else result.get("basis_used"),
+        "torsion": float(result["torsion"]),
+        "status": result["status"],
+        "context": result.get("context")
+    }
+
+
+def coboundary_record(result, edge, source, epoch=None):
+    """Ledger record for a SheafValidator.compute_coboundary result."""
+    return {
+        "kind": "coboundary",
+        "edge": edge,
+        "source": source,
+        "epoch": epoch,
+        "torsion": float(result["torsion_magnitude"]),
+        "status": result["status"],
+        "delta": [float(x) for x in result["delta_vector"]]
+    }
+
+
+class AuditLedger:
+    """
+    Append-only, hash-chained log of audit results.
+
+    File format: one record per line, "<hash_hex> <payload_json>\\n", where
+    hash = sha256(previous hash || payload) and the first record chains to
+    32 zero bytes. Editing, dropping or reordering any line breaks every
+    hash after it.
+
+    - Appends assign 'seq' and a non-decreasing 'ts'. Concurrent appenders
+      share one write + fsync (group commit): whoever finds no commit in
+      progress writes every pending line, the others wait for it.
+    - Secondary indexes (edge, source, time) are rebuilt on open and kept in
+      memory as offsets, so query() reads only the matching lines.
+    - verify() re-hashes the file from a memory map.
+
+    Single writer: seq and the chain head live in this object, so only one
+    AuditLedger (one process) may have a path open. Opening takes an
+    exclusive flock and raises if another writer holds it; a second
+    process appending would fork the chain, and its recovery would truncate
+    the other's in-flight record as torn.
+    """
+
+    def __init__(self, path, durable=True):
+        self.path = path
+        self.durable = durable
+        self._cond = threading.Condition()
+        self._committing = False
+        self._failure = None
+        self._pending = []
+        self._offsets = array("q")
+        self._lengths = array("q")
+        self._ts = array("d")
+        self._by_edge = {}
+        self._by_source = {}
+        self._head = GENESIS
+        self._size = 0
+        self.stats = {"records": 0, "groups": 0, "write_seconds": 0.0}
+
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._lock_writer()
+        self._recover()
+        self._read_fd = os.open(path, os.O_RDONLY)
+
+    def _lock_writer(self):
+        # Before recovery: only the owner may truncate a torn tail
+        if not LOCKING_AVAILABLE:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._fd)
+            raise IOError(f"Ledger {self.path} is already open by another writer "
+                          f"(one AuditLedger per file).") from None
+
+    # --- OPEN / RECOVERY ---
+    def _recover(self):
+        offset = 0
+        last = None
+        with open(self.path, "rb") as f:
+            while True:
+                f.seek(offset)
+                block = f.read(RECOVERY_BLOCK)
+                end = block.rfind(b"\n") + 1
+                if end == 0:
+                    break  # EOF, or a torn write from a crash: dropped below
+                # canonical_json is ASCII, so str lengths are byte lengths
+                lines = block[:end].decode("ascii").split("\n")
+                lines.pop()
+                # One C-level parse per block instead of one call per line
+                payloads = json.loads("[" + ",".join([line[HASH_HEX + 1:] for line in lines]) + "]")
+                lengths = [len(line) + 1 for line in lines]
+                self._index_many(payloads, offset, lengths)
+                offset += sum(lengths)
+                last = lines[-1]
+        if last is not None:
+            self._head = bytes.fromhex(last[:HASH_HEX])
+        if offset < os.path.getsize(self.path):
+            print(f"⚠️ Ledger {self.path}: dropping incomplete trailing record.")
+            os.truncate(self.path, offset)
+        self._size = offset
+
+    def _index_many(self, payloads, offset, lengths):
+        offsets = np.cumsum([offset] + lengths[:-1], dtype=np.int64)
+        self._offsets.frombytes(offsets.tobytes())
+        self._lengths.extend(lengths)
+        self._ts.extend([payload["ts"] for payload in payloads])
+        by_edge, by_source = self._by_edge, self._by_source
+        for payload in payloads:
+            seq = payload["seq"]
+            edge, source = payload.get("edge"), payload.get("source")
+            seqs = by_edge.get(edge)
+            if seqs is None:
+                seqs = by_edge[edge] = array("q")
+            seqs.append(seq)
+            seqs = by_source.get(source)
+            if seqs is None:
+                seqs = by_source[source] = array("q")
+            seqs.append(seq)
+
+    # --- APPEND ---
+    def append(self, record):
+        """Appends one record (dict). Returns its seq once durable."""
+        return self.append_batch([record])[0]
+
+    def append_batch(self, records):
+        """Appends records in order with one group commit. Returns their seqs."""
+        with self._cond:
+            self._check()
+            seqs = []
+            last_ts = self._pending[-1][0]["ts"] if self._pending else (self._ts[-1] if self._ts else 0.0)
+            next_seq = len(self._offsets) + len(self._pending)
+            for record in records:
+                payload = dict(record, seq=next_seq, ts=max(time.time(), last_ts))
+                body = canonical_json(payload).encode()
+                self._head = chain_hash(self._head, body)
+                self._pending.append((payload, self._head.hex().encode() + b" " + body + b"\n"))
+                seqs.append(next_seq)
+                next_seq += 1
+                last_ts = payload["ts"]
+
+            target = next_seq
+            while len(self._offsets) < target:
+                self._check()
+                if self._committing:
+                    self._cond.wait()
+                else:
+                    self._commit()
+            return seqs
+
+    def _commit(self):
+        # Called under the lock; releases it for the write itself
+        self._committing = True
+        group, self._pending = self._pending, []
+        data = b"".join(line for _, line in group)
+        self._cond.release()
+        try:
+            start = time.perf_counter()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._fd, view):]
+            if self.durable:
+                os.fsync(self._fd)
+            elapsed = time.perf_counter() - start
+        except OSError as e:
+            self._cond.acquire()
+            # The in-memory chain is ahead of the file: refuse further appends
+            self._failure = e
+            self._committing = False
+            self._cond.notify_all()
+            raise
+        self._cond.acquire()
+        lengths = [len(line) for _, line in group]
+        self._index_many([payload for payload, _ in group], self._size, lengths)
+        self._size += sum(lengths)
+        self.stats["records"] += len(group)
+        self.stats["groups"] += 1
+        self.stats["write_seconds"] += elapsed
+        self._committing = False
+        self._cond.notify_all()
+
+    def _check(self):
+        if self._failure is not None:
+            raise IOError(f"Ledger {self.path} is unavailable after a failed write: {self._failure}")
+
+    # --- QUERY ---
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, seq):
+        """The record at 'seq' (with its '_hash')."""
+        line = os.pread(self._read_fd, self._lengths[seq], self._offsets[seq])
+        record = json.loads(line[HASH_HEX + 1:])
+        record["_hash"] = line[:HASH_HEX].decode()
+        return record
+
+    def query(self, edge=None, source=None, since=None, until=None, limit=None):
+        """
+        Records matching every given filter, in append order.
+        'since'/'until' are epoch seconds (inclusive) on the ledger 'ts'.
+        """
+        with self._cond:
+            if edge is None and source is None:
+                seqs = range(len(self._offsets))
+            else:
+                lists = []
+                if edge is not None:
+                    lists.append(np.frombuffer(self._by_edge.get(edge, array("q")), dtype=np.int64))
+                if source is not None:
+                    lists.append(np.frombuffer(self._by_source.get(source, array("q")), dtype=np.int64))
+                seqs = lists[0] if len(lists) == 1 else np.intersect1d(*lists, assume_unique=True)
+                seqs = [int(seq) for seq in seqs]
+
+            # ts is non-decreasing in seq, so every index list is time-sorted
+            ts = self._ts
+            lo = 0 if since is None else bisect_left(seqs, since, key=lambda seq: ts[seq])
+            hi = len(seqs) if until is None else bisect_right(seqs, until, key=lambda seq: ts[seq])
+            selected = seqs[lo:hi]
+        if limit is not None:
+            selected = selected[:limit]
+        return [self.get(seq) for seq in selected]
+
+    def edges(self):
+        """{edge: record count}."""
+        with self._cond:
+            return {edge: len(seqs) for edge, seqs in self._by_edge.items()}
+
+    # --- VERIFY ---
+    def verify(self, start=0, workers=1, block=65536):
+        """
+        Re-hashes the chain from record 'start' (0 = genesis) to the last
+        committed record. Each line only needs the stored hash of the line
+        before it, so the file is checked in blocks of 'block' records, in
+        parallel processes when workers > 1.
+
+        Returns ok, records checked, the first bad seq (or None) and the
+        scan rate.
+        """
+        begin = time.perf_counter()
+        with self._cond:
+            count = len(self._offsets)
+            bounds = [(first, min(first + block, count)) for first in range(start, count, block)]
+            tasks = [(self.path, first,
+                      self._offsets[first], self._offsets[last - 1] + self._lengths[last - 1],
+                      self._offsets[first - 1] if first > 0 else None)
+                     for first, last in bounds]
+            scanned = tasks[-1][3] - tasks[0][2] if tasks else 0
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_verify_block, *zip(*tasks)))
+        else:
+            results = [_verify_block(*task) for task in tasks]
+
+        bad = next((seq for seq in results if seq is not None), None)
+        elapsed = time.perf_counter() - begin
+        return {
+            "ok": bad is None,
+            "records": count - start if bad is None else bad - start,
+            "first_bad_seq": bad,
+            "seconds": elapsed,
+            "mb_per_s": scanned / 1e6 / elapsed if elapsed > 0 else float("inf")
+        }
+
+    def close(self):
+        with self._cond:
+            while self._committing:
+                self._cond.wait()
+            os.close(self._fd)
+            os.close(self._read_fd)
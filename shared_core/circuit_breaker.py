@@ -0,0 +1,215 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Fast-fail guard around an unreliable remote call (the AI bridge).
+
+    - CLOSED: calls go through. 'failure_threshold' consecutive failures
+      (exceptions or timeouts) open the circuit.
+    - OPEN: calls are not attempted; the fallback answers at once. After
+      'cooldown' seconds the circuit half-opens.
+    - HALF_OPEN: one probe call goes through (others still fall back). A
+      success closes the circuit; a failure re-opens it with the cooldown
+      multiplied by 'backoff' (capped at 'max_cooldown').
+
+    Calls run on a small thread pool so a hung request can be abandoned
+    after 'timeout' seconds. With 'hedge_after', a call that is still
+    pending after that delay is answered by the hedge (e.g. the regex map)
+    if it has a result; the remote call finishes in the background and
+    still counts toward the circuit state. Its 'timeout' still applies: a
+    hedged call that outlives it is recorded as a timed-out failure the
+    next time the breaker is consulted.
+
+    At most 'max_workers' calls are in flight; further calls fall back at
+    once instead of queueing behind hung requests.
+    """
+
+    def __init__(self, name, failure_threshold=3, cooldown=30.0, timeout=10.0,
+                 hedge_after=None, backoff=2.0, max_cooldown=300.0, max_workers=4, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.backoff = backoff
+        self.max_cooldown = max_cooldown
+        self.max_workers = max_workers
+        self.clock = clock
+
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+        self._late = {}  # Hedged future -> deadline, until it settles or expires
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+                      "short_circuits": 0, "saturated": 0, "hedged": 0, "opened": 0}
+
+    # --- STATE MACHINE ---
+    def allow(self):
+        """True if a call may be attempted now (claims the probe when half-open)."""
+        self._expire_late()
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.stats["short_circuits"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            self._failures = 0
+            if self.state != CLOSED:
+                print(f">> [{self.name}] Circuit closed.")
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def record_failure(self, timed_out=False):
+        with self._lock:
+            self.stats["failures"] += 1
+            if timed_out:
+                self.stats["timeouts"] += 1
+            self._failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.max_cooldown, self.cooldown * self.backoff)
+                self._open()
+            elif self.state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        # Called under the lock
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+        self.stats["opened"] += 1
+        print(f">> [{self.name}] Circuit open for {self.cooldown:.0f}s. Failing fast.")
+
+    # --- CALLS ---
+    def call(self, fn, fallback=None, hedge=None, hedge_after=None):
+        """
+        Runs fn() through the breaker.
+
+        Args:
+            fn: Zero-argument remote call.
+            fallback: Zero-argument callable answering when the circuit is open
+                or the call fails/times out (None returns None).
+            hedge: Zero-argument callable tried once the call is 'hedge_after'
+                seconds late; a non-None result is returned immediately.
+            hedge_after: Per-call override of the breaker's hedging delay.
+        """
+        hedge_after = self.hedge_after if hedge_after is None else hedge_after
+        fallback = fallback or (lambda: None)
+        if not self.allow():
+            return fallback()
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                # Every worker is busy (likely hung): do not queue behind them
+                self.stats["saturated"] += 1
+                if self.state == HALF_OPEN:
+                    self._probing = False
+                return fallback()
+            self._in_flight += 1
+            self.stats["calls"] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"breaker-{self.name}")
+        future = self._executor.submit(fn)
+        future.add_done_callback(self._release)
+        deadline = None if self.timeout is None else self.clock() + self.timeout
+
+        if hedge is not None and hedge_after is not None:
+            try:
+                return self._settle(future, hedge_after)
+            except FutureTimeout:
+                hedged = hedge()
+                if hedged is not None:
+                    with self._lock:
+                        self.stats["hedged"] += 1
+                        self._late[future] = deadline
+                    future.add_done_callback(self._record_late)
+                    return hedged
+            except Exception:
+                return fallback()
+
+        try:
+            remaining = None if deadline is None else max(0.0, deadline - self.clock())
+            return self._settle(future, remaining)
+        except FutureTimeout:
+            self.record_failure(timed_out=True)
+            return fallback()
+        except Exception:
+            return fallback()
+
+    def _settle(self, future, timeout):
+        # Records the outcome of a finished call; re-raises its exception
+        try:
+            result = future.result(timeout)
+        except FutureTimeout:
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record_late(self, future):
+        with self._lock:
+            if future not in self._late:
+                return  # Already counted as a timeout by _expire_late
+            del self._late[future]
+        if future.exception() is None:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def _expire_late(self):
+        # Hedged calls still pending past their deadline count as timeouts
+        if not self._late:
+            return
+        now = self.clock()
+        with self._lock:
+            expired = [future for future, deadline in self._late.items()
+                       if deadline is not None and now >= deadline and not future.done()]
+            for future in expired:
+                del self._late[future]
+        for _ in expired:
+            self.record_failure(timed_out=True)
+
+    def snapshot(self):
+        self._expire_late()
+        with self._lock:
+            return dict(self.stats, state=self.state, cooldown=self.cooldown, consecutive_failures=self._failures)
+
+
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(name, **kwargs):
+    """The process-wide breaker for a remote service (created on first use)."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = _BREAKERS[name] = CircuitBreaker(name, **kwargs)
+        return breaker
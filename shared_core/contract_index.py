@@ -0,0 +1,145 @@
+import bisect
+import json
+import os
+import threading
+
+from shared_core.relay_store import packet_time
+
+UNASSIGNED = "UNASSIGNED"
+
+
+class ContractRegistry:
+    """
+    Ground truth per contract. Each contract carries its expected
+    quantity; the truth section is [Exp_Qty, 0, 0, 0] (zero friction).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._contracts = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                self._contracts = json.load(f)
+
+    def register(self, contract_id, expected_qty, **terms):
+        with self._lock:
+            self._contracts[contract_id] = dict(terms, expected_qty=float(expected_qty))
+            self._save()
+
+    def get(self, contract_id):
+        return self._contracts.get(contract_id)
+
+    def truth_vector(self, contract_id):
+        """[Exp_Qty, 0, 0, 0] for a registered contract, None otherwise."""
+        contract = self._contracts.get(contract_id)
+        if contract is None:
+            return None
+        return [contract["expected_qty"], 0.0, 0.0, 0.0]
+
+    def __contains__(self, contract_id):
+        return contract_id in self._contracts
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self._contracts, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class ContractPacketIndex:
+    """
+    Index from contract ID to its packets, ordered by packet timestamp.
+
+    - latest(contract_id): O(1) (tail of the per-contract list)
+    - range(contract_id, t0, t1): O(log n + k) via bisect
+    - add(packet): amortized O(1) append for in-order arrivals; a late
+      arrival, a re-delivery or remove() shifts the contract's list, O(n)
+
+    A packet re-delivered with a known ID replaces the indexed version
+    (it may move to another contract or timestamp). Fed incrementally from
+    a PacketStore offset, so the relay is never rescanned.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._times = {}    # contract_id -> sorted list of timestamps
+        self._packets = {}  # contract_id -> packets aligned with _times
+        self._where = {}    # packet_id -> (contract_id, timestamp) of the indexed version
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Indexes packets that arrived in the store since the last sync."""
+        if self.store is None:
+            return 0
+        with self._lock:
+            packets, self._offset = self.store.since(self._offset)
+        for packet in packets:
+            self.add(packet)
+        return len(packets)
+
+    def add(self, packet):
+        packet_id = packet.get("id")
+        contract_id = packet.get("contract_id") or UNASSIGNED
+        stamp = packet_time(packet)
+        with self._lock:
+            if packet_id is not None:
+                if packet_id in self._where:
+                    self._discard(packet_id)
+                self._where[packet_id] = (contract_id, stamp)
+            times = self._times.setdefault(contract_id, [])
+            packets = self._packets.setdefault(contract_id, [])
+            if not times or stamp >= times[-1]:
+                times.append(stamp)
+                packets.append(packet)
+            else:
+                pos = bisect.bisect_right(times, stamp)
+                times.insert(pos, stamp)
+                packets.insert(pos, packet)
+
+    def remove(self, packet_id):
+        """Drops a packet (e.g. retracted upstream). Returns False if it was not indexed."""
+        with self._lock:
+            if packet_id not in self._where:
+                return False
+            self._discard(packet_id)
+            return True
+
+    def _discard(self, packet_id):
+        # Caller holds the lock
+        contract_id, stamp = self._where.pop(packet_id)
+        times, packets = self._times[contract_id], self._packets[contract_id]
+        pos = bisect.bisect_left(times, stamp)
+        while packets[pos].get("id") != packet_id:
+            pos += 1
+        del times[pos]
+        del packets[pos]
+        if not times:
+            del self._times[contract_id]
+            del self._packets[contract_id]
+
+    def contracts(self):
+        with self._lock:
+            return sorted(self._times)
+
+    def latest(self, contract_id):
+        with self._lock:
+            packets = self._packets.get(contract_id)
+            return packets[-1] if packets else None
+
+    def range(self, contract_id, t_start=None, t_end=None):
+        """Packets of a contract with t_start <= timestamp <= t_end (epoch seconds)."""
+        with self._lock:
+            times = self._times.get(contract_id, [])
+            lo = 0 if t_start is None else bisect.bisect_left(times, t_start)
+            hi = len(times) if t_end is None else bisect.bisect_right(times, t_end)
+            return self._packets.get(contract_id, [])[lo:hi]
+
+    def count(self, contract_id):
+        with self._lock:
+            return len(self._times.get(contract_id, []))
+
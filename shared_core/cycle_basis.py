@@ -0,0 +1,225 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+
+class CycleBasis:
+    """
+    Fundamental cycle basis of a graph from a BFS spanning forest.
+
+    Every non-tree edge e = (u, v) closes exactly one independent cycle:
+        u -> v (along e), then v -> ... -> lca(u, v) -> ... -> u (along the tree)
+    so the basis has m - n + c cycles (c = connected components).
+
+    Everything is vectorized over nodes and cycles: the forest comes from
+    scipy's BFS and LCA queries use binary lifting. The audit is one sparse
+    product with the signed cycle-edge incidence matrix, built once per
+    topology in O(total cycle length).
+    """
+
+    def __init__(self, n_nodes, edges):
+        self.n_nodes = n_nodes
+        self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        n, m = n_nodes, len(self.edges)
+        root = n  # Virtual root joining all components into one tree
+
+        # 1. Spanning forest: BFS from a virtual root linked to one node per component
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        graph = sp.coo_matrix((np.ones(m), (u, v)), shape=(n, n)).tocsr()
+        n_comp, labels = connected_components(graph, directed=False)
+        reps = np.unique(labels, return_index=True)[1]
+        rows = np.concatenate([u, v, np.full(len(reps), root), reps])
+        cols = np.concatenate([v, u, reps, np.full(len(reps), root)])
+        full = sp.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n + 1, n + 1)).tocsr()
+        _, pred = breadth_first_order(full, root, directed=True, return_predecessors=True)
+        parent = np.where(pred < 0, root, pred)
+        parent[root] = root
+        self.parent = parent
+        self.n_components = n_comp
+
+        # 2. Tree edge of every node: first edge joining it to its parent
+        span = np.int64(n + 1)
+        keys = np.minimum(u, v) * span + np.maximum(u, v)
+        order = np.argsort(keys, kind="stable")
+        children = np.flatnonzero(parent[:n] != root)
+        child_parents = parent[children]
+        tree_keys = np.minimum(children, child_parents) * span + np.maximum(children, child_parents)
+        tree_edge_ids = order[np.searchsorted(keys[order], tree_keys)]
+
+        self.parent_edge = np.full(n + 1, -1, dtype=np.int64)
+        self.parent_edge[children] = tree_edge_ids
+        # +1 when the stored edge runs parent -> child (the root-to-node direction)
+        self.parent_sign = np.zeros(n + 1)
+        self.parent_sign[children] = np.where(u[tree_edge_ids] == child_parents, 1.0, -1.0)
+
+        is_tree = np.zeros(m, dtype=bool)
+        is_tree[tree_edge_ids] = True
+        self.closing_edges = np.flatnonzero(~is_tree)
+
+        # 3. Binary lifting table and depth
+        self._up = [parent]
+        while not np.all(self._up[-1][self._up[-1]] == self._up[-1]):
+            self._up.append(self._up[-1][self._up[-1]])
+        self.depth = self._prefix_sum(np.where(np.arange(n + 1) == root, 0.0, 1.0)).astype(np.int64)
+
+        # 4. Lowest common ancestor of every closing edge
+        cu, cv = self.edges[self.closing_edges, 0], self.edges[self.closing_edges, 1]
+        self.lca = self._lca(cu, cv)
+        self._paths = None
+        self._incidence = None
+
+    @classmethod
+    def from_edges(cls, edges):
+        """Builds the basis from labelled edges. Returns (basis, node_ids)."""
+        edges = list(edges)
+        node_ids = list(dict.fromkeys(node for edge in edges for node in edge))
+        index = {node: i for i, node in enumerate(node_ids)}
+        return cls(len(node_ids), [(index[a], index[b]) for a, b in edges]), node_ids
+
+    def __len__(self):
+        return len(self.closing_edges)
+
+    # --- TREE ALGEBRA ---
+    def _prefix_sum(self, node_values):
+        """
+        Sum of node_values along the tree path root -> v, for every v, by
+        pointer doubling. The (virtual) root's value must be zero.
+        """
+        acc = np.array(node_values, dtype=float)
+        for up in self._up:
+            acc = acc + acc[up]
+        return acc
+
+    def _lca(self, a, b):
+        a, b = a.copy(), b.copy()
+        swap = self.depth[a] < self.depth[b]
+        a[swap], b[swap] = b[swap], a[swap]
+        diff = self.depth[a] - self.depth[b]
+        for k, up in enumerate(self._up):
+            lift = ((diff >> k) & 1).astype(bool)
+            a[lift] = up[a[lift]]
+        for up in reversed(self._up):
+            ua, ub = up[a], up[b]
+            move = ua != ub
+            a[move], b[move] = ua[move], ub[move]
+        return np.where(a == b, a, self._up[0][a])
+
+    # --- CYCLE PATHS ---
+    def _climb(self):
+        """
+        Tree edges of every basis cycle at once: both ends of each closing
+        edge climb toward their LCA in lock-step (one vectorized step per
+        tree level).
+
+        Returns (cycle, node, side, step): 'node' is the lower end of a tree
+        edge on the cycle, side +1 on the closing edge's source half and -1
+        on its target half, 'step' the distance from that end.
+        """
+        if self._paths is None:
+            n_cycles = len(self.closing_edges)
+            empty = np.zeros(0, dtype=np.int64)
+            parts = [(empty, empty, empty, empty)]
+            for side, column in ((1, 0), (-1, 1)):
+                ids = np.arange(n_cycles)
+                node = self.edges[self.closing_edges, column]
+                step = 0
+                while len(ids):
+                    active = node != self.lca[ids]
+                    ids, node = ids[active], node[active]
+                    parts.append((ids, node, np.full(len(ids), side), np.full(len(ids), step)))
+                    node = self.parent[node]
+                    step += 1
+            self._paths = tuple(np.concatenate([part[k] for part in parts]) for k in range(4))
+        return self._paths
+
+    def incidence(self):
+        """
+        Sparse signed cycle-edge incidence C (cycles x edges), so that
+        holonomy = C @ edge_deltas for all cycles in one product. The closing
+        edge enters with +1; tree edges with the sign that walks the cycle
+        source -> target -> lca -> source.
+        """
+        if self._incidence is None:
+            cycle, node, side, _ = self._climb()
+            n_cycles = len(self.closing_edges)
+            rows = np.concatenate([np.arange(n_cycles), cycle])
+            cols = np.concatenate([self.closing_edges, self.parent_edge[node]])
+            signs = np.concatenate([np.ones(n_cycles), side * self.parent_sign[node]])
+            self._incidence = sp.csr_matrix((signs, (rows, cols)), shape=(n_cycles, len(self.edges)))
+        return self._incidence
+
+    def cycle_sequences(self):
+        """
+        Node indices of every basis cycle (as cycle_nodes(i) for all i),
+        assembled with one sort instead of a walk per cycle.
+
+        Returns (nodes, indptr): cycle i is nodes[indptr[i]:indptr[i + 1]].
+        """
+        cycle, node, side, step = self._climb()
+        n_cycles = len(self.closing_edges)
+        ids = np.arange(n_cycles)
+        source = self.edges[self.closing_edges, 0]
+        # Order within a cycle: source, target half upward, lca, source half downward
+        group = np.concatenate([np.zeros(n_cycles), np.where(side < 0, 1, 3), np.full(n_cycles, 2)])
+        order = np.concatenate([np.zeros(n_cycles), np.where(side < 0, step, -step), np.zeros(n_cycles)])
+        cycles = np.concatenate([ids, cycle, ids])
+        nodes = np.concatenate([source, node, self.lca])
+        sort = np.lexsort((order, group, cycles))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(cycles, minlength=n_cycles))])
+        return nodes[sort], indptr
+
+    # --- AUDIT ---
+    def audit(self, edge_deltas):
+        """
+        Accumulates edge torsion around every basis cycle.
+
+        Args:
+            edge_deltas: (m, dim) coboundary of every edge, oriented as stored.
+
+        Returns:
+            Dict of arrays, one entry per cycle:
+                - 'closing_edge': index of the non-tree edge closing the cycle.
+                - 'length': number of edges in the cycle.
+                - 'accumulated_torsion': sum of ||delta_e|| around the cycle.
+                - 'holonomy': signed sum of delta_e around the cycle (c, dim).
+                  Zero when the edges derive from consistent node sections;
+                  non-zero marks a loop that cannot close (an H^1 class).
+                - 'holonomy_norm': ||holonomy||.
+                - 'worst_edge': index of the cycle's largest-||delta_e|| edge.
+        """
+        deltas = np.asarray(edge_deltas, dtype=float)
+        deltas = deltas.reshape(len(self.edges), -1)
+        norms = np.linalg.norm(deltas, axis=1)
+        incidence = self.incidence()
+        holonomy = np.asarray(incidence @ deltas).reshape(len(self.closing_edges), deltas.shape[1])
+
+        # Row-wise argmax of |C| * ||delta||: every row holds at least its closing edge
+        weights = norms[incidence.indices]
+        starts = incidence.indptr[:-1]
+        row_max = np.maximum.reduceat(weights, starts) if len(weights) else np.zeros(0)
+        lengths = np.diff(incidence.indptr)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        hits = np.flatnonzero(weights == row_max[rows])
+        first = hits[np.unique(rows[hits], return_index=True)[1]]
+        return {
+            "closing_edge": self.closing_edges,
+            "length": lengths,
+            "accumulated_torsion": np.add.reduceat(weights, starts) if len(weights) else np.zeros(0),
+            "holonomy": holonomy,
+            "holonomy_norm": np.linalg.norm(holonomy, axis=1),
+            "worst_edge": incidence.indices[first]
+        }
+
+    def cycle_nodes(self, i):
+        """Node indices of basis cycle i, starting and ending at the closing edge's source."""
+        source, target = (int(x) for x in self.edges[self.closing_edges[i]])
+        lca = int(self.lca[i])
+        down, node = [], source
+        while node != lca:
+            down.append(node)
+            node = int(self.parent[node])
+        up, node = [], target
+        while node != lca:
+            up.append(node)
+            node = int(self.parent[node])
+        return [source] + up + [lca] + down[::-1]
@@ -0,0 +1,240 @@
+import threading
+
+import numpy as np
+
+from shared_core.relay_store import packet_time
+
+
+def bucket_aggregate(x, y, n_buckets):
+    """
+    Splits a series into n_buckets equal-count buckets and returns
+    min/max/mean per bucket. x is reported as the first x of each bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n == 0:
+        return _empty_series()
+    n_buckets = max(1, min(n_buckets, n))
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.append(starts, n))
+    return {
+        "x": x[starts],
+        "min": np.minimum.reduceat(y, starts),
+        "max": np.maximum.reduceat(y, starts),
+        "mean": np.add.reduceat(y, starts) / counts,
+        "count": counts
+    }
+
+
+def _empty_series():
+    empty = np.zeros(0)
+    return {"x": empty, "min": empty, "max": empty, "mean": empty, "count": np.zeros(0, dtype=np.int64)}
+
+
+class _Growable:
+    """Append-only numpy buffer with capacity doubling."""
+
+    def __init__(self, dtype=float):
+        self._data = np.zeros(256, dtype=dtype)
+        self.n = 0
+
+    def extend(self, values):
+        needed = self.n + len(values)
+        if needed > len(self._data):
+            self._data = np.resize(self._data, max(needed, 2 * len(self._data)))
+        self._data[self.n:needed] = values
+        self.n = needed
+
+    @property
+    def view(self):
+        return self._data[:self.n]
+
+
+class SeriesPyramid:
+    """
+    Append-only series with a multi-resolution aggregate pyramid.
+
+    Level L holds min/max/sum/count over consecutive blocks of
+    base * 2^L raw points. A query picks the finest level with at most
+    ~2 * width blocks in range and reduces those to 'width' buckets, so the
+    cost and payload depend on the chart width, not on the history length.
+    Appends are amortized O(1) per point.
+
+    x must be non-decreasing in append order (timestamps or sequence).
+    Range queries snap to whole blocks of the chosen level.
+    """
+
+    FIELDS = ("x", "min", "max", "sum", "count")
+
+    def __init__(self, base=16):
+        self.base = base
+        self._x = _Growable()
+        self._y = _Growable()
+        self._levels = []  # One {field: _Growable} per level, complete blocks only
+
+    def __len__(self):
+        return self._x.n
+
+    def extend(self, x, y):
+        self._x.extend(np.asarray(x, dtype=float))
+        self._y.extend(np.asarray(y, dtype=float))
+        self._update_levels()
+
+    def _update_levels(self):
+        # Level 0 aggregates 'base' raw points; level L+1 merges pairs of level L
+        y = self._y.view
+        src = {"x": self._x.view, "min": y, "max": y, "sum": y, "count": None}
+        width, level = self.base, 0
+        while True:
+            if len(self._levels) <= level:
+                self._levels.append({k: _Growable(np.int64 if k == "count" else float) for k in self.FIELDS})
+            dst = self._levels[level]
+            done = dst["x"].n
+            complete = len(src["x"]) // width
+            if complete > done:
+                lo, hi = done * width, complete * width
+                starts = np.arange(0, hi - lo, width)
+                dst["x"].extend(src["x"][lo:hi:width])
+                dst["min"].extend(np.minimum.reduceat(src["min"][lo:hi], starts))
+                dst["max"].extend(np.maximum.reduceat(src["max"][lo:hi], starts))
+                dst["sum"].extend(np.add.reduceat(src["sum"][lo:hi], starts))
+                if src["count"] is None:
+                    dst["count"].extend(np.full(len(starts), width, dtype=np.int64))
+                else:
+                    dst["count"].extend(np.add.reduceat(src["count"][lo:hi], starts))
+            if dst["x"].n < 2:
+                break
+            src = {k: dst[k].view for k in self.FIELDS}
+            width, level = 2, level + 1
+
+    def query(self, width=600, x_min=None, x_max=None):
+        """
+        Returns at most 'width' buckets with x/min/max/mean/count over
+        [x_min, x_max] (whole series by default).
+        """
+        n = len(self)
+        if n == 0:
+            return _empty_series()
+        x_all = self._x.view
+        lo = 0 if x_min is None else int(np.searchsorted(x_all, x_min, side='left'))
+        hi = n if x_max is None else int(np.searchsorted(x_all, x_max, side='right'))
+        if hi <= lo:
+            return _empty_series()
+
+        # Small ranges: aggregate raw points directly
+        if hi - lo <= 2 * width or not self._levels:
+            return bucket_aggregate(x_all[lo:hi], self._y.view[lo:hi], width)
+
+        # Finest level with at most 2 * width blocks in range
+        for top, level in enumerate(self._levels):
+            block = self.base << top
+            if -(-hi // block) - lo // block <= 2 * width:
+                break
+
+        # Cover [lo, hi) with blocks of the chosen level, then finer levels
+        # for the incomplete remainder, then raw points (< base of them)
+        parts = {k: [] for k in self.FIELDS}
+        pos = lo
+        for depth in range(top, -1, -1):
+            block = self.base << depth
+            blocks = self._levels[depth]
+            b_lo = pos // block
+            b_hi = min(blocks["x"].n, -(-hi // block))
+            if b_hi > b_lo:
+                for k in self.FIELDS:
+                    parts[k].append(blocks[k].view[b_lo:b_hi])
+                pos = b_hi * block
+        if pos < hi:
+            tail = self._y.view[pos:hi]
+            for k, v in (("x", x_all[pos]), ("min", tail.min()), ("max", tail.max()),
+                         ("sum", tail.sum()), ("count", len(tail))):
+                parts[k].append(np.array([v]))
+        return _merge_blocks({k: np.concatenate(v) for k, v in parts.items()}, width)
+
+
+def _merge_blocks(series, width):
+    n = len(series["x"])
+    if n == 0:
+        return _empty_series()
+    n_buckets = max(1, min(width, n))
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    counts = np.add.reduceat(series["count"], starts)
+    return {
+        "x": series["x"][starts],
+        "min": np.minimum.reduceat(series["min"], starts),
+        "max": np.maximum.reduceat(series["max"], starts),
+        "mean": np.add.reduceat(series["sum"], starts) / counts,
+        "count": counts
+    }
+
+
+class HistoryQuery:
+    """
+    Server-side history for a PacketStore: keeps one SeriesPyramid per
+    packet field, fed incrementally from the store's offset, and answers
+    chart queries with downsampled, bounded payloads.
+
+    Packets are keyed by their 'id': a re-delivered (modified) packet
+    replaces its earlier point. The pyramids need non-decreasing time, so a
+    late packet (older than the last point charted) or a re-delivery
+    rebuilds them from the store once per sync (counted in 'rebuilds').
+    Packets without a valid timestamp, and fields a packet does not carry,
+    are not charted; 'skipped' counts them per field.
+    """
+
+    def __init__(self, store, fields=("alpha", "i_friction", "j_friction", "k_friction"), base=16):
+        self.store = store
+        self.fields = tuple(fields)
+        self.base = base
+        self.series = {field: SeriesPyramid(base) for field in self.fields}
+        self._offset = 0
+        self._last_x = -np.inf
+        self._ids = set()
+        self.skipped = dict.fromkeys(self.fields, 0)
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Charts packets that arrived since the last sync. Returns the number charted."""
+        with self._lock:
+            packets, offset = self.store.since(self._offset)
+            timed = [(packet_time(p, default=None), p) for p in packets]
+            ids = [p["id"] for _, p in timed if p.get("id") is not None]
+            late = any(t is not None and t < self._last_x for t, _ in timed)
+            if late or len(set(ids)) < len(ids) or not self._ids.isdisjoint(ids):
+                # Out of order or replaced: chart the store's current packets from scratch
+                packets, offset = self.store.since(0)
+                latest = {}
+                for i, packet in enumerate(packets):
+                    latest[packet.get("id", ("", i))] = packet
+                timed = [(packet_time(p, default=None), p) for p in latest.values()]
+                self.series = {field: SeriesPyramid(self.base) for field in self.fields}
+                self.skipped = dict.fromkeys(self.fields, 0)
+                self._last_x = -np.inf
+                self._ids = set()
+                self.rebuilds += 1
+            self._offset = offset
+            return self._chart(timed)
+
+    def _chart(self, timed):
+        # Caller holds the lock; every charted time is >= self._last_x
+        for field in self.fields:
+            self.skipped[field] += sum(1 for t, _ in timed if t is None)
+        timed = sorted(((t, p) for t, p in timed if t is not None), key=lambda tp: tp[0])
+        if not timed:
+            return 0
+        for field in self.fields:
+            points = [(t, p[field]) for t, p in timed if p.get(field) is not None]
+            self.skipped[field] += len(timed) - len(points)
+            if points:
+                x, y = zip(*points)
+                self.series[field].extend(x, [float(v) for v in y])
+        self._ids.update(p["id"] for _, p in timed if p.get("id") is not None)
+        self._last_x = timed[-1][0]
+        return len(timed)
+
+    def query(self, field, width=600, x_min=None, x_max=None):
+        self.sync()
+        with self._lock:
+            return self.series[field].query(width, x_min, x_max)
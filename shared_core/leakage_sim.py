@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+
+from shared_core.sheaf_math import compute_integrity_batch
+
+COMPONENTS = ("alpha", "i_friction", "j_friction", "k_friction")
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class StreamingHistogram:
+    """
+    Fixed-memory histograms for k non-negative series at once.
+
+    Each series keeps 'bins' equal-width bins over [0, hi). When a value
+    exceeds hi, the range doubles and adjacent bins are merged pairwise, so
+    memory stays O(k * bins) regardless of the sample count and quantiles
+    are exact to within one bin width (hi / bins).
+    """
+
+    def __init__(self, n_series, bins=4096):
+        if bins % 2:
+            raise ValueError("bins must be even")
+        self.bins = bins
+        self.counts = np.zeros((n_series, bins), dtype=np.int64)
+        self.hi = np.zeros(n_series)
+        self.total = np.zeros(n_series)
+        self.maximum = np.zeros(n_series)
+        self.n = 0
+
+    def add(self, values):
+        """values: (n_samples, n_series), all >= 0."""
+        values = np.asarray(values, dtype=float)
+        k, bins = self.counts.shape
+        col_max = values.max(axis=0)
+
+        # 1. Initial range from the first chunk, then double until it covers the max
+        fresh = self.hi == 0
+        self.hi[fresh] = np.where(col_max[fresh] > 0, col_max[fresh] * 1.25, 1.0)
+        while True:
+            grow = col_max >= self.hi
+            if not grow.any():
+                break
+            merged = self.counts[grow].reshape(-1, bins // 2, 2).sum(axis=2)
+            self.counts[grow] = np.concatenate([merged, np.zeros_like(merged)], axis=1)
+            self.hi[grow] *= 2
+
+        # 2. Bin all series with one bincount
+        idx = np.minimum((values / self.hi * bins).astype(np.int64), bins - 1)
+        flat = (idx + np.arange(k) * bins).ravel()
+        self.counts += np.bincount(flat, minlength=k * bins).reshape(k, bins)
+        self.total += values.sum(axis=0)
+        self.maximum = np.maximum(self.maximum, col_max)
+        self.n += len(values)
+
+    def quantiles(self, qs):
+        """(n_series, len(qs)) quantiles, linearly interpolated within bins."""
+        qs = np.asarray(qs, dtype=float)
+        cdf = np.cumsum(self.counts, axis=1)
+        width = self.hi / self.bins
+        out = np.empty((len(cdf), len(qs)))
+        for s in range(len(cdf)):
+            target = qs * self.n
+            b = np.minimum(np.searchsorted(cdf[s], target, side='left'), self.bins - 1)
+            below = np.where(b > 0, cdf[s][b - 1], 0)
+            in_bin = np.maximum(self.counts[s][b], 1)
+            out[s] = np.minimum((b + np.clip((target - below) / in_bin, 0.0, 1.0)) * width[s], self.maximum[s])
+        return out
+
+    def mean(self):
+        return self.total / max(self.n, 1)
+
+
+class LeakageSimulator:
+    """
+    Monte Carlo distribution of torsion and financial leakage over a complex.
+
+    Every node's [Alpha, i, j, k] components are sampled independently from
+    a configurable distribution. For an edge (u, v), u is the reference
+    (truth) and v the observed reality, matching compute_integrity:
+        torsion_e = ||x_u - x_v||
+        leakage_e = compute_integrity(x_u, x_v)['leakage']
+
+    Samples are generated and reduced in chunks into streaming histograms,
+    so memory is bounded by chunk_size, not by n_samples.
+
+    Node specs:
+        {node: [alpha_spec, i_spec, j_spec, k_spec]}
+    where each spec is a constant, or a dict naming a numpy Generator
+    distribution and its parameters, e.g.
+        {"dist": "normal", "loc": 100, "scale": 5}
+        {"dist": "beta", "a": 2, "b": 20}
+    Frictions live in the One-Drop range [0, 1] and Alpha is >= 0. Constants
+    outside those ranges are rejected. Distribution samples outside them are
+    clipped, counted and reported per node component under 'clipped' (with
+    a warning); strict=True raises instead.
+    """
+
+    def __init__(self, node_ids, edges, node_specs, seed=None, chunk_size=100_000, bins=4096,
+                 strict=False):
+        self.node_ids = list(node_ids)
+        self.index = {node: i for i, node in enumerate(self.node_ids)}
+        self.edges = list(edges)
+        self._u = np.array([self.index[u] for u, _ in self.edges], dtype=np.int64)
+        self._v = np.array([self.index[v] for _, v in self.edges], dtype=np.int64)
+        missing = [node for node in self.node_ids if node not in node_specs]
+        if missing:
+            raise ValueError(f"Schema Violation: no distribution for nodes {missing}")
+        self.node_specs = {node: list(node_specs[node]) for node in self.node_ids}
+        bad = [f"{node}.{COMPONENTS[c]}={spec}" for node, specs in self.node_specs.items()
+               for c, spec in enumerate(specs)
+               if not isinstance(spec, dict) and not (0.0 <= spec and (c == 0 or spec <= 1.0))]
+        if bad:
+            raise ValueError(f"Schema Violation: constants outside Alpha >= 0 / friction [0, 1]: {bad}")
+        self.strict = strict
+        self._clipped = np.zeros((len(self.node_ids), 4), dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.bins = bins
+
+    @classmethod
+    def from_edges(cls, edges, node_specs, **kwargs):
+        edges = list(edges)
+        node_ids = list(dict.fromkeys(node for edge in edges for node in edge))
+        return cls(node_ids, edges, node_specs, **kwargs)
+
+    def _sample(self, n):
+        """(n, n_nodes, 4) sampled sections."""
+        x = np.empty((n, len(self.node_ids), 4))
+        for i, node in enumerate(self.node_ids):
+            for c, spec in enumerate(self.node_specs[node]):
+                if isinstance(spec, dict):
+                    params = {key: value for key, value in spec.items() if key != "dist"}
+                    x[:, i, c] = getattr(self.rng, spec["dist"])(size=n, **params)
+                else:
+                    x[:, i, c] = spec
+        outside = (x < 0.0)
+        outside[:, :, 1:] |= x[:, :, 1:] > 1.0
+        clipped = outside.sum(axis=0)
+        if clipped.any():
+            if self.strict:
+                raise ValueError(f"Samples outside Alpha >= 0 / friction [0, 1]: {self._describe(clipped)}")
+            self._clipped += clipped
+            np.maximum(x[:, :, 0], 0.0, out=x[:, :, 0])
+            np.clip(x[:, :, 1:], 0.0, 1.0, out=x[:, :, 1:])
+        return x
+
+    def _describe(self, clipped):
+        return {
+            node: {COMPONENTS[c]: int(clipped[i, c]) for c in range(4) if clipped[i, c]}
+            for i, node in enumerate(self.node_ids) if clipped[i].any()
+        }
+
+    def run(self, n_samples, quantiles=DEFAULT_QUANTILES):
+        """
+        Returns:
+            Dict with per-edge and total quantiles (and means) of torsion and
+            leakage, keyed by quantile level, and 'clipped': the share of
+            samples per node component that fell outside its range.
+        """
+        m = len(self.edges)
+        # Series layout: [torsion per edge, leakage per edge, total torsion, total leakage]
+        hist = StreamingHistogram(2 * m + 2, bins=self.bins)
+        self._clipped[:] = 0
+        start = time.perf_counter()
+        done = 0
+        while done < n_samples:
+            n = min(self.chunk_size, n_samples - done)
+            x = self._sample(n)
+            truth, reality = x[:, self._u], x[:, self._v]
+            torsion = np.linalg.norm(truth - reality, axis=2)
+            leakage = compute_integrity_batch(truth.reshape(-1, 4), reality.reshape(-1, 4))['leakage'].reshape(n, m)
+            hist.add(np.hstack([torsion, leakage, torsion.sum(axis=1, keepdims=True), leakage.sum(axis=1, keepdims=True)]))
+            done += n
+        elapsed = time.perf_counter() - start
+
+        # Share of samples clipped into range, per node component
+        clipped = {node: {component: count / done for component, count in counts.items()}
+                   for node, counts in self._describe(self._clipped).items()}
+        if clipped:
+            print(f"⚠️ Leakage sim clipped samples outside Alpha >= 0 / friction [0, 1]: {clipped}")
+
+        q = hist.quantiles(quantiles)
+        means = hist.mean()
+        label = lambda row: {float(level): float(value) for level, value in zip(quantiles, q[row])}
+        return {
+            "samples": done,
+            "elapsed": elapsed,
+            "clipped": clipped,
+            "edges": [
+                {
+                    "edge": f"{u}->{v}",
+                    "torsion": label(e),
+                    "leakage": label(m + e),
+                    "mean_torsion": float(means[e]),
+                    "mean_leakage": float(means[m + e])
+                }
+                for e, (u, v) in enumerate(self.edges)
+            ],
+            "total": {
+                "torsion": label(2 * m),
+                "leakage": label(2 * m + 1),
+                "mean_torsion": float(means[2 * m]),
+                "mean_leakage": float(means[2 * m + 1])
+            }
+        }
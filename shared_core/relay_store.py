@@ -0,0 +1,176 @@
+import fnmatch
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from shared_core.sheaf_math import compute_integrity
+
+
+class PacketStore:
+    """
+    Incremental, cached view of a directory of JSON packets
+    (data_relay/ or the shadow_node artifacts).
+
+    - Packets are parsed once and kept in memory, keyed by file name.
+    - refresh() is throttled to one directory stat per min_interval and only
+      rescans when the directory changed (or a packet was still being
+      written), so Streamlit reruns triggered by widgets do no I/O. Writers
+      should replace packets atomically (temp file + os.replace) so a
+      rewrite changes the directory.
+    - 'version' increments only when new or modified packets were loaded;
+      use it as the cache key for anything derived from the packets.
+
+    One instance is meant to be shared by all sessions (st.cache_resource).
+    """
+
+    def __init__(self, directory, pattern="*.json", min_interval=2.0):
+        self.directory = directory
+        self.pattern = pattern
+        self.min_interval = min_interval
+        self.version = 0
+        self._packets = {}    # name -> (ctime, packet)
+        self._stamps = {}     # name -> (mtime_ns, size)
+        self._ordered = []    # names sorted by ctime
+        self._arrivals = []   # names in load order (append-only; offsets for since())
+        self._arrival = {}    # name -> index of its latest load in _arrivals
+        self._dir_mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """
+        Loads new or modified packets. Returns True if the store changed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_check < self.min_interval:
+                return False
+            self._last_check = now
+
+            # 1. Cheap change detection: one stat of the directory
+            try:
+                dir_mtime = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                return False
+            if not force and dir_mtime == self._dir_mtime:
+                return False
+
+            # 2. Incremental scan: parse only unseen or modified files
+            changed = False
+            incomplete = False
+            loaded = []
+            present = set()
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not fnmatch.fnmatch(entry.name, self.pattern):
+                        continue
+                    present.add(entry.name)
+                    stat = entry.stat()
+                    stamp = (stat.st_mtime_ns, stat.st_size)
+                    if self._stamps.get(entry.name) == stamp:
+                        continue
+                    try:
+                        with open(entry.path, 'r') as f:
+                            packet = json.load(f)
+                    except (OSError, ValueError):
+                        # Partially written packet. Finishing it in place does not
+                        # touch the directory, so the next refresh must rescan.
+                        incomplete = True
+                        continue
+                    self._packets[entry.name] = (stat.st_ctime, packet)
+                    self._stamps[entry.name] = stamp
+                    loaded.append(entry.name)
+                    changed = True
+
+            self._dir_mtime = None if incomplete else dir_mtime
+
+            for name in sorted(loaded, key=lambda name: self._packets[name][0]):
+                self._arrival[name] = len(self._arrivals)
+                self._arrivals.append(name)
+
+            for name in set(self._packets) - present:
+                del self._packets[name]
+                del self._stamps[name]
+                del self._arrival[name]
+                changed = True
+
+            if changed:
+                self._ordered = sorted(self._packets, key=lambda name: self._packets[name][0])
+                self.version += 1
+            return changed
+
+    def latest(self):
+        """Returns (name, packet) of the newest packet by ctime, or (None, None)."""
+        with self._lock:
+            if not self._ordered:
+                return None, None
+            name = self._ordered[-1]
+            return name, self._packets[name][1]
+
+    def packets(self):
+        """All packets, oldest first."""
+        with self._lock:
+            return [self._packets[name][1] for name in self._ordered]
+
+    def since(self, offset):
+        """
+        Packets loaded after 'offset' (arrival order) and the new offset.
+        Lets consumers such as HistoryQuery ingest incrementally. Offsets
+        count loads, so deletions never shift them; a modified packet is
+        delivered again (its latest version only).
+        """
+        with self._lock:
+            arrival = self._arrival
+            packets = [self._packets[name][1] for i, name in enumerate(self._arrivals[offset:], offset)
+                       if arrival.get(name) == i]
+            return packets, len(self._arrivals)
+
+    def __len__(self):
+        return len(self._packets)
+
+
+def packet_time(packet, default=0.0):
+    """Packet timestamp in epoch seconds (relay 'timestamp' or artifact '_meta'); 'default' if absent or invalid."""
+    stamp = packet.get("timestamp") or packet.get("_meta", {}).get("timestamp")
+    try:
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+@lru_cache(maxsize=4096)
+def _integrity(truth, reality):
+    return compute_integrity(list(truth), list(reality))
+
+
+def cached_integrity(truth_vector, reality_vector):
+    """
+    Memoized compute_integrity. Keyed by the vectors themselves, so a rerun
+    with the same packet and contract constraints is a dictionary lookup.
+    Callers must treat the returned dict as read-only.
+    """
+    return _integrity(tuple(float(v) for v in truth_vector), tuple(float(v) for v in reality_vector))
+
+
+_BASIS_CACHE = {}
+_BASIS_LOCK = threading.Lock()
+
+
+def cached_basis(vault):
+    """
+    The vault's Shadow Basis for its current epoch. The basis only depends on
+    (master_salt, epoch, active regions), so it is synthesized once per epoch
+    and shared by every session.
+    """
+    snapshot = vault.snapshot() if hasattr(vault, "snapshot") else vault
+    if snapshot.master_salt is None:
+        # Remote (VaultClient) snapshots carry their basis but not the salt to key it by
+        return snapshot.synthesize_sheaf_laplacian()
+    key = (snapshot.master_salt, snapshot.epoch_id, tuple(snapshot.active_nodes))
+    with _BASIS_LOCK:
+        if key not in _BASIS_CACHE:
+            _BASIS_CACHE[key] = snapshot.synthesize_sheaf_laplacian()
+        return _BASIS_CACHE[key]
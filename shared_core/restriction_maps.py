@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+class EdgeRestrictionMaps:
+    """
+    Linear restriction maps for every edge of a complex.
+
+    Edge e = (u, v) carries one dim x dim matrix per endpoint:
+        F_src[e]: stalk(u) -> stalk(e)
+        F_dst[e]: stalk(v) -> stalk(e)
+    so the coboundary generalizes the stitcher's raw difference to
+        delta(x)_e = F_src[e] x_u - F_dst[e] x_v
+    which lets partners report in their own units and bases.
+    """
+
+    def __init__(self, source_maps, target_maps):
+        self.source_maps = np.asarray(source_maps, dtype=float)
+        self.target_maps = np.asarray(target_maps, dtype=float)
+        if self.source_maps.shape != self.target_maps.shape or self.source_maps.ndim != 3:
+            raise ValueError("Topological Mismatch: maps must be two (n_edges, dim, dim) arrays.")
+
+    @classmethod
+    def identity(cls, n_edges, dim=4):
+        eye = np.broadcast_to(np.eye(dim), (n_edges, dim, dim))
+        return cls(eye.copy(), eye.copy())
+
+    @property
+    def n_edges(self):
+        return self.source_maps.shape[0]
+
+    @property
+    def dim(self):
+        return self.source_maps.shape[1]
+
+    def apply(self, x, edges):
+        """
+        delta(x) for all edges at once.
+
+        Args:
+            x: (n_nodes, dim) node sections.
+            edges: (n_edges, 2) integer endpoints.
+
+        Returns:
+            (n_edges, dim) array of edge deltas.
+        """
+        x = np.asarray(x, dtype=float)
+        edges = np.asarray(edges)
+        return (np.einsum('eij,ej->ei', self.source_maps, x[edges[:, 0]])
+                - np.einsum('eij,ej->ei', self.target_maps, x[edges[:, 1]]))
+
+    def transports(self):
+        """
+        Forward transport rho_{u->v} = pinv(F_dst) F_src of every edge: the
+        v-section that agrees with x_u on the edge stalk. (n_edges, dim, dim).
+        """
+        return np.linalg.pinv(self.target_maps) @ self.source_maps
+
+    def reverse_transports(self):
+        """Backward transport rho_{v->u} = pinv(F_src) F_dst of every edge."""
+        return np.linalg.pinv(self.source_maps) @ self.target_maps
+
+
+class PathComposer:
+    """
+    Cached composition of transports along node paths.
+
+    compose([S, B, W]) = rho_{B->W} @ rho_{S->B}. Compositions are memoized
+    per path and built from their cached prefix, so checking many paths that
+    share prefixes (the Diamond's S->B->W vs S->C->W, or every route out of
+    one source) costs one matrix product per new hop.
+    """
+
+    def __init__(self, node_ids, edges, restriction_maps, cache_size=65536):
+        self.index = {node: i for i, node in enumerate(node_ids)}
+        self.dim = restriction_maps.dim
+        forward = restriction_maps.transports()
+        backward = restriction_maps.reverse_transports()
+        self._hops = {}
+        for e, (u, v) in enumerate(edges):
+            self._hops.setdefault((self.index[u], self.index[v]), forward[e])
+            self._hops.setdefault((self.index[v], self.index[u]), backward[e])
+        self._compose = lru_cache(maxsize=cache_size)(self._compose_indices)
+
+    def _compose_indices(self, path):
+        if len(path) == 1:
+            return np.eye(self.dim)
+        hop = self._hops.get(path[-2:])
+        if hop is None:
+            raise ValueError(f"Topological Mismatch: no edge between path nodes {path[-2:]}.")
+        result = hop @ self._compose(path[:-1])
+        result.setflags(write=False)
+        return result
+
+    def compose(self, path):
+        """Transport matrix along a node path (read-only, cached)."""
+        return self._compose(tuple(self.index[node] for node in path))
+
+    def commutativity_defects(self, path_pairs, x_source=None):
+        """
+        Evaluates rho_alpha vs rho_beta for many pairs of paths with common
+        endpoints.
+
+        Returns an array with one defect per pair: ||(P_alpha - P_beta) x_source||
+        when a source section is given (one shared (dim,) vector or one per pair
+        as (n_pairs, dim)), else the Frobenius norm ||P_alpha - P_beta||.
+        """
+        if not path_pairs:
+            return np.zeros(0)
+        alpha = np.stack([self.compose(a) for a, _ in path_pairs])
+        beta = np.stack([self.compose(b) for _, b in path_pairs])
+        gap = alpha - beta
+        if x_source is None:
+            return np.linalg.norm(gap, axis=(1, 2))
+        x_source = np.asarray(x_source, dtype=float)
+        subscripts = 'pij,pj->pi' if x_source.ndim == 2 else 'pij,j->pi'
+        return np.linalg.norm(np.einsum(subscripts, gap, x_source), axis=1)
+
+    def cache_info(self):
+        return self._compose.cache_info()
@@ -6,6 +6,7 @@ class OneDropContract(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     timestamp: datetime = Field(default_factory=datetime.now)
     source: str = "TIER_0_FIELD_UPLINK"
+    contract_id: str = "UNASSIGNED"
     alpha: float = Field(..., description="Quantity")
     i_friction: float = Field(0.0)
     j_friction: float = Field(0.0)
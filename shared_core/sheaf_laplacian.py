@@ -0,0 +1,121 @@
+import numpy as np
+import scipy.sparse as sp
+
+
+class SheafLaplacian:
+    """
+    Sparse Sheaf Laplacian over a whole mesh.
+
+    Sections live in an (n_nodes, dim) array, one row per node stalk
+    [Alpha, i, j, k]. For an edge e = (u, v) the coboundary follows the
+    stitcher convention (party_a - party_b):
+        delta(x)_e = x_u - x_v
+    or, with EdgeRestrictionMaps, delta(x)_e = F_src[e] x_u - F_dst[e] x_v.
+    The Laplacian is L = delta^T W delta, with W the edge weights.
+    """
+
+    def __init__(self, node_ids, edges, weights=None, dim=4, restriction_maps=None):
+        self.node_ids = list(node_ids)
+        self.index = {node: idx for idx, node in enumerate(self.node_ids)}
+        self.dim = dim
+
+        # 1. Edge list as integer endpoints (m, 2)
+        self.edges = np.array([(self.index[u], self.index[v]) for u, v in edges], dtype=np.int64).reshape(-1, 2)
+        self.weights = np.ones(len(self.edges)) if weights is None else np.asarray(weights, dtype=float)
+        if self.weights.shape != (len(self.edges),):
+            raise ValueError("Topological Mismatch: one weight per edge is required.")
+
+        self.restriction_maps = restriction_maps
+        if restriction_maps is not None and (restriction_maps.n_edges, restriction_maps.dim) != (len(self.edges), dim):
+            raise ValueError("Topological Mismatch: one (dim x dim) map pair per edge is required.")
+
+        # 2. Operators
+        self.coboundary = self._build_coboundary()
+        edge_weights = sp.diags(np.repeat(self.weights, dim))
+        self.matrix = (self.coboundary.T @ edge_weights @ self.coboundary).tocsr()
+
+        # 3. With identity restriction maps L = L_graph (x) I_dim, so solvers
+        # can work on the n x n graph Laplacian instead of the full matrix
+        self.scalar_matrix = None
+        if restriction_maps is None:
+            incidence = self._build_incidence()
+            self.scalar_matrix = (incidence.T @ sp.diags(self.weights) @ incidence).tocsr()
+
+    @classmethod
+    def from_edges(cls, edges, weights=None, dim=4, restriction_maps=None):
+        """Builds the complex from an edge list, discovering nodes in order of appearance."""
+        edges = list(edges)
+        node_ids = list(dict.fromkeys(node for edge in edges for node in edge))
+        return cls(node_ids, edges, weights=weights, dim=dim, restriction_maps=restriction_maps)
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self):
+        return len(self.edges)
+
+    def _build_incidence(self):
+        # Signed node-edge incidence: +1 at u, -1 at v
+        m = self.n_edges
+        rows = np.concatenate([np.arange(m), np.arange(m)])
+        cols = np.concatenate([self.edges[:, 0], self.edges[:, 1]])
+        data = np.concatenate([np.ones(m), -np.ones(m)])
+        return sp.csr_matrix((data, (rows, cols)), shape=(m, self.n_nodes))
+
+    def _build_coboundary(self):
+        if self.restriction_maps is not None:
+            return self._build_mapped_coboundary()
+        # Row block e holds +I at column block u and -I at column block v
+        m, d = self.n_edges, self.dim
+        rows = np.arange(m * d)
+        src_cols = (self.edges[:, 0, None] * d + np.arange(d)).ravel()
+        dst_cols = (self.edges[:, 1, None] * d + np.arange(d)).ravel()
+        data = np.concatenate([np.ones(m * d), -np.ones(m * d)])
+        return sp.csr_matrix(
+            (data, (np.concatenate([rows, rows]), np.concatenate([src_cols, dst_cols]))),
+            shape=(m * d, self.n_nodes * d)
+        )
+
+    def _build_mapped_coboundary(self):
+        # Row block e holds +F_src[e] at column block u and -F_dst[e] at column block v
+        m, d = self.n_edges, self.dim
+        row_in_block, col_in_block = np.meshgrid(np.arange(d), np.arange(d), indexing='ij')
+        rows = (np.arange(m)[:, None, None] * d + row_in_block).ravel()
+        src_cols = (self.edges[:, 0, None, None] * d + col_in_block).ravel()
+        dst_cols = (self.edges[:, 1, None, None] * d + col_in_block).ravel()
+        data = np.concatenate([self.restriction_maps.source_maps.ravel(), -self.restriction_maps.target_maps.ravel()])
+        return sp.csr_matrix(
+            (data, (np.concatenate([rows, rows]), np.concatenate([src_cols, dst_cols]))),
+            shape=(m * d, self.n_nodes * d)
+        )
+
+    # --- SECTION OPERATIONS ---
+    def sections(self, node_sections):
+        """Stacks a {node_id: vector} mapping into an (n_nodes, dim) array."""
+        return np.array([node_sections[node] for node in self.node_ids], dtype=float).reshape(self.n_nodes, self.dim)
+
+    def edge_deltas(self, x):
+        """delta(x) as an (n_edges, dim) array."""
+        if self.restriction_maps is not None:
+            sections = np.asarray(x, dtype=float).reshape(self.n_nodes, self.dim)
+            return self.restriction_maps.apply(sections, self.edges)
+        return (self.coboundary @ np.asarray(x, dtype=float).ravel()).reshape(self.n_edges, self.dim)
+
+    def edge_torsion(self, x):
+        """||delta(x)_e|| for every edge."""
+        return np.linalg.norm(self.edge_deltas(x), axis=1)
+
+    def apply(self, x):
+        """L x, reshaped to (n_nodes, dim)."""
+        return (self.matrix @ np.asarray(x, dtype=float).ravel()).reshape(self.n_nodes, self.dim)
+
+    def energy(self, x):
+        """Dirichlet energy E(x) = x^T L x = sum_e w_e ||delta(x)_e||^2."""
+        deltas = self.edge_deltas(x)
+        return float(np.dot(self.weights, np.einsum('ij,ij->i', deltas, deltas)))
+
+    def spectral_bound(self):
+        """Gershgorin upper bound on the largest eigenvalue of L."""
+        return float(np.abs(self.matrix).sum(axis=1).max()) if self.n_nodes else 0.0
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 def compute_integrity(truth_vector, reality_vector):
     """
     Normalizes inputs to create a universal 'Risk Index'.
@@ -50,3 +52,39 @@ def compute_integrity(truth_vector, reality_vector):
             "punctuality": (1.0 - j_risk) * 100
         }
     }
+
+
+def compute_integrity_batch(truth_vectors, reality_vectors):
+    """
+    Vectorized compute_integrity over (n, 4) arrays of truth/reality sections.
+    Returns the same keys with one array entry per row.
+    """
+    truth = np.asarray(truth_vectors, dtype=float).reshape(-1, 4)
+    reality = np.asarray(reality_vectors, dtype=float).reshape(-1, 4)
+
+    exp_qty = np.where(truth[:, 0] > 0, truth[:, 0], 1.0)
+    act_qty = reality[:, 0]
+
+    alpha_risk = np.abs(exp_qty - act_qty) / exp_qty
+    i_risk = reality[:, 1]
+    j_risk = np.minimum(1.0, reality[:, 2])
+    k_risk = reality[:, 3]
+
+    raw_distance = np.sqrt(alpha_risk**2 + i_risk**2 + j_risk**2 + k_risk**2)
+    risk_index = np.minimum(1.0, raw_distance)
+
+    alpha_loss = np.maximum(0.0, exp_qty - act_qty) * 10
+    time_loss = reality[:, 2] * 1000
+    money_loss = reality[:, 3] * 10000
+
+    return {
+        "risk_index": risk_index,
+        "integrity_pct": (1.0 - risk_index) * 100,
+        "is_aligned": risk_index < 0.02,
+        "leakage": alpha_loss + time_loss + money_loss,
+        "components": {
+            "qty_match": (1.0 - alpha_risk) * 100,
+            "quality": (1.0 - i_risk) * 100,
+            "punctuality": (1.0 - j_risk) * 100
+        }
+    }
@@ -1,7 +1,16 @@
+import heapq
+import threading
+import time
+
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, cg
+
 from engine import QuaternionicSection, calculate_torsion
+from shadow_node.harmonic import HarmonicExtensionSolver
 
-def perform_handshake(party_a_data, party_b_data, shared_context, vault=None):
+def perform_handshake(party_a_data, party_b_data, shared_context, vault=None, restriction=None):
     """
     Simulates the Stitching Layer with Shadow Core Integration.
     It takes two local sections and verifies their agreement on a shared edge.
@@ -11,15 +20,27 @@ def perform_handshake(party_a_data, party_b_data, shared_context, vault=None):
         party_b_data (list): [Quantity, i_friction, j_friction, k_friction]
         shared_context (str): Label for the edge.
         vault (SecureEpochVault, optional): The sovereign security core.
+        restriction (tuple, optional): (F_a, F_b) 4x4 restriction maps taking each
+            party's units/basis to the shared edge. Defaults to the identity.
+
+    Returns 'delta', the observed edge difference F_a x_a - F_b x_b, unless
+    the consensus layer is fractured.
     """
     
     # 1. Standard Euclidean Difference (The "Public" View)
     # This calculates the raw distance between the vectors before Shadow distortion
-    diff = np.array(party_a_data) - np.array(party_b_data)
+    if restriction is not None:
+        map_a, map_b = restriction
+        diff = np.asarray(map_a, dtype=float) @ np.asarray(party_a_data, dtype=float) \
+            - np.asarray(map_b, dtype=float) @ np.asarray(party_b_data, dtype=float)
+    else:
+        diff = np.array(party_a_data) - np.array(party_b_data)
     euclidean_torsion = np.linalg.norm(diff)
     
     # 2. Apply Shadow Patching (If Vault is Active)
     if vault:
+        # Pin one epoch so a concurrent shift cannot mix basis and epoch ID
+        vault = vault.snapshot() if hasattr(vault, "snapshot") else vault
         # Get the current Epoch's Hidden Basis
         shadow_q = vault.synthesize_sheaf_laplacian()
         
@@ -53,7 +74,155 @@ def perform_handshake(party_a_data, party_b_data, shared_context, vault=None):
         "torsion": round(adjusted_torsion, 4),
         "status": "ALIGNED" if is_aligned else "MISALIGNED",
         "waste_stream_impact": "LOW" if is_aligned else "HIGH",
-        "basis_used": basis_id
+        "basis_used": basis_id,
+        "delta": diff.tolist()
+    }
+
+def perform_handshake_arrays(sections_a, sections_b, vault=None):
+    """
+    Array form of the batch stitcher: (n, 4) section arrays in, arrays out.
+
+    Used by structured sources (e.g. the CSV adapter) so millions of edges
+    are stitched without building per-edge lists or result dicts. One vault
+    snapshot is pinned for all rows.
+
+    Returns:
+        Dict with 'torsion' (n,), 'aligned' (n,) bool, 'basis_used' and
+        'status' ("OK" or "FRACTURED"; a fractured consensus layer sets every
+        torsion to 9999.0).
+    """
+    diff = np.asarray(sections_a, dtype=float) - np.asarray(sections_b, dtype=float)
+    euclidean_torsion = np.linalg.norm(diff, axis=1)
+    # Same vault handling as perform_handshake: a service/vault or a pinned snapshot
+    snapshot = (vault.snapshot() if hasattr(vault, "snapshot") else vault) if vault is not None else None
+
+    if snapshot is not None:
+        shadow_q = snapshot.synthesize_sheaf_laplacian()
+        if shadow_q is None:
+            return {
+                "torsion": np.full(len(diff), 9999.0),
+                "aligned": np.zeros(len(diff), dtype=bool),
+                "basis_used": None,
+                "status": "FRACTURED"
+            }
+        adjusted_torsion = euclidean_torsion * (1.0 + abs(shadow_q.x))
+        basis_id = f"Epoch_{snapshot.epoch_id}"
+    else:
+        adjusted_torsion = euclidean_torsion
+        basis_id = "Legacy_Euclidean"
+
+    return {
+        "torsion": adjusted_torsion,
+        "aligned": adjusted_torsion < 0.01,
+        "basis_used": basis_id,
+        "status": "OK"
+    }
+
+
+def perform_handshake_batch(pairs, vault=None):
+    """
+    Stitches many edges against ONE epoch.
+
+    The vault's current snapshot is pinned once for the whole batch, so an
+    epoch shift that lands mid-batch cannot mix two Shadow Bases; the shift
+    simply applies to the next batch.
+
+    Args:
+        pairs: Iterable of (party_a_data, party_b_data, shared_context).
+        vault (SecureEpochVault, optional): The sovereign security core.
+
+    Returns:
+        List of perform_handshake results, in input order.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    contexts = [context for _, _, context in pairs]
+    batch = perform_handshake_arrays([a for a, _, _ in pairs], [b for _, b, _ in pairs], vault=vault)
+
+    if batch["status"] == "FRACTURED":
+        return [{
+            "context": context,
+            "status": "FRACTURED",
+            "torsion": 9999.0,
+            "waste_stream_impact": "CRITICAL",
+            "message": "CRITICAL: Consensus Layer Broken. Halt Logistics."
+        } for context in contexts]
+
+    results = []
+    for context, torsion, is_aligned in zip(contexts, batch["torsion"], batch["aligned"]):
+        results.append({
+            "context": context,
+            "torsion": round(float(torsion), 4),
+            "status": "ALIGNED" if is_aligned else "MISALIGNED",
+            "waste_stream_impact": "LOW" if is_aligned else "HIGH",
+            "basis_used": batch["basis_used"]
+        })
+    return results
+
+
+def measure_shift_latency(vault, workers=4, batch_size=256, duration=2.0, shifts=3):
+    """
+    Handshake latency across epoch shifts under load.
+
+    'workers' threads stitch random batches back to back while the main
+    thread rotates the epoch 'shifts' times. Batches are grouped by whether
+    a shift landed while they ran; 'stale_batches' counts batches that
+    started after a shift had completed yet stitched against an older epoch
+    (must be 0).
+    """
+    stop = threading.Event()
+    samples = []  # (start, end, epoch id used by the batch or None)
+    lock = threading.Lock()
+
+    def load(seed):
+        rng = np.random.default_rng(seed)
+        while not stop.is_set():
+            data = rng.normal(size=(batch_size, 2, 4))
+            pairs = [(a, b, f"Edge_{i}") for i, (a, b) in enumerate(data)]
+            start = time.perf_counter()
+            results = perform_handshake_batch(pairs, vault=vault)
+            end = time.perf_counter()
+            basis = results[0].get("basis_used") if results else None
+            epoch = int(basis.split("_")[1]) if basis and basis.startswith("Epoch_") else None
+            with lock:
+                samples.append((start, end, epoch))
+
+    threads = [threading.Thread(target=load, args=(seed,), daemon=True) for seed in range(workers)]
+    for t in threads:
+        t.start()
+    shift_times = []  # (start, end, epoch id after the shift)
+    for _ in range(shifts):
+        time.sleep(duration / (shifts + 1))
+        start = time.perf_counter()
+        vault.rotate_epoch()
+        shift_times.append((start, time.perf_counter(), vault.snapshot().epoch_id))
+    time.sleep(duration / (shifts + 1))
+    stop.set()
+    for t in threads:
+        t.join()
+
+    def stats(latencies):
+        if not latencies:
+            return {"batches": 0, "p50_ms": 0.0, "p99_ms": 0.0}
+        ms = np.array(latencies) * 1000
+        return {"batches": len(ms), "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+
+    def is_stale(start, epoch):
+        # The newest epoch already published when the batch started
+        published = [epoch_after for _, s_end, epoch_after in shift_times if s_end <= start]
+        return epoch is not None and bool(published) and epoch < max(published)
+
+    overlapping = [end - start for start, end, _ in samples
+                   if any(start < s_end and end > s_start for s_start, s_end, _ in shift_times)]
+    steady = [end - start for start, end, _ in samples
+              if not any(start < s_end and end > s_start for s_start, s_end, _ in shift_times)]
+    return {
+        "steady": stats(steady),
+        "during_shift": stats(overlapping),
+        "shift_ms": [(end - start) * 1000 for start, end, _ in shift_times],
+        "stale_batches": sum(is_stale(start, epoch) for start, _, epoch in samples),
+        "final_epoch": vault.epoch_id
     }
 
 def suggest_repair(truth, reality):
@@ -89,4 +258,178 @@ def suggest_repair(truth, reality):
     if not recommendations:
         return ["✅ System is Aligned. No repair needed."]
         
-    return recommendations
\ No newline at end of file
+    return recommendations
+
+
+def _repair_actions(node, correction):
+    """Structured counterpart of suggest_repair for one node correction [dAlpha, di, dj, dk]."""
+    d_alpha, d_i, d_j, d_k = (float(c) for c in correction[:4])
+    actions = []
+    if abs(d_alpha) >= 0.5:
+        actions.append({"node": node, "type": "SUPPLEMENTAL_SHIPMENT" if d_alpha > 0 else "RETURN_OVERSTOCK",
+                        "units": round(abs(d_alpha))})
+    if abs(d_i) > 1e-3:
+        actions.append({"node": node, "type": "INSPECTION", "friction": round(d_i, 4)})
+    if abs(d_j) > 1e-3:
+        actions.append({"node": node, "type": "EXPEDITE" if d_j < 0 else "RESCHEDULE", "hours": round(abs(d_j) * 24.0, 1)})
+    if abs(d_k) > 1e-3:
+        actions.append({"node": node, "type": "VARIANCE_PAYMENT", "usd": round(d_k * 10000, 2)})
+    return actions
+
+
+class NetworkRepairPlanner:
+    """
+    Network-wide 'Gradient of Repair' on a SheafLaplacian.
+
+    1. Minimum-norm correction: the smallest change to the free node
+       sections that drives the sheaf energy x^T L x to its minimum:
+           L_FF dx_F = -(L x)_F
+       Fixed nodes (e.g. the contract's ground truth) are never moved; with
+       them the correction is the harmonic extension of the fixed sections
+       (cached sparse LU per fixed set). Without fixed nodes it is the
+       projection of x onto ker(L): the per-component mean for identity
+       maps, Jacobi-preconditioned CG from zero otherwise.
+
+    2. Top-k interventions: repairs interact, so nodes are ranked greedily.
+       Moving one node i by its optimal amount dx_i = -L_ii^-1 g_i (g = L x)
+       lowers the energy by g_i^T L_ii^-1 g_i. After each pick only the
+       gradient of i and its neighbours changes, so gains are updated in a
+       lazy max-heap instead of being recomputed for the whole graph.
+
+    Build once per topology; plan() after every new POD reuses the blocks,
+    the factorization of each fixed set, and the last CG solution as a
+    warm start.
+    """
+
+    def __init__(self, laplacian, cg_tol=1e-8):
+        self.laplacian = laplacian
+        self.cg_tol = cg_tol
+        d, n = laplacian.dim, laplacian.n_nodes
+        self._matrix = laplacian.matrix.tocsr()
+        self._columns = laplacian.matrix.tocsc()
+
+        # Diagonal blocks L_ii and their pseudo-inverses
+        coo = laplacian.matrix.tocoo()
+        on_block = coo.row // d == coo.col // d
+        blocks = np.zeros((n, d, d))
+        np.add.at(blocks, (coo.row[on_block] // d, coo.row[on_block] % d, coo.col[on_block] % d), coo.data[on_block])
+        self._block_pinv = np.linalg.pinv(blocks)
+        self._diag = laplacian.matrix.diagonal()
+        self._warm = {}
+        self._harmonic = HarmonicExtensionSolver(laplacian)
+        self._n_components, self._labels = connected_components(
+            sp.coo_matrix((np.ones(laplacian.n_edges), (laplacian.edges[:, 0], laplacian.edges[:, 1])),
+                          shape=(n, n)),
+            directed=False
+        )
+
+    def _solve_correction(self, x, gradient, free):
+        lap = self.laplacian
+        fixed = np.flatnonzero(~free)
+        if len(fixed):
+            try:
+                fixed_nodes = [lap.node_ids[i] for i in fixed]
+                return self._harmonic.solve_batch(fixed_nodes, x[fixed][None])[0] - x
+            except ValueError:
+                pass  # Some component has no fixed node: solve iteratively
+        elif lap.scalar_matrix is not None:
+            # ker(L) is the locally constant sections: project onto component means
+            means = np.zeros((self._n_components, lap.dim))
+            np.add.at(means, self._labels, x)
+            means /= np.bincount(self._labels, minlength=self._n_components)[:, None]
+            return means[self._labels] - x
+
+        d = lap.dim
+        free_rows = (np.flatnonzero(free)[:, None] * d + np.arange(d)).ravel()
+        system = self._matrix if free.all() else self._matrix[free_rows][:, free_rows]
+        diag = self._diag[free_rows]
+        inv_diag = np.where(diag > 0, 1.0 / np.where(diag > 0, diag, 1.0), 1.0)
+        preconditioner = LinearOperator((len(free_rows), len(free_rows)), matvec=lambda v: inv_diag * v)
+
+        key = free.tobytes()
+        solution, info = cg(system, -gradient[free_rows], x0=self._warm.get(key), rtol=self.cg_tol, atol=0.0,
+                            M=preconditioner, maxiter=10 * len(free_rows))
+        if info > 0:
+            raise RuntimeError(f"CG did not converge within {info} iterations.")
+        self._warm = {key: solution}
+        correction = np.zeros(x.size)
+        correction[free_rows] = solution
+        return correction.reshape(x.shape)
+
+    def plan(self, node_sections, top_k=5, fixed_nodes=(), max_actions=50):
+        """
+        Args:
+            node_sections: {node_id: [Alpha, i, j, k]} or an (n_nodes, dim) array.
+            top_k (int): Number of single-node interventions to rank.
+            fixed_nodes: Nodes that must not be changed (e.g. ground truth).
+            max_actions (int): Nodes of the global correction turned into
+                structured actions, largest correction first.
+
+        Returns:
+            Dict with the current energy, the minimum-norm correction
+            ((n_nodes, dim) array) with its residual energy and actions, and
+            the ranked interventions, each with structured actions and the
+            cumulative energy after it.
+        """
+        lap = self.laplacian
+        d, n = lap.dim, lap.n_nodes
+        x = lap.sections(node_sections) if isinstance(node_sections, dict) else np.asarray(node_sections, dtype=float)
+        x = x.reshape(n, d)
+        free = np.ones(n, dtype=bool)
+        for node in fixed_nodes:
+            free[lap.index[node]] = False
+
+        gradient = self._matrix @ x.ravel()
+        energy = float(x.ravel() @ gradient)
+
+        # 1. Global minimum-norm correction
+        correction = self._solve_correction(x, gradient, free)
+        corrected_energy = lap.energy(x + correction)
+        shift = np.linalg.norm(correction, axis=1)
+        moved = np.argsort(-shift, kind='stable')[:max_actions]
+        moved = moved[shift[moved] > 1e-9]
+
+        # 2. Greedy single-node interventions with lazy heap updates
+        g = gradient.reshape(n, d).copy()
+        gains = np.where(free, np.einsum('ni,nij,nj->n', g, self._block_pinv, g), 0.0)
+        version = np.zeros(n, dtype=np.int64)
+        heap = [(-gain, int(i), 0) for i, gain in enumerate(gains) if gain > 0]
+        heapq.heapify(heap)
+
+        interventions, remaining = [], energy
+        while heap and len(interventions) < top_k:
+            neg_gain, i, stamp = heapq.heappop(heap)
+            if stamp != version[i]:
+                continue  # Stale entry
+            delta = -self._block_pinv[i] @ g[i]
+            remaining = max(0.0, remaining + neg_gain)
+            node = lap.node_ids[i]
+            interventions.append({
+                "rank": len(interventions) + 1,
+                "node": node,
+                "correction": delta.tolist(),
+                "energy_reduction": -neg_gain,
+                "energy_after": remaining,
+                "actions": _repair_actions(node, delta)
+            })
+
+            # g += L[:, block i] @ delta touches i and its neighbours only
+            column = self._columns[:, i * d:(i + 1) * d] @ delta
+            touched = np.unique(np.flatnonzero(column) // d)
+            g[touched] += column.reshape(n, d)[touched]
+            for j in touched:
+                version[j] += 1
+                if not free[j]:
+                    continue
+                gain = float(g[j] @ self._block_pinv[j] @ g[j])
+                if gain > 1e-12:
+                    heapq.heappush(heap, (-gain, int(j), int(version[j])))
+
+        return {
+            "energy": energy,
+            "corrected_energy": corrected_energy,
+            "correction_norm": float(np.linalg.norm(correction)),
+            "correction": correction,
+            "actions": [action for i in moved for action in _repair_actions(lap.node_ids[i], correction[i])],
+            "interventions": interventions
+        }
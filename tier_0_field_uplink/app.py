@@ -9,12 +9,16 @@ st.markdown("<style>.stApp { background-color: #1a1a1a; color: white; } .stButto
 
 st.title("📡 FIELD UPLINK")
 with st.container(border=True):
+    contract_id = st.text_input("Contract ID", value="UNASSIGNED")
     qty = st.number_input("Confirmed Quantity", min_value=0, value=500)
     delay = st.number_input("Delay (Hours)", min_value=0, value=0)
     dmg = st.number_input("Damaged Units", min_value=0, value=0)
     notes = st.text_input("Notes")
 
 if st.button("🚀 TRANSMIT PACKET"):
-    contract = OneDropContract(alpha=qty, i_friction=dmg/100.0, j_friction=delay, k_friction=0.0, notes=notes)
-    with open(f"data_relay/packet_{contract.id}.json", "w") as f: f.write(contract.json())
+    contract = OneDropContract(alpha=qty, i_friction=dmg/100.0, j_friction=delay, k_friction=0.0, notes=notes, contract_id=contract_id.strip() or "UNASSIGNED")
+    # Atomic write: readers never see a partial packet, and the rename bumps the relay's mtime
+    path = f"data_relay/packet_{contract.id}.json"
+    with open(f"{path}.tmp", "w") as f: f.write(contract.json())
+    os.replace(f"{path}.tmp", path)
     st.success("✅ PACKET SECURED")
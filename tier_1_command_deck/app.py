@@ -1,33 +1,65 @@
 import streamlit as st
-import json
-import glob
+import pandas as pd
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from shared_core.sheaf_math import compute_integrity
+from shared_core.relay_store import PacketStore, cached_integrity
+from shared_core.contract_index import ContractRegistry, ContractPacketIndex, UNASSIGNED
+from shared_core.downsample import HistoryQuery
 
 st.set_page_config(page_title="PWP Command", page_icon="💀", layout="wide")
 st.markdown("<style>.stApp { background-color: #000000; font-family: 'Consolas', monospace; } h1, h2, h3, p, div { color: #00ff00 !important; } .block-container { padding-top: 4rem; }</style>", unsafe_allow_html=True)
 
 st.title("💀 COMMAND DECK // TIER 1")
 
+# Shared across sessions: packets are parsed once, reruns only poll for new files
+@st.cache_resource
+def get_relay():
+    return PacketStore("data_relay", pattern="*.json")
+
+@st.cache_resource
+def get_history():
+    return HistoryQuery(get_relay())
+
+@st.cache_resource
+def get_contracts():
+    return ContractRegistry("data_relay/contracts/registry.json"), ContractPacketIndex(get_relay())
+
+CHART_BUCKETS = 600  # Payload per chart is bounded by this, not by the history length
+
+# Data Relay
+relay = get_relay()
+relay.refresh()
+registry, index = get_contracts()
+index.sync()
+
 # Sidebar: Context
 with st.sidebar:
     st.header("CONTRACT CONSTRAINTS")
-    contract_qty = st.number_input("Expected Qty", value=1000)
+    contract_ids = index.contracts() or [UNASSIGNED]
+    contract_id = st.selectbox("Contract", contract_ids)
+    truth = registry.truth_vector(contract_id)
+    contract_qty = st.number_input("Expected Qty", value=int(truth[0]) if truth else 1000,
+                                   key=f"expected_qty_{contract_id}")
+    if st.button("UPDATE CONSTRAINTS" if truth else "REGISTER CONSTRAINTS"):
+        registry.register(contract_id, contract_qty)
+        truth = registry.truth_vector(contract_id)
+    if truth is not None and contract_qty != truth[0]:
+        # A registered contract audits against its stored quantity until updated
+        st.caption(f"Not applied: auditing against the registered {truth[0]:g}. Press UPDATE CONSTRAINTS.")
+    if truth is None:
+        st.caption("Unregistered contract: using the Expected Qty above.")
+        truth = [contract_qty, 0.0, 0.0, 0.0]
+    st.caption(f"{index.count(contract_id)} packets on this contract")
 
-# Data Relay
-files = glob.glob("data_relay/*.json")
-if not files:
+data = index.latest(contract_id)
+if data is None:
     st.warning("NO SIGNALS DETECTED")
     st.stop()
 
-latest = max(files, key=os.path.getctime)
-with open(latest, 'r') as f: data = json.load(f)
-
-# Math Execution
+# Math Execution (against this contract's own ground truth)
 reality = [data['alpha'], data['i_friction'], data['j_friction'], data['k_friction']]
-metrics = compute_integrity([contract_qty, 0.0, 0.0, 0.0], reality)
+metrics = cached_integrity(truth, reality)
 
 # --- THE HEADLINE METRICS ---
 c1, c2, c3 = st.columns(3)
@@ -46,6 +78,20 @@ b3.progress(metrics['components']['quality'] / 100, text=f"QUALITY: {metrics['co
 
 st.divider()
 
+# --- HISTORY (Server-side downsampled) ---
+st.markdown("#### SIGNAL HISTORY")
+field = st.radio("Series", ["j_friction", "k_friction", "i_friction", "alpha"], horizontal=True)
+series = get_history().query(field, width=CHART_BUCKETS)
+if len(series["x"]) > 1:
+    chart = pd.DataFrame(
+        {"min": series["min"], "mean": series["mean"], "max": series["max"]},
+        index=pd.to_datetime(series["x"], unit="s")
+    )
+    st.line_chart(chart)
+    st.caption(f"{int(series['count'].sum())} packets in {len(series['x'])} buckets")
+
+st.divider()
+
 if not metrics['is_aligned']:
     st.error("⚠️ CONTRACT BREACH DETECTED")
 else: